@@ -1,11 +1,9 @@
-
-import configparser
+import os
 import math
 import numpy as np
-import spynnaker8 as sim
-from sPyBlocks.constant_spike_source import ConstantSpikeSource
-from sPyBlocks.neural_decoder import NeuralDecoder
-from sPyBlocks.neural_encoder import NeuralEncoder
+import config_loader
+import metrics
+import operation_log
 import tools
 
 """
@@ -29,273 +27,656 @@ DG-CA3-CA1 one-hot memory
     + CA3cont-Output: 1 to 1 excitatory and static
 """
 
-# Open configparser object interface to read config files
-config = configparser.ConfigParser()
-
-# + Check the active config file directory
-config.read("config_files/configFileParameters.ini")
-activeConfigFilePath = "config_files/" + eval(config["configFileParameters"]["activeConfigFiles"]) + "/"
-
-
-# + Input memory parameters
-config.read(activeConfigFilePath + "memory_config.ini")
-
-# Max number of patterns to store
-cueSize = eval(config["memory"]["cueSize"])
-# Size of patterns to store (number of bits)
-contSize = eval(config["memory"]["contSize"])
-# Codification of information: "little_endian" o "big_endian"
-endianness = eval(config["memory"]["endianness"])
-
-# + Calculated memory parameters
-# Input size of DG population (decoder)
-dgInputSize = math.ceil(math.log2(cueSize+1))
-# Size of CA3 network in number of neurons neccesary to store the cue and content of memories
-networkSize = cueSize + contSize
-# Size of IN population
-ilInputSize = dgInputSize + contSize
-# Number of neurons for each population
-popNeurons = {"ILayer": ilInputSize, "DGLayer": dgInputSize, "CA3cueLayer": cueSize, "CA3contLayer": contSize, "CA1Layer": cueSize, "OLayer": ilInputSize}
-
-
-# + Network components parameters
-network_config = tools.read_json(activeConfigFilePath + "network_config.json")
-
-# Neurons paramaters
-neuronParameters = network_config["neuronParameters"]
-# Initial neuron parameters
-initNeuronParameters = network_config["initNeuronParameters"]
-# Synapses parameters
-synParameters = network_config["synParameters"]
-
-
-# + Simulation parameters: simulation time, time step and network/memory name
-config.read(activeConfigFilePath + "simulation_config.ini")
-simulationParameters = {"simTime": eval(config["simulationParameters"]["simTime"]), "timeStep": eval(config["simulationParameters"]["timeStep"]),
-                        "networkName": eval(config["simulationParameters"]["networkName"])}
-
-
-# + IN input spikes
-config.read(activeConfigFilePath + "input_spikes.ini")
-# CUE
-InputSpikesCue = eval(config["input_cue"]["InputSpikesCue"])
-# CONT
-InputSpikesCont = eval(config["input_cont"]["InputSpikesCont"])
-# Endianess format
-if endianness == "little_endian":
-    InputSpikesCue = np.flip(InputSpikesCue).tolist()
-    InputSpikesCont = np.flip(InputSpikesCont).tolist()
-# Full pattern
-InputSpikes = InputSpikesCue + InputSpikesCont
-
-
-# Execute the simulation and store the parameters in a file: weight if load/store weight along the simulation time
-def main(weight):
-
-    ######################################
-    # Simulation parameters
-    ######################################
-    # Setup simulation
-    sim.setup(timestep=simulationParameters["timeStep"])
-
-    ######################################
-    # Create neuron population
-    ######################################
-    # IL
-    ILayer = sim.Population(popNeurons["ILayer"], sim.SpikeSourceArray(spike_times=InputSpikes), label="ILayer")
-    # CA3cue
-    CA3cueLayer = sim.Population(popNeurons["CA3cueLayer"], sim.IF_curr_exp(**neuronParameters["CA3cueL"]), label="CA3cueLayer")
-    CA3cueLayer.set(v=initNeuronParameters["CA3cueL"]["vInit"])
-    # CA3cont
-    CA3contLayer = sim.Population(popNeurons["CA3contLayer"], sim.IF_curr_exp(**neuronParameters["CA3contL"]), label="CA3contLayer")
-    CA3contLayer.set(v=initNeuronParameters["CA3contL"]["vInit"])
-    # DG (decoder)
-    DGLayer = NeuralDecoder(popNeurons["DGLayer"], sim, {"min_delay":synParameters["IL-DGL"]["delay"]},
-                            neuronParameters["DGL"], sim.StaticSynapse(weight=synParameters["IL-DGL"]["initWeight"],
-                                              delay=synParameters["IL-DGL"]["delay"]))
-    # Necessary for the Decoder
-    constant_spike_source = ConstantSpikeSource(sim, {"min_delay": synParameters["IL-DGL"]["delay"]},
-                                                neuronParameters["DGL"],
-                                                sim.StaticSynapse(weight=synParameters["IL-DGL"]["initWeight"],
-                                                                  delay=synParameters["IL-DGL"]["delay"]))
-    # CA1 (encoder)
-    CA1Layer = NeuralEncoder(2**dgInputSize, sim, {"min_delay":synParameters["CA3cueL-CA1L"]["delay"]},
-                             neuronParameters["CA1L"], sim.StaticSynapse(weight=synParameters["CA3cueL-CA1L"]["initWeight"],
-                                              delay=synParameters["CA3cueL-CA1L"]["delay"]))
-
-    # OL
-    OLayer = sim.Population(popNeurons["OLayer"], sim.IF_curr_exp(**neuronParameters["OL"]), label="OLayer")
-    OLayer.set(v=initNeuronParameters["OL"]["vInit"])
-
-    ######################################
-    # Create synapses
-    ######################################
-
-    # IL-DG -> 1 to 1, excitatory and static (first dgInputSize bits/neurons)
-    DGLayer.connect_inputs(sim.PopulationView(ILayer, range(dgInputSize)), ini_pop_indexes=[[i] for i in range(dgInputSize)])
-    # DG-CA3cueL -> 1 to 1, excitatory and static
-    DGLayer.connect_outputs(CA3cueLayer, end_pop_indexes=[[i] for i in range(cueSize)], and_indexes=range(1, cueSize+1),
-                            conn=sim.StaticSynapse(weight=synParameters["DGL-CA3cueL"]["initWeight"],
-                                                   delay=synParameters["DGL-CA3cueL"]["delay"]))
-    DGLayer.connect_constant_spikes([constant_spike_source.set_source, constant_spike_source.latch.output_neuron])
-
-    # IL-CA3cont -> 1 to 1, excitatory and static (last m neurons of DG: only the number of directions to use)
-    IL_CA3contL_conn = sim.Projection(sim.PopulationView(ILayer, range(dgInputSize, ilInputSize, 1)), CA3contLayer, sim.OneToOneConnector(),
-                                          synapse_type=sim.StaticSynapse(weight=synParameters["IL-CA3contL"]["initWeight"],
-                                                                         delay=synParameters["IL-CA3contL"]["delay"]),
-                                          receptor_type=synParameters["IL-CA3contL"]["receptor_type"])
-
-    # CA3cue-CA3cont -> all to all STDP
-    # + Time rule
-    timing_rule = sim.SpikePairRule(tau_plus=synParameters["CA3cueL-CA3contL"]["tau_plus"], tau_minus=synParameters["CA3cueL-CA3contL"]["tau_minus"],
-                                    A_plus=synParameters["CA3cueL-CA3contL"]["A_plus"], A_minus=synParameters["CA3cueL-CA3contL"]["A_minus"])
-    # + Weight rule
-    weight_rule = sim.AdditiveWeightDependence(w_max=synParameters["CA3cueL-CA3contL"]["w_max"], w_min=synParameters["CA3cueL-CA3contL"]["w_min"])
-    # + STDP model
-    stdp_model = sim.STDPMechanism(timing_dependence=timing_rule, weight_dependence=weight_rule,
-                                   weight=synParameters["CA3cueL-CA3contL"]["initWeight"], delay=synParameters["CA3cueL-CA3contL"]["delay"])
-    # + Create the STDP synapses
-    CA3cueL_CA3contL_conn = sim.Projection(CA3cueLayer, CA3contLayer, sim.AllToAllConnector(allow_self_connections=True), synapse_type=stdp_model)
-
-    # CA3cue-CA1 -> 1 to 1 excitatory and static
-    pop_len = len(CA3cueLayer)
-    input_indexes = range(pop_len)
-    channel_indexes = range(1, CA3cueLayer.size + 1)
-    if len(input_indexes) != len(channel_indexes):
-        raise ValueError("There is not the same number of elements in input_indexes and channel_indexes")
-    for i in range(pop_len):
-        i_bin = format(channel_indexes[i], "0" + str(CA1Layer.n_outputs) + 'b')
-        i_bin_splitted = [j for j in reversed(i_bin)]
-        connections = [k for k in range(0, len(i_bin_splitted)) if i_bin_splitted[k] == '1']
-        CA1Layer.connect_inputs(CA3cueLayer, ini_pop_indexes=[input_indexes[i]], or_indexes=connections)
-    
-    # CA1-Output -> 1 to 1 excitatory and static
-    CA1Layer.connect_outputs(sim.PopulationView(OLayer, range(dgInputSize)), end_pop_indexes=[[i] for i in range(dgInputSize)],
-                             conn=sim.StaticSynapse(weight=synParameters["CA1L-OL"]["initWeight"],
-                                                    delay=synParameters["CA1L-OL"]["delay"]))
-
-    # CA3cont-Output -> 1 to 1 excitatory and static
-    CA3contL_OL_conn = sim.Projection(CA3contLayer, sim.PopulationView(OLayer, range(dgInputSize, ilInputSize, 1)),
-                                      sim.OneToOneConnector(),
-                                      synapse_type=sim.StaticSynapse(weight=synParameters["CA3contL-OL"]["initWeight"],
-                                                                     delay=synParameters["CA3contL-OL"]["delay"]),
-                                      receptor_type=synParameters["CA3contL-OL"]["receptor_type"])
-
-    ######################################
-    # Parameters to store
-    ######################################
-    CA3cueLayer.record(["spikes", "v"])
-    CA3contLayer.record(["spikes", "v"])
-    OLayer.record(["spikes"])
-    for gate in DGLayer.and_gates.and_array:
-        gate.output_neuron.record(("spikes"))
-    for gate in CA1Layer.or_gates.or_array:
-        gate.output_neuron.record(("spikes"))
-
-    ######################################
-    # Execute the simulation
-    ######################################
-    # The simulation is execute in time intervals to store the weight of synapses if applicable
-    if weight:
-        w_CA3cueL_CA3contL = []
-        w_CA3cueL_CA3contL.append(CA3cueL_CA3contL_conn.get('weight', format='list', with_address=True))  # Instante 0
-        for n in range(0, int(simulationParameters["simTime"]), int(simulationParameters["timeStep"])):
-            sim.run(simulationParameters["timeStep"])
-            w_CA3cueL_CA3contL.append(CA3cueL_CA3contL_conn.get('weight', format='list', with_address=True))
-    else:
-        sim.run(simulationParameters["simTime"])
-
-    ######################################
-    # Retrieve output data
-    ######################################
-    # Get the data from CA3
-    CA3cueData = CA3cueLayer.get_data(variables=["spikes", "v"])
-    CA3contData = CA3contLayer.get_data(variables=["spikes", "v"])
-
-    # Get data from Output
-    OLData = OLayer.get_data(variables=["spikes"])
-
-    # Separate for each type of data (each segment = 1 execution/run)
-    spikesCA3cue = CA3cueData.segments[0].spiketrains
-    vCA3cue = CA3cueData.segments[0].filter(name='v')[0]
-    spikesCA3cont = CA3contData.segments[0].spiketrains
-    vCA3cont = CA3contData.segments[0].filter(name='v')[0]
-    spikesDG = []
-    for gate in DGLayer.and_gates.and_array:
-        spikesDG.append(gate.output_neuron.get_data(variables=["spikes"]).segments[0].spiketrains[0])
-    spikesCA1 = []
-    for gate in CA1Layer.or_gates.or_array:
-        spikesCA1.append(gate.output_neuron.get_data(variables=["spikes"]).segments[0].spiketrains[0])
-    spikesOut = OLData.segments[0].spiketrains
-
-    ######################################
-    # End simulation
-    ######################################
-    sim.end()
-
-    ######################################
-    # Processing and store the output data
-    ######################################
-    # Format the retrieve data
-    formatVCA3cue = tools.format_neo_data("v", vCA3cue)
-    formatSpikesCA3cue = tools.format_neo_data("spikes", spikesCA3cue)
-    formatVCA3cont = tools.format_neo_data("v", vCA3cont)
-    formatSpikesCA3cont = tools.format_neo_data("spikes", spikesCA3cont)
-    if weight:
-        formatWeightCA3cueL_CA3contL = tools.format_neo_data("weights", w_CA3cueL_CA3contL,
-                                                           {"simTime": simulationParameters["simTime"],
-                                                            "timeStep": simulationParameters["timeStep"]})
-    formatSpikeDG = tools.format_neo_data("spikes", spikesDG)
-    formatSpikeCA1 = tools.format_neo_data("spikes", spikesCA1)
-    formatSpikeOut = tools.format_neo_data("spikes", spikesOut)
-
-    # Show some of the data
-    # print("Spikes Input = " + str(InputSpikes) + "\n")
-    # print("Spikes DG = " + str(formatSpikeDG) + "\n")
-    # print("V CA3cueLayer = " + str(formatVCA3cue) + "\n")
-    # print("Spikes CA3cueLayer = " + str(formatSpikesCA3cue) + "\n")
-    # print("V CA3contLayer = " + str(formatVCA3cont) + "\n")
-    # print("Spikes CA3contLayer = " + str(formatSpikesCA3cont) + "\n")
-    # print("Weight CA3cueL-CA3contL = " + str(formatWeightCA3cueL_CA3contL) + "\n")
-    # print("Spikes CA1 = " + str(formatSpikeCA1) + "\n")
-    # print("Spikes Out = " + str(formatSpikeOut) + "\n")
-
-    # Create a dictionary with all the information and headers
-    dataOut = {"networkName": simulationParameters["networkName"], "timeStep": simulationParameters["timeStep"],
-               "simTime": simulationParameters["simTime"], "synParameters": synParameters,
-               "neuronParameters": neuronParameters, "initNeuronParameters": initNeuronParameters,
-               "cueSize": cueSize, "contSize": contSize, "endianness": endianness, "variables": []}
-    dataOut["variables"].append(
-        {"type": "spikes", "popName": "CA3cue Layer", "popNameShort": "CA3cueL", "numNeurons": popNeurons["CA3cueLayer"],
-         "data": formatSpikesCA3cue})
-    dataOut["variables"].append(
-        {"type": "v", "popName": "CA3cue Layer", "popNameShort": "CA3cueL", "numNeurons": popNeurons["CA3cueLayer"],
-         "data": formatVCA3cue})
-    dataOut["variables"].append(
-        {"type": "spikes", "popName": "CA3cont Layer", "popNameShort": "CA3contL", "numNeurons": popNeurons["CA3contLayer"],
-         "data": formatSpikesCA3cont})
-    dataOut["variables"].append(
-        {"type": "v", "popName": "CA3cont Layer", "popNameShort": "CA3contL", "numNeurons": popNeurons["CA3contLayer"],
-         "data": formatVCA3cont})
-    if weight:
-        dataOut["variables"].append({"type": "w", "popName": "CA3cueL-CA3contL", "popNameShort": "CA3cueL-CA3contL",
-                                     "data": formatWeightCA3cueL_CA3contL})
-    dataOut["variables"].append(
-        {"type": "spikes", "popName": "DG Layer", "popNameShort": "DGL", "numNeurons": popNeurons["DGLayer"],
-         "data": formatSpikeDG})
-    dataOut["variables"].append(
-        {"type": "spikes", "popName": "Input Layer", "popNameShort": "IL", "numNeurons": popNeurons["ILayer"],
-         "data": InputSpikes})
-    dataOut["variables"].append(
-        {"type": "spikes", "popName": "CA1 Layer", "popNameShort": "CA1L", "numNeurons": popNeurons["CA1Layer"],
-         "data": formatSpikeCA1})
-    dataOut["variables"].append(
-        {"type": "spikes", "popName": "Output Layer", "popNameShort": "OL", "numNeurons": popNeurons["OLayer"],
-         "data": formatSpikeOut})
-
-    # Store the data in a file
-    tools.check_and_create_folder("data/")
-    fullPath, filename = tools.write_txt_with_stamp("data/", simulationParameters["networkName"], dataOut)
-    print("Data stored in: " + fullPath)
-    return fullPath, filename
 
+def read_input_spikes(fullPath, cueSize, contSize, endianness, simTime=None):
+    """
+    Read an input spikes file (input_spikes.ini or operation log) and build the spikes of the IN population (cue + cont)
+    in the endianness of the memory
+
+    @param fullPath: path + filename to the input_spikes.ini file or to the operation log (.oplog)
+    @param cueSize: max number of patterns to store (the file must have ceil(log2(cueSize+1)) cue neurons)
+    @param contSize: size of patterns to store (the file must have contSize content neurons)
+    @param endianness: codification of the information of the memory: "little_endian" or "big_endian"
+    @param simTime: (optional) duration of the simulation, only the spikes before it are expanded from an operation log
+    @return: list of spike times for each neuron of the IN population
+    """
+    # CUE and CONT
+    if fullPath.endswith(operation_log.OPERATION_LOG_EXTENSION):
+        inputSpikesCue, inputSpikesCont = operation_log.read_operation_log(fullPath, cueSize, contSize).get_input_spikes(
+            0, simTime)
+    else:
+        inputSpikesCue, inputSpikesCont = config_loader.read_input_spikes(fullPath, cueSize, contSize)
+    # Endianess format
+    if endianness == "little_endian":
+        inputSpikesCue = inputSpikesCue[::-1]
+        inputSpikesCont = inputSpikesCont[::-1]
+    # Full pattern
+    return inputSpikesCue + inputSpikesCont
+
+
+def get_content_bits(content, contSize):
+    """
+    Get the bits of a content of the memory
+
+    @param content: decimal value (lower than 2**contSize) or list of contSize bits (most significant bit first)
+    @param contSize: size of patterns to store (number of bits)
+    @return: numpy array of contSize bits, most significant bit first
+    """
+    if isinstance(content, (list, tuple, np.ndarray)):
+        bits = np.asarray(content)
+        if bits.shape != (contSize,) or not np.all((bits == 0) | (bits == 1)):
+            raise ValueError("A content of the memory must have " + str(contSize) + " bits (0 or 1): " + str(content))
+        return bits.astype(np.uint8)
+    if isinstance(content, bool) or not isinstance(content, (int, np.integer)) or not 0 <= content < 2 ** contSize:
+        raise ValueError("A content of the memory must be a decimal value lower than 2**" + str(contSize) + ": " +
+                         str(content))
+    return np.array(list(format(int(content), "0" + str(contSize) + "b")), dtype=np.uint8)
+
+
+def get_preload_weights(contentTable, cueSize, contSize, endianness, synParameters):
+    """
+    Get the CA3cue-CA3cont weights of a memory that has learned a content table: the synapses from the CA3cue neuron of
+    each cue to the CA3cont neurons of the bits set in its content at w_max and the rest at initWeight, as the writing
+    of the content in an empty cue leaves them. It assumes that the potentiation of a writing saturates the synapses
+    (A_plus >= w_max - initWeight), as with the parameters of network_config.json; other STDP parameters are rejected
+
+    @param contentTable: dict of cue (1 to cueSize, int or decimal str) -> content (see get_content_bits)
+    @param cueSize: max number of patterns to store
+    @param contSize: size of patterns to store (number of bits)
+    @param endianness: codification of the information of the memory: "little_endian" or "big_endian"
+    @param synParameters: synapses parameters (network_config.json)
+    @return: numpy array of weights (cueSize x contSize)
+    """
+    cueSizeInBin = math.ceil(math.log2(cueSize + 1))
+    stdp = synParameters["CA3cueL-CA3contL"]
+    if stdp["A_plus"] < stdp["w_max"] - stdp["initWeight"]:
+        raise ValueError("A content table can only be preloaded if a writing saturates the CA3cueL-CA3contL synapses "
+                         "(A_plus >= w_max - initWeight), but A_plus is " + str(stdp["A_plus"]) + " and w_max - "
+                         "initWeight is " + str(stdp["w_max"] - stdp["initWeight"]))
+    weights = np.full((cueSize, contSize), float(stdp["initWeight"]))
+    for cue, content in contentTable.items():
+        cue = int(cue)
+        if not 1 <= cue <= cueSize:
+            raise ValueError("The cues of the content table must be between 1 and " + str(cueSize) + ": " + str(cue))
+        # Bits of the input neurons in the order of the input spikes files (most significant bit first) and in the
+        #  endianness of the memory (see read_input_spikes)
+        cueBits = np.array(list(format(cue, "0" + str(cueSizeInBin) + "b")), dtype=int)
+        contBits = get_content_bits(content, contSize)
+        if endianness == "little_endian":
+            cueBits, contBits = cueBits[::-1], contBits[::-1]
+        # The decoder activates the CA3cue neuron of the value of its inputs minus 1 (input neuron i has weight 2**i)
+        cueNeuron = int(np.dot(cueBits, 2 ** np.arange(cueSizeInBin))) - 1
+        if cueNeuron >= cueSize:
+            raise ValueError("The cue " + str(cue) + " activates the decoder output " + str(cueNeuron + 1) +
+                             ", which has no CA3cue neuron in a " + endianness + " memory of " + str(cueSize) + " cues")
+        weights[cueNeuron] = np.where(contBits == 1, float(stdp["w_max"]), float(stdp["initWeight"]))
+    return weights
+
+
+def get_input_spikes_path(folderPath):
+    """
+    Get the input spikes file of a folder (config files or testbench): the operation log input_spikes.oplog if there is
+    one, input_spikes.ini in other case
+
+    @param folderPath: path to the folder
+    @return: path + filename to the input spikes file
+    """
+    operationLogPath = folderPath + "input_spikes" + operation_log.OPERATION_LOG_EXTENSION
+    return operationLogPath if os.path.isfile(operationLogPath) else folderPath + "input_spikes.ini"
+
+
+def read_network_parameters(configFilesPath=None):
+    """
+    Read the parameters of the memory from a directory of config files (memory_config.ini, network_config.json,
+    simulation_config.ini and the input spikes file, see get_input_spikes_path)
+
+    @param configFilesPath: (optional) path to the directory of the config files, by default the active one
+    @return: dict with the arguments of MemoryNetwork -> cueSize, contSize, endianness, neuronParameters,
+        initNeuronParameters, synParameters, simulationParameters, inputSpikes and contentTable (None if there is no
+        preloadPath)
+    """
+    if configFilesPath is None:
+        configFilesPath = config_loader.get_active_config_path()
+
+    # + Input memory parameters: max number of patterns to store, size of patterns to store (number of bits) and
+    #   codification of information: "little_endian" o "big_endian"
+    parameters = config_loader.read_memory_parameters(configFilesPath)
+
+    # + Network components parameters: neurons, initial neurons and synapses parameters
+    network_config = tools.read_json(configFilesPath + "network_config.json")
+    parameters["neuronParameters"] = network_config["neuronParameters"]
+    parameters["initNeuronParameters"] = network_config["initNeuronParameters"]
+    parameters["synParameters"] = network_config["synParameters"]
+
+    # + Simulation parameters: simulation time, time step and network/memory name
+    parameters["simulationParameters"] = config_loader.read_simulation_parameters(configFilesPath)
+
+    # + IN input spikes
+    parameters["inputSpikes"] = read_input_spikes(get_input_spikes_path(configFilesPath), parameters["cueSize"],
+                                                  parameters["contSize"], parameters["endianness"],
+                                                  parameters["simulationParameters"]["simTime"])
+
+    # + Content table loaded in the memory before the simulation
+    preloadPath = parameters["simulationParameters"]["preloadPath"]
+    parameters["contentTable"] = None
+    if preloadPath:
+        parameters["contentTable"] = tools.read_json(preloadPath)
+        if not isinstance(parameters["contentTable"], dict):
+            raise ValueError("The content table " + preloadPath + " does not exist or is not a json object")
+    return parameters
+
+
+class MemoryNetwork:
+    """
+    DG-CA3-CA1 one-hot memory built from an explicit set of parameters. The simulators are only imported when a
+    simulation is executed, so several memories with different parameters can be used in the same process
+    """
+
+    def __init__(self, cueSize, contSize, endianness, neuronParameters, initNeuronParameters, synParameters,
+                 simulationParameters, inputSpikes, contentTable=None):
+        """
+        Init the memory network
+
+        @param cueSize: max number of patterns to store
+        @param contSize: size of patterns to store (number of bits)
+        @param endianness: codification of the information: "little_endian" or "big_endian"
+        @param neuronParameters: neuron parameters of each population (network_config.json)
+        @param initNeuronParameters: initial neuron parameters of each population (network_config.json)
+        @param synParameters: synapses parameters (network_config.json)
+        @param simulationParameters: dict -> simTime, timeStep, networkName, backend, weightRecordPolicy,
+            weightRecordPeriod and resultCacheMaxSize (simulation_config.ini)
+        @param inputSpikes: list of spike times for each neuron of the IN population (cue + cont)
+        @param contentTable: (optional) content table loaded in the memory before the simulation (see preload)
+        """
+        self.cueSize = cueSize
+        self.contSize = contSize
+        self.endianness = endianness
+        self.neuronParameters = neuronParameters
+        self.initNeuronParameters = initNeuronParameters
+        self.synParameters = synParameters
+        self.simulationParameters = simulationParameters
+        self.inputSpikes = inputSpikes
+
+        # + Calculated memory parameters
+        # Input size of DG population (decoder)
+        self.dgInputSize = math.ceil(math.log2(cueSize+1))
+        # Size of CA3 network in number of neurons neccesary to store the cue and content of memories
+        self.networkSize = cueSize + contSize
+        # Size of IN population
+        self.ilInputSize = self.dgInputSize + contSize
+        # Number of neurons for each population
+        self.popNeurons = {"ILayer": self.ilInputSize, "DGLayer": self.dgInputSize, "CA3cueLayer": cueSize,
+                           "CA3contLayer": contSize, "CA1Layer": cueSize, "OLayer": self.ilInputSize}
+
+        # Content loaded before the simulation: table of cue -> content and CA3cue-CA3cont weights at the beginning of the
+        #  simulation (None for an empty memory)
+        self.contentTable = None
+        self.initialWeights = None
+        if contentTable:
+            self.preload(contentTable)
+
+    @classmethod
+    def from_config_files(cls, configFilesPath=None):
+        """
+        Create the memory network of a directory of config files
+
+        @param configFilesPath: (optional) path to the directory of the config files, by default the active one
+        @return: the MemoryNetwork
+        """
+        return cls(**read_network_parameters(configFilesPath))
+
+    def preload(self, contentTable):
+        """
+        Load a content table in the memory: the CA3cue-CA3cont weights begin the simulation in the state learned by the
+        writing of each content (see get_preload_weights), so the writing operations do not need to be simulated. The
+        contents of a previous preload are replaced
+
+        @param contentTable: dict of cue (1 to cueSize) -> content (decimal value or list of contSize bits, most
+            significant bit first)
+        @return: the MemoryNetwork
+        """
+        self.initialWeights = get_preload_weights(contentTable, self.cueSize, self.contSize, self.endianness,
+                                                  self.synParameters)
+        self.contentTable = {int(cue): get_content_bits(content, self.contSize).tolist()
+                             for cue, content in contentTable.items()}
+        return self
+
+    def read_input_spikes(self, fullPath):
+        """
+        Read an input spikes file in the endianness of the memory (see read_input_spikes), only the spikes of the
+        simulation time
+
+        @param fullPath: path + filename to the input_spikes.ini file or to the operation log (.oplog)
+        @return: list of spike times for each neuron of the IN population
+        """
+        return read_input_spikes(fullPath, self.cueSize, self.contSize, self.endianness,
+                                 self.simulationParameters["simTime"])
+
+    # Number of neurons of each population and of synapses of each projection of the network. The sPyBlocks gates are
+    #  counted as one neuron for each gate and one synapse for each gate input: decoder (DG) with a NOT gate for each
+    #  input bit and an AND gate for each of its 2**dgInputSize outputs, set/latch of the ConstantSpikeSource and encoder
+    #  (CA1) with an OR gate for each output bit fed by the CA3cue neurons with that bit set
+    def get_network_size(self):
+        decoderOutputs = 2 ** self.dgInputSize
+        neurons = {"ILayer": self.ilInputSize, "DGLayer": self.dgInputSize + decoderOutputs, "ConstantSpikeSource": 2,
+                   "CA3cueLayer": self.cueSize, "CA3contLayer": self.contSize, "CA1Layer": self.dgInputSize,
+                   "OLayer": self.ilInputSize}
+        synapses = {"IL-DGL": self.dgInputSize + decoderOutputs * self.dgInputSize,
+                    "DGL-CA3cueL": self.cueSize, "IL-CA3contL": self.contSize,
+                    "CA3cueL-CA3contL": self.cueSize * self.contSize,
+                    "CA3cueL-CA1L": sum(bin(cue).count("1") for cue in range(1, self.cueSize + 1)),
+                    "CA1L-OL": self.dgInputSize, "CA3contL-OL": self.contSize}
+        return {"neurons": neurons, "synapses": synapses, "numNeurons": sum(neurons.values()),
+                "numSynapses": sum(synapses.values())}
+
+    # Time stamps where the weights are recorded according to the recording policy of simulation_config.ini
+    #  ("change" policy: after each possible spike of the neurons of the STDP synapses, a CA3cue spike or a CA3cont spike
+    #  caused by the content input or by a CA3cue spike)
+    def get_weight_record_times(self, inputSpikes, simTime):
+        # Time from a cue spike in the input to the CA3cue spike (decoder layers + DG-CA3cue synapse)
+        cueLatency = 3 * self.synParameters["IL-DGL"]["delay"] + self.synParameters["DGL-CA3cueL"]["delay"]
+        cueLatencies = [cueLatency, cueLatency + self.synParameters["CA3cueL-CA3contL"]["delay"]]
+        # Time from a content spike in the input to the CA3cont spike (IL-CA3cont synapse)
+        contLatencies = [self.synParameters["IL-CA3contL"]["delay"]]
+        return tools.get_weight_record_times(self.simulationParameters["weightRecordPolicy"], simTime,
+                                             self.simulationParameters["timeStep"], inputSpikes, self.dgInputSize,
+                                             self.simulationParameters["weightRecordPeriod"], cueLatencies,
+                                             contLatencies)
+
+    # Build and execute the network on SpiNNaker (sPyNNaker + sPyBlocks): weight if record the weight along the simulation
+    #  time and runMetrics the RunMetrics where the time and memory of each phase are recorded
+    def run_spinnaker(self, weight, runMetrics):
+        # Simulator imports only needed by this backend
+        with runMetrics.phase("import simulator"):
+            import spynnaker8 as sim
+            from sPyBlocks.constant_spike_source import ConstantSpikeSource
+            from sPyBlocks.neural_decoder import NeuralDecoder
+            from sPyBlocks.neural_encoder import NeuralEncoder
+
+        ######################################
+        # Simulation parameters
+        ######################################
+        # Setup simulation
+        with runMetrics.phase("sim.setup"):
+            sim.setup(timestep=self.simulationParameters["timeStep"])
+
+        try:
+            ######################################
+            # Create neuron population
+            ######################################
+            with runMetrics.phase("network construction"):
+                # IL
+                ILayer = sim.Population(self.popNeurons["ILayer"], sim.SpikeSourceArray(spike_times=self.inputSpikes), label="ILayer")
+                # CA3cue
+                CA3cueLayer = sim.Population(self.popNeurons["CA3cueLayer"], sim.IF_curr_exp(**self.neuronParameters["CA3cueL"]), label="CA3cueLayer")
+                CA3cueLayer.set(v=self.initNeuronParameters["CA3cueL"]["vInit"])
+                # CA3cont
+                CA3contLayer = sim.Population(self.popNeurons["CA3contLayer"], sim.IF_curr_exp(**self.neuronParameters["CA3contL"]), label="CA3contLayer")
+                CA3contLayer.set(v=self.initNeuronParameters["CA3contL"]["vInit"])
+                # DG (decoder)
+                DGLayer = NeuralDecoder(self.popNeurons["DGLayer"], sim, {"min_delay":self.synParameters["IL-DGL"]["delay"]},
+                                        self.neuronParameters["DGL"], sim.StaticSynapse(weight=self.synParameters["IL-DGL"]["initWeight"],
+                                                          delay=self.synParameters["IL-DGL"]["delay"]))
+                # Necessary for the Decoder
+                constant_spike_source = ConstantSpikeSource(sim, {"min_delay": self.synParameters["IL-DGL"]["delay"]},
+                                                            self.neuronParameters["DGL"],
+                                                            sim.StaticSynapse(weight=self.synParameters["IL-DGL"]["initWeight"],
+                                                                              delay=self.synParameters["IL-DGL"]["delay"]))
+                # CA1 (encoder)
+                CA1Layer = NeuralEncoder(2**self.dgInputSize, sim, {"min_delay":self.synParameters["CA3cueL-CA1L"]["delay"]},
+                                         self.neuronParameters["CA1L"], sim.StaticSynapse(weight=self.synParameters["CA3cueL-CA1L"]["initWeight"],
+                                                          delay=self.synParameters["CA3cueL-CA1L"]["delay"]))
+
+                # OL
+                OLayer = sim.Population(self.popNeurons["OLayer"], sim.IF_curr_exp(**self.neuronParameters["OL"]), label="OLayer")
+                OLayer.set(v=self.initNeuronParameters["OL"]["vInit"])
+
+                ######################################
+                # Create synapses
+                ######################################
+
+                # IL-DG -> 1 to 1, excitatory and static (first self.dgInputSize bits/neurons)
+                DGLayer.connect_inputs(sim.PopulationView(ILayer, range(self.dgInputSize)), ini_pop_indexes=[[i] for i in range(self.dgInputSize)])
+                # DG-CA3cueL -> 1 to 1, excitatory and static
+                DGLayer.connect_outputs(CA3cueLayer, end_pop_indexes=[[i] for i in range(self.cueSize)], and_indexes=range(1, self.cueSize+1),
+                                        conn=sim.StaticSynapse(weight=self.synParameters["DGL-CA3cueL"]["initWeight"],
+                                                               delay=self.synParameters["DGL-CA3cueL"]["delay"]))
+                DGLayer.connect_constant_spikes([constant_spike_source.set_source, constant_spike_source.latch.output_neuron])
+
+                # IL-CA3cont -> 1 to 1, excitatory and static (last m neurons of DG: only the number of directions to use)
+                IL_CA3contL_conn = sim.Projection(sim.PopulationView(ILayer, range(self.dgInputSize, self.ilInputSize, 1)), CA3contLayer, sim.OneToOneConnector(),
+                                                      synapse_type=sim.StaticSynapse(weight=self.synParameters["IL-CA3contL"]["initWeight"],
+                                                                                     delay=self.synParameters["IL-CA3contL"]["delay"]),
+                                                      receptor_type=self.synParameters["IL-CA3contL"]["receptor_type"])
+
+                # CA3cue-CA3cont -> all to all STDP
+                # + Time rule
+                timing_rule = sim.SpikePairRule(tau_plus=self.synParameters["CA3cueL-CA3contL"]["tau_plus"], tau_minus=self.synParameters["CA3cueL-CA3contL"]["tau_minus"],
+                                                A_plus=self.synParameters["CA3cueL-CA3contL"]["A_plus"], A_minus=self.synParameters["CA3cueL-CA3contL"]["A_minus"])
+                # + Weight rule
+                weight_rule = sim.AdditiveWeightDependence(w_max=self.synParameters["CA3cueL-CA3contL"]["w_max"], w_min=self.synParameters["CA3cueL-CA3contL"]["w_min"])
+                # + STDP model
+                stdp_model = sim.STDPMechanism(timing_dependence=timing_rule, weight_dependence=weight_rule,
+                                               weight=self.synParameters["CA3cueL-CA3contL"]["initWeight"], delay=self.synParameters["CA3cueL-CA3contL"]["delay"])
+                # + Create the STDP synapses (with the weights of the content table if the memory is preloaded)
+                if self.initialWeights is None:
+                    CA3cueL_CA3contL_connector = sim.AllToAllConnector(allow_self_connections=True)
+                else:
+                    CA3cueL_CA3contL_connector = sim.FromListConnector(
+                        [(cueNeuron, contNeuron, float(self.initialWeights[cueNeuron, contNeuron]),
+                          self.synParameters["CA3cueL-CA3contL"]["delay"]) for cueNeuron in range(self.cueSize)
+                         for contNeuron in range(self.contSize)], column_names=["weight", "delay"])
+                CA3cueL_CA3contL_conn = sim.Projection(CA3cueLayer, CA3contLayer, CA3cueL_CA3contL_connector, synapse_type=stdp_model)
+
+                # CA3cue-CA1 -> 1 to 1 excitatory and static
+                pop_len = len(CA3cueLayer)
+                input_indexes = range(pop_len)
+                channel_indexes = range(1, CA3cueLayer.size + 1)
+                if len(input_indexes) != len(channel_indexes):
+                    raise ValueError("There is not the same number of elements in input_indexes and channel_indexes")
+                for i in range(pop_len):
+                    i_bin = format(channel_indexes[i], "0" + str(CA1Layer.n_outputs) + 'b')
+                    i_bin_splitted = [j for j in reversed(i_bin)]
+                    connections = [k for k in range(0, len(i_bin_splitted)) if i_bin_splitted[k] == '1']
+                    CA1Layer.connect_inputs(CA3cueLayer, ini_pop_indexes=[input_indexes[i]], or_indexes=connections)
+            
+                # CA1-Output -> 1 to 1 excitatory and static
+                CA1Layer.connect_outputs(sim.PopulationView(OLayer, range(self.dgInputSize)), end_pop_indexes=[[i] for i in range(self.dgInputSize)],
+                                         conn=sim.StaticSynapse(weight=self.synParameters["CA1L-OL"]["initWeight"],
+                                                                delay=self.synParameters["CA1L-OL"]["delay"]))
+
+                # CA3cont-Output -> 1 to 1 excitatory and static
+                CA3contL_OL_conn = sim.Projection(CA3contLayer, sim.PopulationView(OLayer, range(self.dgInputSize, self.ilInputSize, 1)),
+                                                  sim.OneToOneConnector(),
+                                                  synapse_type=sim.StaticSynapse(weight=self.synParameters["CA3contL-OL"]["initWeight"],
+                                                                                 delay=self.synParameters["CA3contL-OL"]["delay"]),
+                                                  receptor_type=self.synParameters["CA3contL-OL"]["receptor_type"])
+
+                ######################################
+                # Parameters to store
+                ######################################
+                CA3cueLayer.record(["spikes", "v"])
+                CA3contLayer.record(["spikes", "v"])
+                OLayer.record(["spikes"])
+                for gate in DGLayer.and_gates.and_array:
+                    gate.output_neuron.record(("spikes"))
+                for gate in CA1Layer.or_gates.or_array:
+                    gate.output_neuron.record(("spikes"))
+
+            ######################################
+            # Execute the simulation
+            ######################################
+            with runMetrics.phase("sim.run"):
+                # The simulation is execute in time intervals to store the weight of synapses if applicable: one run segment
+                #  until each time stamp of the recording policy
+                if weight:
+                    wTimeStamps = self.get_weight_record_times(self.inputSpikes, self.simulationParameters["simTime"])
+                    w_CA3cueL_CA3contL = []
+                    w_CA3cueL_CA3contL.append(CA3cueL_CA3contL_conn.get('weight', format='array'))  # Instante 0
+                    for indexTime in range(1, len(wTimeStamps)):
+                        sim.run(wTimeStamps[indexTime] - wTimeStamps[indexTime - 1])
+                        w_CA3cueL_CA3contL.append(CA3cueL_CA3contL_conn.get('weight', format='array'))
+                    if self.simulationParameters["weightRecordPolicy"] == "change":
+                        w_CA3cueL_CA3contL, wTimeStamps = tools.remove_unchanged_weights(w_CA3cueL_CA3contL, wTimeStamps)
+                else:
+                    sim.run(self.simulationParameters["simTime"])
+
+            ######################################
+            # Retrieve output data
+            ######################################
+            with runMetrics.phase("get_data"):
+                # Get the data from CA3
+                CA3cueData = CA3cueLayer.get_data(variables=["spikes", "v"])
+                CA3contData = CA3contLayer.get_data(variables=["spikes", "v"])
+
+                # Get data from Output
+                OLData = OLayer.get_data(variables=["spikes"])
+
+                # Separate for each type of data (each segment = 1 execution/run)
+                spikesCA3cue = CA3cueData.segments[0].spiketrains
+                vCA3cue = CA3cueData.segments[0].filter(name='v')[0]
+                spikesCA3cont = CA3contData.segments[0].spiketrains
+                vCA3cont = CA3contData.segments[0].filter(name='v')[0]
+                spikesDG = []
+                for gate in DGLayer.and_gates.and_array:
+                    spikesDG.append(gate.output_neuron.get_data(variables=["spikes"]).segments[0].spiketrains[0])
+                spikesCA1 = []
+                for gate in CA1Layer.or_gates.or_array:
+                    spikesCA1.append(gate.output_neuron.get_data(variables=["spikes"]).segments[0].spiketrains[0])
+                spikesOut = OLData.segments[0].spiketrains
+
+        finally:
+            ######################################
+            # End simulation
+            ######################################
+            # The simulator is released even if the construction or the execution of the network fails
+            with runMetrics.phase("sim.end"):
+                sim.end()
+
+        ######################################
+        # Processing the output data
+        ######################################
+        # Format the retrieve data
+        with runMetrics.phase("format_neo_data"):
+            formatData = {"vCA3cue": tools.format_neo_data("v", vCA3cue),
+                          "spikesCA3cue": tools.format_neo_data("spikes", spikesCA3cue),
+                          "vCA3cont": tools.format_neo_data("v", vCA3cont),
+                          "spikesCA3cont": tools.format_neo_data("spikes", spikesCA3cont),
+                          "spikesDG": tools.format_neo_data("spikes", spikesDG),
+                          "spikesCA1": tools.format_neo_data("spikes", spikesCA1),
+                          "spikesOL": tools.format_neo_data("spikes", spikesOut)}
+            if weight:
+                formatData["wCA3cueL_CA3contL"] = w_CA3cueL_CA3contL
+                formatData["wTimeStamps"] = wTimeStamps
+        return formatData
+
+    # Simulate the network with the numpy backend (no SpiNNaker needed): weight if record the weight along the simulation
+    #  time and runMetrics the RunMetrics where the time and memory of each phase are recorded (optional)
+    def run_numpy(self, weight, runMetrics=None):
+        if runMetrics is None:
+            runMetrics = metrics.RunMetrics(self.simulationParameters["networkName"])
+        with runMetrics.phase("import simulator"):
+            import numpy_backend
+        with runMetrics.phase("network construction"):
+            network = numpy_backend.NumpyNetwork(self.cueSize, self.contSize, self.neuronParameters,
+                                                 self.initNeuronParameters, self.synParameters,
+                                                 self.simulationParameters["timeStep"])
+            weightRecordTimes, onlyChanges = self.get_numpy_weight_record(self.inputSpikes,
+                                                                          self.simulationParameters["simTime"])
+        with runMetrics.phase("run"):
+            return network.run(self.inputSpikes, self.simulationParameters["simTime"], weight, weightRecordTimes,
+                               onlyChanges, self.initialWeights)
+
+    # Arguments of the numpy backend to apply the recording policy: time stamps to record (None = every time step) and if
+    #  only keep the snapshots where the weights changed (exact in the numpy backend, it checks every time step)
+    def get_numpy_weight_record(self, inputSpikes, simTime):
+        if self.simulationParameters["weightRecordPolicy"] == "change":
+            return None, True
+        elif self.simulationParameters["weightRecordPolicy"] == "every" and \
+                self.simulationParameters["weightRecordPeriod"] == self.simulationParameters["timeStep"]:
+            return None, False
+        return self.get_weight_record_times(inputSpikes, simTime), False
+
+    # Simulators supported: each one build and run the network (recording the metrics of its phases) and return the
+    #  formatted data recorded
+    backends = {"spinnaker": run_spinnaker, "numpy": run_numpy}
+
+    # Key of the result cache of a simulation: hash of all the parameters that affect the result and the input spikes
+    #  (the weight record parameters only affect it when the weights are recorded)
+    def get_simulation_key(self, weight, backend):
+        ignoredParameters = ["backend", "resultCacheMaxSize", "preloadPath"]
+        if not weight:
+            ignoredParameters += ["weightRecordPolicy", "weightRecordPeriod"]
+        parameters = {"backend": backend, "weight": bool(weight), "cueSize": self.cueSize, "contSize": self.contSize,
+                      "endianness": self.endianness, "neuronParameters": self.neuronParameters,
+                      "initNeuronParameters": self.initNeuronParameters, "synParameters": self.synParameters,
+                      "simulationParameters": {key: value for key, value in self.simulationParameters.items()
+                                               if key not in ignoredParameters},
+                      "contentTable": None if self.contentTable is None else sorted(self.contentTable.items())}
+        return tools.get_result_cache_key(parameters, self.inputSpikes)
+
+    # Execute the simulation and store the parameters in a file: weight if load/store weight along the simulation time,
+    #  backend the simulator used (by default, the one of simulation_config.ini), useCache if return the result of the
+    #  same simulation already stored in data/ (False to force the execution) and printMetrics if print the time and
+    #  memory of each phase. The new results are added to the result cache and the metrics of each phase are stored next
+    #  to them (metrics.METRICS_EXTENSION)
+    def run(self, weight, backend=None, useCache=True, printMetrics=False):
+        if backend is None:
+            backend = self.simulationParameters["backend"]
+        if backend not in self.backends:
+            raise ValueError("Backend not supported. Supported backends: " + ", ".join(self.backends.keys()))
+        tools.check_and_create_folder("data/")
+        cacheKey = self.get_simulation_key(weight, backend)
+        if useCache:
+            cachedResult = tools.get_cached_result("data/", cacheKey)
+            if cachedResult is not None:
+                print("Data already simulated, stored in: " + cachedResult[0])
+                return cachedResult
+
+        ######################################
+        # Execute the simulation
+        ######################################
+        runMetrics = metrics.RunMetrics(self.simulationParameters["networkName"] + " (" + backend + ")")
+        with runMetrics.phase("simulation"):
+            formatData = self.backends[backend](self, weight, runMetrics)
+
+        ######################################
+        # Store the output data
+        ######################################
+        with runMetrics.phase("create_data_out"):
+            dataOut = self.create_data_out(formatData, self.inputSpikes, weight)
+        with runMetrics.phase("write_result"):
+            fullPath, filename = tools.write_result_with_stamp("data/", self.simulationParameters["networkName"],
+                                                               dataOut)
+        print("Data stored in: " + fullPath)
+        runMetrics.save(fullPath)
+        if printMetrics:
+            print("\n".join(runMetrics.get_summary()))
+        removedPaths = tools.add_cached_result("data/", cacheKey, fullPath, filename,
+                                               self.simulationParameters["resultCacheMaxSize"] * 1024 * 1024)
+        for removedPath in removedPaths:
+            print("Old data removed from the result cache: " + removedPath)
+            if os.path.isfile(metrics.get_metrics_path(removedPath)):
+                os.remove(metrics.get_metrics_path(removedPath))
+        return fullPath, filename
+
+    # Simulate K independent copies of the network (one for each input spike set) in a single vectorized run of the
+    #  numpy backend: weight if record the weight along the simulation time, simTime the duration of the simulation (by
+    #  default, the one of simulation_config.ini) and isSave if store each result in a file. Return the K dataOut records
+    def run_batch(self, inputSpikesBatch, weight, simTime=None, isSave=False):
+        import numpy_backend
+        if simTime is None:
+            simTime = self.simulationParameters["simTime"]
+        network = numpy_backend.NumpyNetwork(self.cueSize, self.contSize, self.neuronParameters, self.initNeuronParameters,
+                                             self.synParameters, self.simulationParameters["timeStep"])
+        weightRecordTimes, onlyChanges = self.get_numpy_weight_record(inputSpikesBatch[0], simTime)
+        if self.simulationParameters["weightRecordPolicy"] == "boundaries":
+            # Each copy has its own operations: record the boundaries of all of them and keep only the own ones below
+            weightRecordTimes = sorted(set(stamp for inputSpikes in inputSpikesBatch
+                                           for stamp in self.get_weight_record_times(inputSpikes, simTime)))
+        formatDataBatch = network.run_batch(inputSpikesBatch, simTime, weight, weightRecordTimes, onlyChanges,
+                                            self.initialWeights)
+        dataOutBatch = []
+        for indexBatch, formatData in enumerate(formatDataBatch):
+            if weight and self.simulationParameters["weightRecordPolicy"] == "boundaries":
+                ownTimes = set(self.get_weight_record_times(inputSpikesBatch[indexBatch], simTime))
+                keepIndexes = [index for index, stamp in enumerate(formatData["wTimeStamps"]) if stamp in ownTimes]
+                formatData["wCA3cueL_CA3contL"] = formatData["wCA3cueL_CA3contL"][keepIndexes]
+                formatData["wTimeStamps"] = [formatData["wTimeStamps"][index] for index in keepIndexes]
+            dataOut = self.create_data_out(formatData, inputSpikesBatch[indexBatch], weight, simTime)
+            dataOutBatch.append(dataOut)
+            if isSave:
+                tools.check_and_create_folder("data/")
+                fullPath, filename = tools.write_result_with_stamp("data/", self.simulationParameters["networkName"] +
+                                                                   "_batch" + str(indexBatch), dataOut)
+                print("Data stored in: " + fullPath)
+        return dataOutBatch
+
+    # Create the dictionary with all the information and headers of a simulation from the formatted data of a backend
+    def create_data_out(self, formatData, inputSpikes, weight, simTime=None):
+        if simTime is None:
+            simTime = self.simulationParameters["simTime"]
+        formatVCA3cue = formatData["vCA3cue"]
+        formatSpikesCA3cue = formatData["spikesCA3cue"]
+        formatVCA3cont = formatData["vCA3cont"]
+        formatSpikesCA3cont = formatData["spikesCA3cont"]
+        if weight:
+            formatWeightCA3cueL_CA3contL = tools.format_neo_data("weights", formatData["wCA3cueL_CA3contL"],
+                                                               {"simTime": simTime,
+                                                                "timeStep": self.simulationParameters["timeStep"],
+                                                                "timeStamps": formatData["wTimeStamps"]})
+        formatSpikeDG = formatData["spikesDG"]
+        formatSpikeCA1 = formatData["spikesCA1"]
+        formatSpikeOut = formatData["spikesOL"]
+
+        # Show some of the data
+        # print("Spikes Input = " + str(inputSpikes) + "\n")
+        # print("Spikes DG = " + str(formatSpikeDG) + "\n")
+        # print("V CA3cueLayer = " + str(formatVCA3cue) + "\n")
+        # print("Spikes CA3cueLayer = " + str(formatSpikesCA3cue) + "\n")
+        # print("V CA3contLayer = " + str(formatVCA3cont) + "\n")
+        # print("Spikes CA3contLayer = " + str(formatSpikesCA3cont) + "\n")
+        # print("Weight CA3cueL-CA3contL = " + str(formatWeightCA3cueL_CA3contL) + "\n")
+        # print("Spikes CA1 = " + str(formatSpikeCA1) + "\n")
+        # print("Spikes Out = " + str(formatSpikeOut) + "\n")
+
+        # Create a dictionary with all the information and headers
+        dataOut = {"networkName": self.simulationParameters["networkName"], "timeStep": self.simulationParameters["timeStep"],
+                   "simTime": simTime, "synParameters": self.synParameters,
+                   "neuronParameters": self.neuronParameters, "initNeuronParameters": self.initNeuronParameters,
+                   "cueSize": self.cueSize, "contSize": self.contSize, "endianness": self.endianness, "variables": []}
+        dataOut["variables"].append(
+            {"type": "spikes", "popName": "CA3cue Layer", "popNameShort": "CA3cueL", "numNeurons": self.popNeurons["CA3cueLayer"],
+             "data": formatSpikesCA3cue})
+        dataOut["variables"].append(
+            {"type": "v", "popName": "CA3cue Layer", "popNameShort": "CA3cueL", "numNeurons": self.popNeurons["CA3cueLayer"],
+             "data": formatVCA3cue})
+        dataOut["variables"].append(
+            {"type": "spikes", "popName": "CA3cont Layer", "popNameShort": "CA3contL", "numNeurons": self.popNeurons["CA3contLayer"],
+             "data": formatSpikesCA3cont})
+        dataOut["variables"].append(
+            {"type": "v", "popName": "CA3cont Layer", "popNameShort": "CA3contL", "numNeurons": self.popNeurons["CA3contLayer"],
+             "data": formatVCA3cont})
+        if weight:
+            dataOut["variables"].append({"type": "w", "popName": "CA3cueL-CA3contL", "popNameShort": "CA3cueL-CA3contL",
+                                         "data": formatWeightCA3cueL_CA3contL})
+        dataOut["variables"].append(
+            {"type": "spikes", "popName": "DG Layer", "popNameShort": "DGL", "numNeurons": self.popNeurons["DGLayer"],
+             "data": formatSpikeDG})
+        dataOut["variables"].append(
+            {"type": "spikes", "popName": "Input Layer", "popNameShort": "IL", "numNeurons": self.popNeurons["ILayer"],
+             "data": inputSpikes})
+        dataOut["variables"].append(
+            {"type": "spikes", "popName": "CA1 Layer", "popNameShort": "CA1L", "numNeurons": self.popNeurons["CA1Layer"],
+             "data": formatSpikeCA1})
+        dataOut["variables"].append(
+            {"type": "spikes", "popName": "Output Layer", "popNameShort": "OL", "numNeurons": self.popNeurons["OLayer"],
+             "data": formatSpikeOut})
+        return dataOut
+
+# Memory network of the active config files, created the first time it is used
+defaultNetwork = None
+
+
+def get_default_network():
+    """
+    Get the memory network of the active config files (created and cached the first time it is called)
+
+    @return: the MemoryNetwork
+    """
+    global defaultNetwork
+    if defaultNetwork is None:
+        defaultNetwork = MemoryNetwork.from_config_files()
+    return defaultNetwork
+
+
+# Execute the simulation of the network of the active config files and store the result in a file (see
+#  MemoryNetwork.run)
+def main(weight, backend=None, useCache=True, printMetrics=False):
+    return get_default_network().run(weight, backend, useCache, printMetrics)
+
+
+# Simulate K independent copies of the network of the active config files in a single run of the numpy backend (see
+#  MemoryNetwork.run_batch)
+def main_batch(inputSpikesBatch, weight, simTime=None, isSave=False):
+    return get_default_network().run_batch(inputSpikesBatch, weight, simTime, isSave)
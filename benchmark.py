@@ -0,0 +1,321 @@
+import os
+import sys
+import copy
+import math
+import json
+import time
+import tempfile
+import statistics
+import matplotlib
+import numpy as np
+import config_loader
+import memory_testbench
+import plot
+import tools
+import trace_table
+import DG_CA3_CA1_one_hot
+import test_DG_CA3_CA1_one_hot
+from spike_index import SpikeIndex
+
+"""
+Micro-benchmarks of the data processing pipeline
+
+Each benchmark times one function of the pipeline (formatting of the recorded data, ordering and formatting of the
+spikes, txt/excel tables, spike plot and testbench generators) over the result of a random sequence of operations whose
+size is set by cueSize, contSize, simTime and density (probability of each bit of the content of a write being 1). The
+results are stored as json and compared against a baseline, so a change in the performance of the pipeline can be
+measured and detected
+"""
+
+
+class SyntheticSignal:
+    """
+    Class used as synthetic neo data: it returns its values through as_array, as the neo signals and spike trains
+    """
+
+    def __init__(self, values):
+        """
+        Init an object of type SyntheticSignal
+
+        @param values: numpy array with the values of the signal
+        """
+        self.values = values
+
+    def as_array(self):
+        """
+        Get a copy of the values of the signal
+
+        @return: numpy array
+        """
+        return self.values.copy()
+
+
+def generate_synthetic_input_spikes(cueSize, contSize, simTime, density, operationTimes, generator):
+    """
+    Generate the input spikes of a random sequence of operations that fills the simulation time: each operation is a
+    write or a read (same probability) of a random cue, and each bit of the content written is 1 with probability density
+
+    @param cueSize: number of cues of the memory
+    @param contSize: size of the content of the memory (number of bits)
+    @param simTime: duration of the simulation in ms
+    @param density: probability of each bit of the content of a write operation being 1 (spike)
+    @param operationTimes: dict -> "readingOperationTime", "readingOperationDataHolding", "writingOperationTime" and
+        "writingOperationDataHolding" (see the testbench parameters)
+    @param generator: numpy random generator
+    @return: list of spike times for each neuron of the IN population (cue + cont)
+    """
+    cueSizeInBin = math.ceil(math.log2(cueSize + 1))
+    operationTime = [operationTimes["writingOperationTime"], operationTimes["readingOperationTime"]]
+    holdingTime = [operationTimes["writingOperationDataHolding"], operationTimes["readingOperationDataHolding"]]
+    # Operations (0 = write and 1 = read) while the last one ends before the end of the simulation
+    numOperations = max(int((simTime - 1) // max(operationTime)), 1)
+    operations = generator.integers(0, 2, numOperations).tolist()
+    binaryCue = memory_testbench.format_cue_vectors(
+        memory_testbench.decimal_to_binary_list(generator.integers(1, cueSize + 1, numOperations).tolist()), cueSizeInBin)
+    binaryCont = (generator.random((numOperations, contSize)) < density).astype(int).tolist()
+    cue, cont, currentOperationTime, numOperations = memory_testbench.create_input_vector_from_operations(
+        [[] for i in range(contSize)], [[] for i in range(cueSizeInBin)], operations, binaryCont, binaryCue, 1,
+        operationTime, holdingTime, 0)
+    return cue + cont
+
+
+def generate_synthetic_result(cueSize, contSize, simTime, density, networkParameters, operationTimes, savePath,
+                              colors, seed=None):
+    """
+    Generate the result of a simulation of a random sequence of operations (numpy backend, weights recorded) and open
+    it as the processing of test_DG_CA3_CA1_one_hot does
+
+    @param cueSize: number of cues of the memory
+    @param contSize: size of the content of the memory (number of bits)
+    @param simTime: duration of the simulation in ms
+    @param density: probability of each bit of the content of a write operation being 1 (spike)
+    @param networkParameters: parameters of the memory (see DG_CA3_CA1_one_hot.read_network_parameters), the size,
+        simulation time and input spikes are replaced
+    @param operationTimes: times of the operations (see generate_synthetic_input_spikes)
+    @param savePath: path where the result bundle is stored
+    @param colors: dict, color of each population (label) in the plots
+    @param seed: (optional) seed of the random generator
+    @return: processing context of the result (see test_DG_CA3_CA1_one_hot.get_processing_context) and the neo data
+        of the recorded variables, as the simulator returns them: "vStream" (membrane potential of CA3cont),
+        "spikesStream" (spike trains of CA3cont), "weightsStream" (CA3cue-CA3cont weight snapshots) and
+        "timeStreamParam" (temporal parameters of the weights)
+    """
+    generator = np.random.default_rng(seed)
+    parameters = copy.deepcopy(networkParameters)
+    parameters.update({"cueSize": cueSize, "contSize": contSize, "endianness": "big_endian", "contentTable": None,
+                       "inputSpikes": generate_synthetic_input_spikes(cueSize, contSize, simTime, density,
+                                                                      operationTimes, generator)})
+    parameters["simulationParameters"].update({"simTime": simTime, "networkName": "benchmark"})
+    network = DG_CA3_CA1_one_hot.MemoryNetwork(**parameters)
+    formatData = network.run_numpy(True)
+    fullPath, filename = tools.write_result(savePath, "benchmark", network.create_data_out(formatData,
+                                                                                           network.inputSpikes, True))
+    context = test_DG_CA3_CA1_one_hot.get_processing_context(fullPath, True, colors)
+    return dict(context, vStream=SyntheticSignal(np.asarray(formatData["vCA3cont"]).T),
+                spikesStream=[SyntheticSignal(np.asarray(spikeTimes)) for spikeTimes in formatData["spikesCA3cont"]],
+                weightsStream=formatData["wCA3cueL_CA3contL"],
+                timeStreamParam={"simTime": simTime, "timeStep": network.simulationParameters["timeStep"],
+                                 "timeStamps": formatData["wTimeStamps"]})
+
+
+def get_benchmarks(result, testParameters, testbenchParameters, numOperations, savePath):
+    """
+    Get the benchmarks of the pipeline over a synthetic result
+
+    @param result: synthetic result (see generate_synthetic_result)
+    @param testParameters: test parameters (see config_loader.read_test_parameters), used for the tables and the plot
+    @param testbenchParameters: testbench parameters (see config_loader.read_testbench_parameters), used for the
+        testbench generators
+    @param numOperations: number of operations of the random testbench
+    @param savePath: path where the benchmarks store the files they create
+    @return: dict of name -> (setup, function): setup (None or function executed before each repetition, not timed)
+        and function (the code timed)
+    """
+    spikesInfo, timeStream, spikeIndex = result["spikesInfo"], result["timeStream"], result["spikeIndex"]
+    numCueBinaryNeuron, cueSize, contSize = result["numCueBinaryNeuron"], result["data"]["cueSize"], result["data"]["contSize"]
+    excelColors = dict(zip(testParameters["excelColorsPopName"], testParameters["excelColorsPopType"]))
+    operationTimes = [testbenchParameters["readingOperationTime"], testbenchParameters["readingOperationDataHolding"],
+                      testbenchParameters["writingOperationTime"], testbenchParameters["writingOperationDataHolding"]]
+
+    # The trace table is computed once and cached for each result: it is discarded so each repetition computes it
+    def clear_trace_table_cache():
+        trace_table.traceTableCache.clear()
+
+    def set_random_seed():
+        np.random.seed(0)
+
+    return {"format_v_stream": (None, lambda: tools.format_v_stream(result["vStream"])),
+            "format_spike_stream": (None, lambda: tools.format_spike_stream(result["spikesStream"])),
+            "format_weight_stream": (None, lambda: tools.format_weight_stream(
+                result["weightsStream"], result["timeStreamParam"])),
+            "SpikeIndex": (None, lambda: SpikeIndex(spikesInfo, timeStream)),
+            "get_spikes_per_timestamp": (None, lambda: tools.get_spikes_per_timestamp(
+                spikesInfo, timeStream, numCueBinaryNeuron, contSize, "little_endian", False, spikeIndex=spikeIndex)),
+            "get_format_spike_info": (None, lambda: tools.get_format_spike_info(
+                spikesInfo, timeStream, numCueBinaryNeuron, cueSize, contSize, "little_endian", False, False, True,
+                spikeIndex=spikeIndex)),
+            "generate_table_txt": (clear_trace_table_cache, lambda: plot.generate_table_txt(
+                spikesInfo, timeStream, numCueBinaryNeuron, cueSize, contSize, "little_endian", True, False, savePath,
+                "benchmark", testParameters["headers"], testParameters["boxTableSize"], spikeIndex=spikeIndex)),
+            "generate_table_excel": (clear_trace_table_cache, lambda: plot.generate_table_excel(
+                spikesInfo, timeStream, numCueBinaryNeuron, cueSize, contSize, "little_endian", True, False, savePath,
+                "benchmark", result["data"]["simTime"], excelColors, testParameters["orientationFormat"],
+                testParameters["headers"], testParameters["boxTableSize"], spikeIndex=spikeIndex)),
+            "plot_spike_sequence": (None, lambda: plot.plot_spike_sequence(
+                spikesInfo, timeStream, numCueBinaryNeuron, contSize, testParameters["spikeAmplitude"],
+                testParameters["marginAddLim"], testParameters["fontsize"], testParameters["figSize"], "Benchmark",
+                False, True, "benchmark_spikes", savePath, spikeIndex=spikeIndex)),
+            "tb_piramidal_sequence": (None, lambda: memory_testbench.tb_piramidal_sequence(
+                cueSize, contSize, numCueBinaryNeuron, *operationTimes)),
+            "tb_piramidal_reinforced": (None, lambda: memory_testbench.tb_piramidal_reinforced(
+                cueSize, contSize, numCueBinaryNeuron, *operationTimes)),
+            "tb_stress_reinforced": (None, lambda: memory_testbench.tb_stress_reinforced(
+                cueSize, contSize, numCueBinaryNeuron, *operationTimes)),
+            "tb_random_operations": (set_random_seed, lambda: memory_testbench.tb_random_operations(
+                cueSize, contSize, numCueBinaryNeuron, *operationTimes, numOperations))}
+
+
+def time_benchmark(setup, function, repeat, minTime=0.1):
+    """
+    Time a benchmark: in each repetition the function is executed as many times as needed to reach minTime (the short
+    benchmarks are too noisy with a single execution) and its time is the mean of the executions
+
+    @param setup: None or function executed before each execution (not timed)
+    @param function: code timed
+    @param repeat: number of repetitions
+    @param minTime: (optional) min time in s of the executions of each repetition
+    @return: dict -> "min", "median" and "mean" wall time of an execution in the repetitions in s, "repeat" and
+        "executions" (total number of executions)
+    """
+    times = []
+    numExecutions = 0
+    for indexRepeat in range(repeat):
+        totalTime = 0.0
+        numRepeatExecutions = 0
+        while totalTime < minTime or numRepeatExecutions == 0:
+            if setup is not None:
+                setup()
+            beginTime = time.perf_counter()
+            function()
+            totalTime = totalTime + time.perf_counter() - beginTime
+            numRepeatExecutions = numRepeatExecutions + 1
+        times.append(totalTime / numRepeatExecutions)
+        numExecutions = numExecutions + numRepeatExecutions
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.mean(times), "repeat": repeat,
+            "executions": numExecutions}
+
+
+def run_benchmarks(config, networkParameters, testParameters, testbenchParameters, names=None):
+    """
+    Generate the synthetic result of a configuration and time the benchmarks over it
+
+    @param config: dict -> "cueSize", "contSize", "simTime", "density", "numOperations", "repeat" and "seed"
+    @param networkParameters: parameters of the memory (see DG_CA3_CA1_one_hot.read_network_parameters)
+    @param testParameters: test parameters (see config_loader.read_test_parameters)
+    @param testbenchParameters: testbench parameters (see config_loader.read_testbench_parameters)
+    @param names: (optional) names of the benchmarks to execute, all by default
+    @return: dict -> "config", "date" and "results" (name of the benchmark -> timing, see time_benchmark)
+    """
+    # The plots are only stored, never shown
+    matplotlib.use("Agg")
+    colors = dict(zip(testParameters["colorsPopName"], testParameters["colorsPopType"]))
+    results = {}
+    with tempfile.TemporaryDirectory() as savePath:
+        result = generate_synthetic_result(config["cueSize"], config["contSize"], config["simTime"], config["density"],
+                                           networkParameters, testbenchParameters, savePath + "/", colors, config["seed"])
+        benchmarks = get_benchmarks(result, testParameters, testbenchParameters, config["numOperations"],
+                                    savePath + "/")
+        for name in (names if names else benchmarks.keys()):
+            if name not in benchmarks:
+                raise ValueError("Benchmark not supported. Supported benchmarks: " + ", ".join(benchmarks.keys()))
+            results[name] = time_benchmark(*benchmarks[name], config["repeat"])
+            print(name + ": " + "{:.6f}".format(results[name]["min"]) + " s")
+        test_DG_CA3_CA1_one_hot.processingContexts.clear()
+    return {"config": config, "date": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}
+
+
+def compare_with_baseline(record, baseline, threshold):
+    """
+    Compare the min time of each benchmark with the one of the baseline
+
+    @param record: benchmark record (see run_benchmarks)
+    @param baseline: benchmark record used as reference, of the same configuration
+    @param threshold: ratio (time / baseline time) from which a benchmark is a regression (and 1 / threshold an
+        improvement)
+    @return: dict of name -> {"baseline", "time", "ratio", "status" ("regression", "improvement", "ok" or "new")}
+    """
+    comparison = {}
+    for name, timing in record["results"].items():
+        if name not in baseline["results"]:
+            comparison[name] = {"baseline": None, "time": timing["min"], "ratio": None, "status": "new"}
+            continue
+        baselineTime = baseline["results"][name]["min"]
+        ratio = timing["min"] / baselineTime if baselineTime > 0 else float("inf")
+        status = "regression" if ratio > threshold else "improvement" if ratio < 1 / threshold else "ok"
+        comparison[name] = {"baseline": baselineTime, "time": timing["min"], "ratio": ratio, "status": status}
+    return comparison
+
+
+def format_comparison_table(comparison):
+    """
+    Create a text table with the comparison of each benchmark against the baseline
+
+    @param comparison: comparison of the benchmarks (see compare_with_baseline)
+    @return: list of lines of the table
+    """
+    headers = ["benchmark", "baseline (s)", "time (s)", "ratio", "status"]
+    rows = []
+    for name, values in comparison.items():
+        rows.append([name, "-" if values["baseline"] is None else "{:.6f}".format(values["baseline"]),
+                     "{:.6f}".format(values["time"]), "-" if values["ratio"] is None else "{:.2f}".format(values["ratio"]),
+                     values["status"]])
+    widths = [max(len(row[index]) for row in rows + [headers]) for index in range(len(headers))]
+    lines = ["  ".join(header.ljust(widths[index]) for index, header in enumerate(headers)).rstrip()]
+    for row in rows:
+        lines.append("  ".join(value.ljust(widths[index]) for index, value in enumerate(row)).rstrip())
+    return lines
+
+
+if __name__ == "__main__":
+    # Read the config files: active config file directory, benchmark, network, test and testbench parameters
+    activeConfigFilePath = config_loader.get_active_config_path()
+    networkParameters = DG_CA3_CA1_one_hot.read_network_parameters(activeConfigFilePath)
+    benchmarkParameters = config_loader.read_benchmark_parameters(activeConfigFilePath)
+    testParameters = config_loader.read_test_parameters(activeConfigFilePath)
+    testbenchParameters = config_loader.read_testbench_parameters(activeConfigFilePath)
+
+    # + Size of the synthetic data: memory size, simulation time, spike density and operations of the random testbench
+    config = {key: benchmarkParameters[key] for key in ["cueSize", "contSize", "simTime", "density", "numOperations",
+                                                        "repeat", "seed"]}
+    # + Benchmarks to execute ([] for all of them)
+    names = benchmarkParameters["benchmarks"]
+    # + Path to store the results, baseline file, ratio to flag a regression and if store the results as the new baseline
+    benchmarkSavePath = benchmarkParameters["benchmarkSavePath"]
+    baselinePath = benchmarkParameters["baselinePath"]
+    regressionThreshold = benchmarkParameters["regressionThreshold"]
+    updateBaseline = benchmarkParameters["updateBaseline"]
+
+    record = run_benchmarks(config, networkParameters, testParameters, testbenchParameters, names)
+    tools.check_and_create_folder(benchmarkSavePath)
+    recordPath = benchmarkSavePath + "benchmark_" + time.strftime("%Y_%m_%d__%H_%M_%S") + ".json"
+
+    # Compare against the baseline of the same configuration
+    numRegressions = 0
+    baseline = tools.read_json(baselinePath) if os.path.isfile(baselinePath) else None
+    if baseline and baseline["config"] == config:
+        record["baseline"] = baselinePath
+        record["comparison"] = compare_with_baseline(record, baseline, regressionThreshold)
+        print("\n".join(format_comparison_table(record["comparison"])))
+        numRegressions = len([name for name, values in record["comparison"].items() if values["status"] == "regression"])
+    elif baseline:
+        print("The baseline " + baselinePath + " has another configuration, it is not compared")
+    with open(recordPath, "w") as file:
+        json.dump(record, file, indent=4)
+    print("Results stored in: " + recordPath)
+    if updateBaseline or not baseline:
+        with open(baselinePath, "w") as file:
+            json.dump({"config": record["config"], "date": record["date"], "results": record["results"]}, file, indent=4)
+        print("Baseline stored in: " + baselinePath)
+    if numRegressions:
+        print(str(numRegressions) + " benchmarks slower than the baseline (x" + "{:g}".format(regressionThreshold) + ")")
+        sys.exit(1)
@@ -0,0 +1,388 @@
+import os
+import ast
+import json
+import math
+import hashlib
+import configparser
+
+"""
+Config files loader
+
+Each value of the ini files is a python literal (number, string, bool, None, list, tuple or dict) parsed without executing
+any code and checked against the schema of its section: for each parameter, its type(s), its default value (REQUIRED if
+it has no default) and, optionally, the values allowed. The input spikes files are also checked against the size of the
+memory and their parsed spikes are cached (in memory and in a file of INPUT_SPIKES_CACHE_PATH) by modification time and
+content hash
+"""
+
+# Mark of the parameters without default value
+REQUIRED = object()
+NUMBER = (int, float)
+
+# Schemas of the sections of the config files: parameter -> (types, default value[, values allowed])
+CONFIG_FILE_PARAMETERS = {"activeConfigFiles": (str, REQUIRED)}
+MEMORY_PARAMETERS = {"cueSize": (int, REQUIRED), "contSize": (int, REQUIRED),
+                     "endianness": (str, REQUIRED, ["little_endian", "big_endian"])}
+SIMULATION_PARAMETERS = {"simTime": (NUMBER, REQUIRED), "timeStep": (NUMBER, REQUIRED), "networkName": (str, REQUIRED),
+                         "backend": (str, "spinnaker", ["spinnaker", "numpy"]),
+                         "weightRecordPolicy": (str, "every", ["every", "boundaries", "change"]),
+                         "weightRecordPeriod": (NUMBER, 1), "resultCacheMaxSize": (NUMBER, 1024),
+                         "preloadPath": (str, "")}
+TEST_PARAMETERS = {"isPlotShow": (bool, REQUIRED), "isPlotSave": (bool, REQUIRED), "baseSavePath": (str, REQUIRED),
+                   "allTimeStampInTrace": (bool, REQUIRED), "executeSim": (bool, REQUIRED),
+                   "recordWeight": (bool, REQUIRED), "useResultCache": (bool, True),
+                   "printMetrics": (bool, False), "fullPathFile": (str, REQUIRED),
+                   "saveFileName": (str, REQUIRED), "colorsPopName": (list, REQUIRED), "colorsPopType": (list, REQUIRED),
+                   "spikeAmplitude": (NUMBER, REQUIRED), "marginAddLim": (NUMBER, REQUIRED),
+                   "fontsize": (NUMBER, REQUIRED), "figSize": ((tuple, list), REQUIRED),
+                   "figSpikeTitle": (str, REQUIRED), "figWeightTitle": (str, REQUIRED),
+                   "weightPlotStyle": (str, "heatmap", ["heatmap", "3d", "both"]), "weightNumWindows": (int, 16),
+                   "orientationFormat": (str, REQUIRED, ["vertical", "horizontal"]),
+                   "excelColorsPopName": (list, REQUIRED), "excelColorsPopType": (list, REQUIRED),
+                   "headers": (list, REQUIRED), "boxTableSize": (NUMBER, REQUIRED), "numWorkers": (int, 1)}
+TESTBENCH_PARAMETERS = {"tbPath": (str, REQUIRED), "readingOperationTime": (NUMBER, REQUIRED),
+                        "writingOperationTime": (NUMBER, REQUIRED), "readingOperationDataHolding": (NUMBER, REQUIRED),
+                        "writingOperationDataHolding": (NUMBER, REQUIRED), "numberOfOperations": (int, REQUIRED),
+                        "workloadFormat": (str, "ini", ["ini", "oplog"]),
+                        "batchNumWorkers": (int, os.cpu_count() or 1)}
+SWEEP_PARAMETERS = {"searchType": (str, "grid", ["grid", "random"]), "searchSpace": (dict, REQUIRED),
+                    "numRandomPoints": (int, 20), "randomSeed": ((int, type(None)), None),
+                    "inputSpikesPath": (str, ""), "simTime": ((int, float, type(None)), None), "numWorkers": (int, 1),
+                    "sweepSavePath": (str, "sweep/")}
+BENCHMARK_PARAMETERS = {"cueSize": (int, 5), "contSize": (int, 10), "simTime": (NUMBER, 1000), "density": (NUMBER, 0.05),
+                        "numOperations": (int, 200), "repeat": (int, 5), "seed": (int, 0), "benchmarks": (list, []),
+                        "benchmarkSavePath": (str, "benchmark/"), "baselinePath": (str, "benchmark/baseline.json"),
+                        "regressionThreshold": (NUMBER, 1.5), "updateBaseline": (bool, False)}
+SCALING_PARAMETERS = {"cueSizes": (list, [7, 15, 31, 63, 127]), "contSizes": (list, [10, 100]),
+                      "operationsPerCue": (NUMBER, 2), "repeat": (int, 1), "backend": (str, "numpy", ["spinnaker", "numpy"]),
+                      "recordWeight": (bool, True), "weightRecordPolicy": (str, "change", ["every", "boundaries", "change"]),
+                      "dominanceShare": (NUMBER, 0.5), "scalingSavePath": (str, "benchmark/")}
+WORKLOAD_PARAMETERS = {"pattern": (str, "mixed", ["mixed", "overwrite", "read_after_write", "trace"]),
+                       "numOperations": (int, 100000), "chunkSize": (int, 10000), "readRatio": (NUMBER, 0.5),
+                       "cueDistribution": (str, "uniform", ["uniform", "zipf", "hotset"]), "zipfExponent": (NUMBER, 1.0),
+                       "hotsetFraction": (NUMBER, 0.1), "hotsetProbability": (NUMBER, 0.9),
+                       "arrival": (str, "closed", ["closed", "bursty", "trace"]), "burstSize": (NUMBER, 10),
+                       "burstGap": (NUMBER, 100), "readAfterWriteDistance": (int, 0), "tracePath": (str, ""),
+                       "seed": ((int, type(None)), None), "workloadSavePath": (str, "tb/")}
+
+# Parsed input spikes files: full path -> (modification time, content hash, cue spikes, cont spikes)
+inputSpikesCache = {}
+# Folder of the files with the parsed spikes of each input spikes file (named by the hash of its full path)
+INPUT_SPIKES_CACHE_PATH = "data/input_spikes_cache/"
+
+
+def parse_value(text, name):
+    """
+    Parse the value of a parameter of a config file: a python literal, without executing any code
+
+    @param text: text of the value in the config file
+    @param name: name of the parameter (for the error messages)
+    @return: value of the parameter
+    """
+    try:
+        return ast.literal_eval(text.strip())
+    except (ValueError, SyntaxError) as e:
+        raise ValueError("The value of " + name + " is not a valid literal: " + text.strip()) from e
+
+
+def check_value(value, name, schema):
+    """
+    Check that the value of a parameter has the type and one of the values allowed by its schema
+
+    @param value: value of the parameter
+    @param name: name of the parameter (for the error messages)
+    @param schema: (types, default value[, values allowed])
+    @return: the value (int values are accepted where float values are expected)
+    """
+    types = schema[0] if isinstance(schema[0], tuple) else (schema[0],)
+    # bool is a subclass of int, but a bool is not a valid number
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+        raise ValueError("The parameter " + name + " must be of type " + " or ".join(t.__name__ for t in types) +
+                         ", not " + type(value).__name__)
+    if len(schema) > 2 and value not in schema[2]:
+        raise ValueError("The parameter " + name + " must be one of " + ", ".join(str(v) for v in schema[2]) +
+                         ", not " + str(value))
+    return value
+
+
+def read_section(fullPath, section, schema):
+    """
+    Read and check a section of a config file: all the parameters of the schema are returned, with their default value if
+    they are not in the file
+
+    @param fullPath: path + filename to the config file
+    @param section: name of the section
+    @param schema: dict of parameter -> (types, default value[, values allowed])
+    @return: dict of parameter -> value
+    """
+    config = configparser.ConfigParser()
+    # Keep the case of the parameter names
+    config.optionxform = str
+    if not config.read(fullPath):
+        raise FileNotFoundError("The config file " + fullPath + " does not exist")
+    if section not in config:
+        raise ValueError("The config file " + fullPath + " has no section " + section)
+    parameters = {}
+    for name, parameterSchema in schema.items():
+        if name in config[section]:
+            value = parse_value(config[section][name], section + "." + name)
+        elif parameterSchema[1] is REQUIRED:
+            raise ValueError("The parameter " + section + "." + name + " is missing in " + fullPath)
+        else:
+            value = parameterSchema[1]
+        parameters[name] = check_value(value, section + "." + name, parameterSchema)
+    return parameters
+
+
+def get_active_config_path():
+    """
+    Get the directory of the active config files (configFileParameters.ini)
+
+    @return: path to the directory of the active config files
+    """
+    parameters = read_section("config_files/configFileParameters.ini", "configFileParameters", CONFIG_FILE_PARAMETERS)
+    return "config_files/" + parameters["activeConfigFiles"] + "/"
+
+
+def read_memory_parameters(configFilesPath):
+    """
+    Read the parameters of the memory (memory_config.ini)
+
+    @param configFilesPath: path to the directory of the config files
+    @return: dict -> cueSize, contSize and endianness
+    """
+    parameters = read_section(configFilesPath + "memory_config.ini", "memory", MEMORY_PARAMETERS)
+    if parameters["cueSize"] < 1 or parameters["contSize"] < 1:
+        raise ValueError("The cueSize and contSize of the memory must be greater than 0")
+    return parameters
+
+
+def read_simulation_parameters(configFilesPath):
+    """
+    Read the parameters of the simulation (simulationParameters section of simulation_config.ini)
+
+    @param configFilesPath: path to the directory of the config files
+    @return: dict -> simTime, timeStep, networkName, backend, weightRecordPolicy, weightRecordPeriod,
+        resultCacheMaxSize and preloadPath
+    """
+    parameters = read_section(configFilesPath + "simulation_config.ini", "simulationParameters", SIMULATION_PARAMETERS)
+    for name in ["simTime", "timeStep", "weightRecordPeriod"]:
+        if parameters[name] <= 0:
+            raise ValueError("The parameter simulationParameters." + name + " must be greater than 0")
+    return parameters
+
+
+def read_test_parameters(configFilesPath):
+    """
+    Read the parameters of the plots and tables of a simulation (testParameters section of simulation_config.ini)
+
+    @param configFilesPath: path to the directory of the config files
+    @return: dict of parameter -> value (see TEST_PARAMETERS)
+    """
+    parameters = read_section(configFilesPath + "simulation_config.ini", "testParameters", TEST_PARAMETERS)
+    for namePopName, namePopType in [("colorsPopName", "colorsPopType"), ("excelColorsPopName", "excelColorsPopType")]:
+        if len(parameters[namePopName]) != len(parameters[namePopType]):
+            raise ValueError("The parameters testParameters." + namePopName + " and testParameters." + namePopType +
+                             " must have the same length")
+    return parameters
+
+
+def read_testbench_parameters(configFilesPath, integerTimes=False):
+    """
+    Read the parameters of the testbenches (testbench section of simulation_config.ini). The operation logs store the
+    times in integer units of time, so the times of the operations must be integer with the oplog workloadFormat
+
+    @param configFilesPath: path to the directory of the config files
+    @param integerTimes: (optional) if the times of the operations must be integer with any workloadFormat (the
+        workloads are stored as operation logs)
+    @return: dict of parameter -> value (see TESTBENCH_PARAMETERS), with the times of the operations as int if they
+        must be integer
+    """
+    parameters = read_section(configFilesPath + "simulation_config.ini", "testbench", TESTBENCH_PARAMETERS)
+    if integerTimes or parameters["workloadFormat"] == "oplog":
+        for name in ["readingOperationTime", "writingOperationTime", "readingOperationDataHolding",
+                     "writingOperationDataHolding"]:
+            if parameters[name] != int(parameters[name]):
+                raise ValueError(name + " of the testbench section must be an integer number of ms (it is " +
+                                 str(parameters[name]) + ") to store the operations in an operation log")
+            parameters[name] = int(parameters[name])
+    return parameters
+
+
+def read_sweep_parameters(configFilesPath):
+    """
+    Read the parameters of the parameter sweep (parameterSweep section of simulation_config.ini)
+
+    @param configFilesPath: path to the directory of the config files
+    @return: dict of parameter -> value (see SWEEP_PARAMETERS)
+    """
+    parameters = read_section(configFilesPath + "simulation_config.ini", "parameterSweep", SWEEP_PARAMETERS)
+    for path, values in parameters["searchSpace"].items():
+        if not isinstance(values, (list, tuple)) or len(values) == 0:
+            raise ValueError("The values of the parameter " + path + " of parameterSweep.searchSpace must be a "
+                             "non-empty list")
+    return parameters
+
+
+def read_benchmark_parameters(configFilesPath):
+    """
+    Read the parameters of the micro-benchmarks (benchmark section of simulation_config.ini)
+
+    @param configFilesPath: path to the directory of the config files
+    @return: dict of parameter -> value (see BENCHMARK_PARAMETERS)
+    """
+    parameters = read_section(configFilesPath + "simulation_config.ini", "benchmark", BENCHMARK_PARAMETERS)
+    if parameters["repeat"] < 1 or parameters["cueSize"] < 1 or parameters["contSize"] < 1:
+        raise ValueError("cueSize, contSize and repeat of the benchmark section must be greater than 0")
+    return parameters
+
+
+def read_scaling_parameters(configFilesPath):
+    """
+    Read the parameters of the capacity and scaling benchmark (scalingBenchmark section of simulation_config.ini)
+
+    @param configFilesPath: path to the directory of the config files
+    @return: dict of parameter -> value (see SCALING_PARAMETERS)
+    """
+    parameters = read_section(configFilesPath + "simulation_config.ini", "scalingBenchmark", SCALING_PARAMETERS)
+    for name in ["cueSizes", "contSizes"]:
+        if len(parameters[name]) == 0 or \
+                not all(isinstance(size, int) and not isinstance(size, bool) and size > 0 for size in parameters[name]):
+            raise ValueError("The parameter scalingBenchmark." + name + " must be a non-empty list of integers greater "
+                             "than 0")
+    if parameters["operationsPerCue"] <= 0 or parameters["repeat"] < 1 or not 0 < parameters["dominanceShare"] <= 1:
+        raise ValueError("operationsPerCue and repeat of the scalingBenchmark section must be greater than 0 and "
+                         "dominanceShare in (0, 1]")
+    return parameters
+
+
+def read_workload_parameters(configFilesPath):
+    """
+    Read the parameters of the workload generators (workload section of simulation_config.ini)
+
+    @param configFilesPath: path to the directory of the config files
+    @return: dict of parameter -> value (see WORKLOAD_PARAMETERS)
+    """
+    parameters = read_section(configFilesPath + "simulation_config.ini", "workload", WORKLOAD_PARAMETERS)
+    if parameters["numOperations"] < 0 or parameters["chunkSize"] < 1:
+        raise ValueError("numOperations of the workload section must not be negative and chunkSize must be greater "
+                         "than 0")
+    if not 0 <= parameters["readRatio"] <= 1 or not 0 <= parameters["hotsetProbability"] <= 1 or \
+            not 0 < parameters["hotsetFraction"] <= 1:
+        raise ValueError("readRatio and hotsetProbability of the workload section must be in [0, 1] and "
+                         "hotsetFraction in (0, 1]")
+    if parameters["zipfExponent"] < 0 or parameters["burstSize"] < 1 or parameters["burstGap"] < 0 or \
+            parameters["readAfterWriteDistance"] < 0:
+        raise ValueError("zipfExponent, burstGap and readAfterWriteDistance of the workload section must not be "
+                         "negative and burstSize must be at least 1")
+    if parameters["pattern"] == "trace" and not parameters["tracePath"]:
+        raise ValueError("The trace pattern of the workload section needs a tracePath")
+    if parameters["arrival"] == "trace" and parameters["pattern"] != "trace":
+        raise ValueError("The trace arrival of the workload section is only available with the trace pattern")
+    return parameters
+
+
+def parse_spikes(text, name):
+    """
+    Parse a list with the spike times of each neuron (list literal): as json if possible (much faster for long lists) or
+    as a python literal in other case
+
+    @param text: text of the list in the input spikes file
+    @param name: name of the parameter (for the error messages)
+    @return: list of lists of spike times
+    """
+    try:
+        spikes = json.loads(text)
+    except ValueError:
+        spikes = parse_value(text, name)
+    if not isinstance(spikes, (list, tuple)) or \
+            not all(isinstance(neuronSpikes, (list, tuple)) for neuronSpikes in spikes):
+        raise ValueError("The parameter " + name + " must be a list with a list of spike times for each neuron")
+    for neuronSpikes in spikes:
+        for spike in neuronSpikes:
+            if isinstance(spike, bool) or not isinstance(spike, NUMBER) or spike < 0:
+                raise ValueError("The parameter " + name + " has an invalid spike time: " + str(spike))
+    return [list(neuronSpikes) for neuronSpikes in spikes]
+
+
+def read_input_spikes(fullPath, cueSize, contSize):
+    """
+    Read and check an input_spikes.ini file: InputSpikesCue must have a list for each of the ceil(log2(cueSize+1)) cue
+    neurons and InputSpikesCont a list for each of the contSize content neurons. The parsed spikes are reused while the
+    file has the same modification time or content hash
+
+    @param fullPath: path + filename to the input_spikes.ini file
+    @param cueSize: max number of patterns to store
+    @param contSize: size of patterns to store (number of bits)
+    @return: spikes of the cue neurons and spikes of the content neurons (as written in the file)
+    """
+    inputSpikesCue, inputSpikesCont = read_input_spikes_cached(fullPath)
+    numCueBinaryNeuron = math.ceil(math.log2(cueSize + 1))
+    if len(inputSpikesCue) != numCueBinaryNeuron:
+        raise ValueError("InputSpikesCue of " + fullPath + " has " + str(len(inputSpikesCue)) + " neurons but a memory "
+                         "of cueSize " + str(cueSize) + " needs " + str(numCueBinaryNeuron))
+    if len(inputSpikesCont) != contSize:
+        raise ValueError("InputSpikesCont of " + fullPath + " has " + str(len(inputSpikesCont)) + " neurons but a "
+                         "memory of contSize " + str(contSize) + " needs " + str(contSize))
+    return inputSpikesCue, inputSpikesCont
+
+
+def read_input_spikes_cached(fullPath):
+    """
+    Get the parsed spikes of an input_spikes.ini file from the cache (in memory or in its cache file of
+    INPUT_SPIKES_CACHE_PATH) if the file has not changed (same modification time or, if it has changed, same content
+    hash), or parse it in other case
+
+    @param fullPath: path + filename to the input_spikes.ini file
+    @return: spikes of the cue neurons and spikes of the content neurons (new lists, the cached ones are not shared)
+    """
+    try:
+        mtime = os.path.getmtime(fullPath)
+    except OSError:
+        raise FileNotFoundError("The input spikes file " + fullPath + " does not exist")
+    key = os.path.abspath(fullPath)
+    cachePath = INPUT_SPIKES_CACHE_PATH + hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+    if key not in inputSpikesCache:
+        try:
+            with open(cachePath, "r") as file:
+                cached = json.load(file)
+            inputSpikesCache[key] = (cached["mtime"], cached["hash"], cached["cue"], cached["cont"])
+        except (OSError, ValueError, KeyError):
+            pass
+    if key in inputSpikesCache and inputSpikesCache[key][0] == mtime:
+        return copy_spikes(inputSpikesCache[key][2]), copy_spikes(inputSpikesCache[key][3])
+
+    with open(fullPath, "rb") as file:
+        content = file.read()
+    contentHash = hashlib.sha1(content).hexdigest()
+    if key in inputSpikesCache and inputSpikesCache[key][1] == contentHash:
+        inputSpikesCue, inputSpikesCont = inputSpikesCache[key][2], inputSpikesCache[key][3]
+    else:
+        config = configparser.ConfigParser()
+        config.optionxform = str
+        config.read_string(content.decode("utf-8"), fullPath)
+        if "input_cue" not in config or "InputSpikesCue" not in config["input_cue"] or \
+                "input_cont" not in config or "InputSpikesCont" not in config["input_cont"]:
+            raise ValueError("The input spikes file " + fullPath + " must have InputSpikesCue in [input_cue] and "
+                             "InputSpikesCont in [input_cont]")
+        inputSpikesCue = parse_spikes(config["input_cue"]["InputSpikesCue"], "InputSpikesCue")
+        inputSpikesCont = parse_spikes(config["input_cont"]["InputSpikesCont"], "InputSpikesCont")
+    inputSpikesCache[key] = (mtime, contentHash, inputSpikesCue, inputSpikesCont)
+    # The cache file is optional: the cache folder can be read-only
+    try:
+        os.makedirs(INPUT_SPIKES_CACHE_PATH, exist_ok=True)
+        with open(cachePath, "w") as file:
+            file.write(json.dumps({"mtime": mtime, "hash": contentHash, "cue": inputSpikesCue, "cont": inputSpikesCont}))
+    except OSError:
+        pass
+    return copy_spikes(inputSpikesCue), copy_spikes(inputSpikesCont)
+
+
+def copy_spikes(spikes):
+    """
+    Copy the parsed spikes of a population of an input spikes file
+
+    @param spikes: list of spike times of each neuron
+    @return: new list of new lists of spike times
+    """
+    return [list(neuronSpikes) for neuronSpikes in spikes]
@@ -0,0 +1,2 @@
+# test_DG_CA3_CA1_one_hot.py is the script that runs and plots a simulation, not a test module
+collect_ignore = ["test_DG_CA3_CA1_one_hot.py"]
@@ -1,12 +1,18 @@
 import xlsxwriter
 
 
+# Max number of columns and rows of an excel sheet
+EXCEL_MAX_COLUMNS = 16384
+EXCEL_MAX_ROWS = 1048576
+
+
 class ExcelSpikeTracer:
     """
     Class used to control the creation of an excel file
     """
 
-    def __init__(self, filePath, filename, simTime, numHeaders, contentColor, headerColor, orientationFormat, boxTableSize):
+    def __init__(self, filePath, filename, simTime, numHeaders, contentColor, headerColor, orientationFormat, boxTableSize,
+                 constantMemory=False, maxTimeStampsPerSheet=None):
         """
         Init an object of type ExcelSpikeTracer
 
@@ -18,26 +24,42 @@ class ExcelSpikeTracer:
         @param headerColor: default color used in the headers boxes of the table (row and column names)
         @param orientationFormat: orientation of the time stamp: "vertical" or "horizontal"
         @param boxTableSize: size of box in table
+        @param constantMemory: (optional) if stream each row to the file once it is written (xlsxwriter constant_memory
+            mode). The rows must be written in order, so only print_table can be used
+        @param maxTimeStampsPerSheet: (optional) max number of time stamps in each sheet used by print_table, by default
+            as many as the excel limit of columns (horizontal) or rows (vertical) allows. In horizontal orientation the
+            values of a sheet are held until it is complete, so this is also the max number of rows kept in memory
         """
         self.fullPath = filePath + filename + ".xlsx"
-        self.excel = xlsxwriter.Workbook(self.fullPath)
-        self.worksheet = self.excel.add_worksheet()
+        self.excel = xlsxwriter.Workbook(self.fullPath, {"constant_memory": constantMemory})
+        # Formats already created, by color
+        self.formats = {}
         self.headerFormat = self.create_format(headerColor)
         self.contentFormat = self.create_format(contentColor)
         self.simTime = int(simTime)
         self.orientation = orientationFormat
         self.numHeaders = numHeaders
         self.boxTableSize = boxTableSize
+        if maxTimeStampsPerSheet is None:
+            maxTimeStampsPerSheet = EXCEL_MAX_COLUMNS - 1 if orientationFormat == "horizontal" else EXCEL_MAX_ROWS - 1
+        self.maxTimeStampsPerSheet = maxTimeStampsPerSheet
 
-        self.write_header()
+        # In constant memory mode the sheets are created by print_table
+        self.worksheet = None
+        if not constantMemory:
+            self.worksheet = self.excel.add_worksheet()
+            self.write_header()
 
     def create_format(self, color):
         """
-        Define a format for the content of the table
+        Define a format for the content of the table, only one format is created for each color
 
         @param color: color used in the format created
         @return: the default format used in the table with custom colors
         """
+        if color in self.formats:
+            return self.formats[color]
+
         excelFormat = self.excel.add_format()
         excelFormat.set_border()
         excelFormat.set_bold()
@@ -45,6 +67,7 @@ class ExcelSpikeTracer:
         excelFormat.set_align('vcenter')
         excelFormat.set_bg_color(color)
 
+        self.formats[color] = excelFormat
         return excelFormat
 
     def write_header(self):
@@ -63,30 +86,35 @@ class ExcelSpikeTracer:
                 self.worksheet.write(i + 1, 0, i, self.headerFormat)
 
 
-    def print_spikes(self, index, name, spikes, color):
+    def print_spikes(self, index, name, spikeIndex, population, neuron, color):
         """
         Insert a row or column in the table marking with 1 the time stamp when the neuron fired
 
         @param index: the row where to insert the data
         @param name: the header of the row or column (neuron name)
-        @param spikes: array of time stamps that represents the spikes fired
+        @param spikeIndex: SpikeIndex of the spikes of the simulation (shared with the rest of the table), with a time
+            step of 1 ms
+        @param population: key of the population of the neuron in spikeIndex
+        @param neuron: index of the neuron in the population
         @param color: color used to the marked boxes (when spikes happen)
         @return:
         """
         self.worksheet.write(index, 0, name, self.headerFormat)
 
+        # The blank boxes take the default format of the row (or column), only the spikes are written. The time stamps
+        #  with spikes of the neuron are taken from the index
+        if self.orientation == "horizontal":
+            self.worksheet.set_row(index, None, self.contentFormat)
+        else:
+            self.worksheet.set_column(index, index, self.boxTableSize, self.contentFormat)
         valuesFormat = self.create_format(color)
-        for i in range(self.simTime):
+        for stamp in spikeIndex.timeStream[spikeIndex.neuron_ticks(population, neuron)].tolist():
+            if stamp != int(stamp) or not 0 <= stamp < self.simTime:
+                continue
             if self.orientation == "horizontal":
-                if i in spikes:
-                    self.worksheet.write(index, i + 1, 1, valuesFormat)
-                else:
-                    self.worksheet.write(index, i + 1, "", self.contentFormat)
+                self.worksheet.write(index, int(stamp) + 1, 1, valuesFormat)
             else:
-                if i in spikes:
-                    self.worksheet.write(i + 1, index, 1, valuesFormat)
-                else:
-                    self.worksheet.write(i + 1, index, "", self.contentFormat)
+                self.worksheet.write(int(stamp) + 1, index, 1, valuesFormat)
 
     def print_row(self, index, isHeader, values, color):
         """
@@ -136,5 +164,93 @@ class ExcelSpikeTracer:
                 self.worksheet.write(i+1, index, values[i], valuesFormat[i])
 
 
+    def print_table(self, headers, rows, colors):
+        """
+        Insert a full table writing each excel row in order (valid in constant memory mode). The rows are taken from an
+        iterator one by one and each maxTimeStampsPerSheet time stamps a new sheet with its own headers is begun. If
+        there is more than one sheet, each one is named after its first and last time stamps
+
+        @param headers: headers of the table, the first one is the header of the time stamps
+        @param rows: iterable of (stamp, values) with the values of each time stamp, one for each header (except the
+            first one)
+        @param colors: list of colors used to fill the boxes of each header (except the first one)
+        @return:
+        """
+        valuesFormat = [self.create_format(color) for color in colors]
+        sheets = []
+        # Time stamps (and values, in horizontal orientation) of the current sheet
+        sheetStamps = []
+        sheetRows = []
+        for stamp, values in rows:
+            if len(sheetStamps) == self.maxTimeStampsPerSheet:
+                self.end_table_sheet(headers, sheetStamps, sheetRows, valuesFormat)
+                sheets.append((self.worksheet, sheetStamps[0], sheetStamps[-1]))
+                sheetStamps, sheetRows = [], []
+            if not sheetStamps:
+                self.begin_table_sheet(headers)
+            sheetStamps.append(stamp)
+            if self.orientation == "horizontal":
+                # A column for each time stamp: the rows of the sheet are written once all its columns are known
+                sheetRows.append(values)
+            else:
+                # A row for each time stamp after the row of headers
+                self.worksheet.write(len(sheetStamps), 0, stamp, self.headerFormat)
+                for indexValue, value in enumerate(values):
+                    self.worksheet.write(len(sheetStamps), indexValue + 1, value, valuesFormat[indexValue])
+        if not sheetStamps:
+            self.begin_table_sheet(headers)
+        self.end_table_sheet(headers, sheetStamps, sheetRows, valuesFormat)
+        if sheets:
+            sheets.append((self.worksheet, sheetStamps[0], sheetStamps[-1]))
+            for worksheet, firstStamp, lastStamp in sheets:
+                self.rename_worksheet(worksheet, "t{:g}-t{:g}".format(firstStamp, lastStamp))
+
+    def begin_table_sheet(self, headers):
+        """
+        Begin a new sheet of print_table: in vertical orientation, with its row of headers
+
+        @param headers: headers of the table, the first one is the header of the time stamps
+        @return:
+        """
+        self.worksheet = self.excel.add_worksheet()
+        if self.orientation != "horizontal":
+            self.worksheet.set_column(0, self.numHeaders, self.boxTableSize)
+            for indexHeader, header in enumerate(headers):
+                self.worksheet.write(0, indexHeader, header, self.headerFormat)
+
+    def end_table_sheet(self, headers, sheetStamps, sheetRows, valuesFormat):
+        """
+        End the current sheet of print_table: in horizontal orientation, write its rows (a row for each header: time
+        stamps in the first one and the values of each header in the rest)
+
+        @param headers: headers of the table, the first one is the header of the time stamps
+        @param sheetStamps: time stamps of the sheet
+        @param sheetRows: values of each time stamp of the sheet (only in horizontal orientation)
+        @param valuesFormat: format of the boxes of each header (except the first one)
+        @return:
+        """
+        if self.orientation != "horizontal":
+            return
+        self.worksheet.set_column(0, len(sheetStamps), self.boxTableSize)
+        self.worksheet.write(0, 0, headers[0], self.headerFormat)
+        for i, stamp in enumerate(sheetStamps):
+            self.worksheet.write(0, i + 1, stamp, self.headerFormat)
+        for indexHeader in range(1, len(headers)):
+            self.worksheet.write(indexHeader, 0, headers[indexHeader], self.headerFormat)
+            for i, values in enumerate(sheetRows):
+                self.worksheet.write(indexHeader, i + 1, values[indexHeader - 1], valuesFormat[indexHeader - 1])
+
+    def rename_worksheet(self, worksheet, name):
+        """
+        Change the name of a sheet already created (before the excel is closed)
+
+        @param worksheet: the sheet
+        @param name: new name of the sheet
+        @return:
+        """
+        del self.excel.sheetnames[worksheet.name]
+        worksheet.name = name
+        self.excel.sheetnames[name] = worksheet
+
     def closeExcel(self):
-        self.excel.close()
\ No newline at end of file
+        self.excel.close()
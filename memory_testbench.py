@@ -1,6 +1,6 @@
 
 import math
-import configparser
+import config_loader
 import tools
 import time
 import numpy as np
@@ -14,9 +14,10 @@ def decimal_to_binary(num, list):
     @param list: list to store the binary sequence
     @return:
     """
+    # Most significant bit first, always beginning with a 0 (0 -> [0], 5 -> [0, 1, 0, 1])
+    list.append(0)
     if num >= 1:
-        decimal_to_binary(num // 2, list)
-    list.append(num % 2)
+        list.extend(int(bit) for bit in bin(int(num))[2:])
 
 
 def decimal_to_binary_list(decimalList):
@@ -69,6 +70,113 @@ def format_cue_vectors(binaryCueValues, cueSizeInBin):
     return binaryCueValues
 
 
+def values_to_binary_matrix(values, numBits):
+    """
+    Convert a list of decimal values to a matrix of binary values with numBits bits each (the most significant bit first
+    and only the numBits less significant bits), the same values that format_cue_vectors(decimal_to_binary_list(values),
+    numBits) but all at once: each value is split in its bytes and the bytes are unpacked to bits
+
+    @param values: list of decimal values (non-negative and lower than 2**64)
+    @param numBits: number of bits of each binary value
+    @return: uint8 array of values x numBits
+    """
+    values = np.asarray(values, dtype=np.uint64).reshape(-1)
+    bits = np.unpackbits(values.astype(">u8").view(np.uint8).reshape(-1, 8), axis=1)
+    if numBits <= 64:
+        return bits[:, 64 - numBits:]
+    return np.hstack([np.zeros((len(values), numBits - 64), dtype=np.uint8), bits])
+
+
+def expand_operations(operations, binaryCueValues, contBinValues, startTimes, holdingTime, beginTime=None, endTime=None):
+    """
+    Expand operations with known begin times to the spike times of the input cue and cont neurons: each bit set of an
+    operation fires in all the time stamps of its holding time
+
+    @param operations: type of each operation (0 = writing and 1 = reading), index of holdingTime
+    @param binaryCueValues: binary cue of each operation (operations x cue neurons, see values_to_binary_matrix) or None
+    @param contBinValues: binary content of each operation (operations x cont neurons) or None, only written in the
+        writing operations
+    @param startTimes: begin time of each operation
+    @param holdingTime: number of units of time to hold the values of each type of operation
+    @param beginTime: (optional) only keep the spikes from this time
+    @param endTime: (optional) only keep the spikes before this time
+    @return: list of spike times of each cue neuron ([] if binaryCueValues is None) and list of spike times of each cont
+        neuron ([] if contBinValues is None)
+    """
+    operations = np.asarray(operations, dtype=int).reshape(-1)
+    startTimes = np.asarray(startTimes)
+    holdings = np.asarray(holdingTime, dtype=int)[operations]
+
+    def get_spike_times(binaryValues, isOperationUsed):
+        # Active bits, neuron by neuron and ordered by operation: each one fires from the begin of its operation during
+        #  its holding time
+        binaryValues = np.asarray(binaryValues, dtype=bool).reshape(len(operations), np.shape(binaryValues)[-1]) & \
+                       isOperationUsed[:, None]
+        neuronIds, operationIds = np.nonzero(binaryValues.T)
+        numSpikes = holdings[operationIds]
+        firstSpikes = np.cumsum(numSpikes) - numSpikes
+        spikeTimes = np.repeat(startTimes[operationIds], numSpikes) + np.arange(numSpikes.sum()) - np.repeat(firstSpikes, numSpikes)
+        spikeNeurons = np.repeat(neuronIds, numSpikes)
+        if beginTime is not None or endTime is not None:
+            isInWindow = (spikeTimes >= (beginTime if beginTime is not None else -np.inf)) & \
+                         (spikeTimes < (endTime if endTime is not None else np.inf))
+            spikeTimes, spikeNeurons = spikeTimes[isInWindow], spikeNeurons[isInWindow]
+        spikesPerNeuron = np.bincount(spikeNeurons, minlength=binaryValues.shape[1])
+        return [neuronSpikes.tolist() for neuronSpikes in np.split(spikeTimes, np.cumsum(spikesPerNeuron)[:-1])]
+
+    cue = get_spike_times(binaryCueValues, np.ones(len(operations), dtype=bool)) if binaryCueValues is not None else []
+    cont = get_spike_times(contBinValues, operations == 0) if contBinValues is not None else []
+    return cue, cont
+
+
+def get_operation_start_times(operations, operationTime, currentOperationTime=1):
+    """
+    Get the begin time of each operation of a sequence where each operation begins when the previous one ends
+
+    @param operations: type of each operation (0 = writing and 1 = reading), index of operationTime
+    @param operationTime: units of time needed to get to the next operation of each type of operation
+    @param currentOperationTime: (optional) time of the first operation
+    @return: array with the begin time of each operation and the time after the last one (summed in the same order as
+        one operation after another)
+    """
+    operations = np.asarray(operations, dtype=int).reshape(-1)
+    return np.cumsum(np.concatenate([np.asarray([currentOperationTime]), np.asarray(operationTime)[operations]]))
+
+
+def compile_operations(operations, binaryCueValues, contBinValues, operationTime, holdingTime, currentOperationTime=1):
+    """
+    Compile a sequence of operations to the spike times of the input cue and cont neurons in a single vectorized pass:
+    the begin time of each operation is the cumulative sum of the times of the previous operations and each bit set of
+    an operation fires in all the time stamps of its holding time
+
+    @param operations: type of each operation (0 = writing and 1 = reading), index of operationTime and holdingTime
+    @param binaryCueValues: binary cue of each operation (operations x cue neurons, see values_to_binary_matrix) or None
+    @param contBinValues: binary content of each operation (operations x cont neurons) or None, only written in the
+        writing operations
+    @param operationTime: units of time needed to get to the next operation of each type of operation
+    @param holdingTime: number of units of time to hold the values of each type of operation
+    @param currentOperationTime: (optional) time of the first operation
+    @return: list of spike times of each cue neuron ([] if binaryCueValues is None), list of spike times of each cont
+        neuron ([] if contBinValues is None) and the time of the operation after the last one
+    """
+    times = get_operation_start_times(operations, operationTime, currentOperationTime)
+    cue, cont = expand_operations(operations, binaryCueValues, contBinValues, times[:-1], holdingTime)
+    return cue, cont, times[-1].item()
+
+
+def extend_spike_times(spikeTimes, newSpikeTimes):
+    """
+    Add new spike times at the end of the spike times of each neuron
+
+    @param spikeTimes: list of spike times of each neuron
+    @param newSpikeTimes: list of new spike times of each neuron
+    @return: spikeTimes
+    """
+    for neuronSpikeTimes, neuronNewSpikeTimes in zip(spikeTimes, newSpikeTimes):
+        neuronSpikeTimes.extend(neuronNewSpikeTimes)
+    return spikeTimes
+
+
 def create_cue_input_vector(cue, binaryCueValues, currentOperationTime, operationTime, holdingTime, numOperations):
     """
     Take a list of binary values to assign them to the correct cue neuron in the correct time stamp to do the operation
@@ -81,18 +189,13 @@ def create_cue_input_vector(cue, binaryCueValues, currentOperationTime, operatio
     @param numOperations: cont of the number of operation
     @return:
     """
-    # Associate each binary value of each cue as an activation of a neuron input
-    for indexCue, inputBinaryCue in enumerate(binaryCueValues):
-        for indexValue, binaryValue in enumerate(inputBinaryCue):
-            # Only put "active" values (1 in binary)
-            if binaryValue == 1:
-                # Hold the values as time as the operation need
-                for holdingIndex in range(holdingTime):
-                    cue[indexValue].append(currentOperationTime + holdingIndex)
-        # Add to the current operation time the minimum time to begin the next operation
-        currentOperationTime = currentOperationTime + operationTime
-        numOperations = numOperations + 1
-    return cue, numOperations, currentOperationTime
+    # Associate each binary value of each cue as an activation of a neuron input, one operation after another
+    if len(binaryCueValues) == 0:
+        return cue, numOperations, currentOperationTime
+    cueSpikes, contSpikes, currentOperationTime = compile_operations(np.zeros(len(binaryCueValues), dtype=int),
+                                                                     binaryCueValues, None, [operationTime],
+                                                                     [holdingTime], currentOperationTime)
+    return extend_spike_times(cue, cueSpikes), numOperations + len(binaryCueValues), currentOperationTime
 
 
 def create_alternate_cue_input_vector(cue, binaryCueValues, currentOperationTime, operationTime, holdingTime, numOperations):
@@ -108,28 +211,14 @@ def create_alternate_cue_input_vector(cue, binaryCueValues, currentOperationTime
     @param numOperations: cont of the number of operation
     @return:
     """
-    # Associate each binary value of each cue as an activation of a neuron input
-    for indexCue, inputBinaryCue in enumerate(binaryCueValues):
-        # + For the writing operation
-        for indexValue, binaryValue in enumerate(inputBinaryCue):
-            # Only put "active" values (1 in binary)
-            if binaryValue == 1:
-                # Hold the values as time as the operation need
-                for holdingIndex in range(holdingTime[0]):
-                    cue[indexValue].append(currentOperationTime + holdingIndex)
-        # Add to the current operation time the minimum time to begin the next operation
-        currentOperationTime = currentOperationTime + operationTime[0]
-        numOperations = numOperations + 1
-        # + For the reading operation
-        for indexValue, binaryValue in enumerate(inputBinaryCue):
-            # Only put "active" values (1 in binary)
-            if binaryValue == 1:
-                # Hold the values as time as the operation need
-                for holdingIndex in range(holdingTime[1]):
-                    cue[indexValue].append(currentOperationTime + holdingIndex)
-        currentOperationTime = currentOperationTime + operationTime[1]
-        numOperations = numOperations + 1
-    return cue, numOperations, currentOperationTime
+    # Associate each binary value of each cue as an activation of a neuron input: a writing and a reading operation
+    if len(binaryCueValues) == 0:
+        return cue, numOperations, currentOperationTime
+    cueSpikes, contSpikes, currentOperationTime = compile_operations(np.tile([0, 1], len(binaryCueValues)),
+                                                                     np.repeat(np.asarray(binaryCueValues), 2, axis=0),
+                                                                     None, operationTime, holdingTime,
+                                                                     currentOperationTime)
+    return extend_spike_times(cue, cueSpikes), numOperations + 2 * len(binaryCueValues), currentOperationTime
 
 
 def create_cont_input_vector(cont, contBinValues, currentOperationTime, operationTime, holdingTime):
@@ -143,17 +232,13 @@ def create_cont_input_vector(cont, contBinValues, currentOperationTime, operatio
         @param holdingTime: number of unit time to hold the value
         @return:
     """
-    # Associate each binary value of each cue as an activation of a neuron input
-    for indexCont, contBinValue in enumerate(contBinValues):
-        for indexValue, binaryValue in enumerate(contBinValue):
-            # Only put "active" values (1 in binary)
-            if binaryValue == 1:
-                # Hold the values as time as the operation need
-                for holdingIndex in range(holdingTime):
-                    cont[indexValue].append(currentOperationTime + holdingIndex)
-        # Add to the current operation time the minimum time to begin the next operation
-        currentOperationTime = currentOperationTime + operationTime
-    return cont, currentOperationTime
+    # Associate each binary value of each content as an activation of a neuron input, one operation after another
+    if len(contBinValues) == 0:
+        return cont, currentOperationTime
+    cueSpikes, contSpikes, currentOperationTime = compile_operations(np.zeros(len(contBinValues), dtype=int), None,
+                                                                     contBinValues, [operationTime], [holdingTime],
+                                                                     currentOperationTime)
+    return extend_spike_times(cont, contSpikes), currentOperationTime
 
 
 def create_input_vector_from_operations(cont, cue, operations, contBinValues, binaryCueValues, currentOperationTime, operationTime, holdingTime, numberOfOperations):
@@ -172,28 +257,13 @@ def create_input_vector_from_operations(cont, cue, operations, contBinValues, bi
     @param numberOfOperations: cont of the number of operation
     @return:
     """
-    # For each operation:
-    for indexOperation, operation in enumerate(operations):
-        # Associate the cue values to neurons
-        for indexValue, binaryValue in enumerate(binaryCueValues[indexOperation]):
-            # Only put "active" values (1 in binary)
-            if binaryValue == 1:
-                # Hold the values as time as the operation need
-                for holdingIndex in range(holdingTime[operation]):
-                    cue[indexValue].append(currentOperationTime + holdingIndex)
-        # Associate the memories values to neurons if writing operation
-        if operation == 0:
-            for indexValue, binaryValue in enumerate(contBinValues[indexOperation]):
-                # Only put "active" values (1 in binary)
-                if binaryValue == 1:
-                    # Hold the values as time as the operation need
-                    for holdingIndex in range(holdingTime[operation]):
-                        cont[indexValue].append(currentOperationTime + holdingIndex)
-        # Add to the current operation time the minimum time to begin the next operation
-        currentOperationTime = currentOperationTime + operationTime[operation]
-        numberOfOperations = numberOfOperations + 1
-
-    return cue, cont, currentOperationTime, numberOfOperations
+    # Associate the cue values of all the operations and the content values of the writing operations to neurons
+    if len(operations) == 0:
+        return cue, cont, currentOperationTime, numberOfOperations
+    cueSpikes, contSpikes, currentOperationTime = compile_operations(operations, binaryCueValues, contBinValues,
+                                                                     operationTime, holdingTime, currentOperationTime)
+    return (extend_spike_times(cue, cueSpikes), extend_spike_times(cont, contSpikes), currentOperationTime,
+            numberOfOperations + len(operations))
 
 
 def tb_piramidal_sequence(cueSize, contSize, cueSizeInBin, readingOperationTime, readingOperationDataHolding, writingOperationTime, writingOperationDataHolding):
@@ -496,8 +566,8 @@ def tb_random_operations(cueSize, contSize, cueSizeInBin, readingOperationTime,
     decimalCont = np.random.randint(1, 2 ** contSize, numberOfOperations)
 
     # Convert the content and cue from decimal to binary and fix it to the correct input size
-    binaryCue = format_cue_vectors(decimal_to_binary_list(decimalCue), cueSizeInBin)
-    binaryCont = format_cue_vectors(decimal_to_binary_list(decimalCont), contSize)
+    binaryCue = values_to_binary_matrix(decimalCue, cueSizeInBin)
+    binaryCont = values_to_binary_matrix(decimalCont, contSize)
 
     # Create the empty cue and cont vector
     cue = [[] for i in range(cueSizeInBin)]
@@ -516,7 +586,34 @@ def tb_random_operations(cueSize, contSize, cueSizeInBin, readingOperationTime,
     return cue, cont, currentOperationTime, numOperations, numLearning, numRecalling
 
 
-def testbench(cueSize, contSize, cueSizeInBin, readingOperationTime, readingOperationDataHolding, writingOperationTime, writingOperationDataHolding, tbPath, numberOfOperations):
+def tb_random_operations_log(cueSize, contSize, cueSizeInBin, readingOperationTime, readingOperationDataHolding, writingOperationTime, writingOperationDataHolding, numberOfOperations):
+    """
+    Generate the same random sequence of operations that tb_random_operations (with the same state of the random
+    generator) as an operation log, without expanding it to spikes
+
+    @param cueSize: Max number of patterns to store
+    @param contSize: Size of patterns to store (number of bits)
+    @param cueSizeInBin: input cue size in binary
+    @param readingOperationTime: Time to begin the next operation after a read operation
+    @param readingOperationDataHolding: Data holding time at the input for a reading operation
+    @param writingOperationTime: Time to begin the next operation after a write operation
+    @param writingOperationDataHolding: Data holding time at the input for a writing operation
+    @param numberOfOperations: number of random operation for the random test
+    @return: the operation log (see operation_log.OperationLog), number of learning and of recalling operations
+    """
+    # The operation log module uses the operation compiler of this module, it is imported when it is needed
+    import operation_log
+    # Create the vector of random operations (0 = learning and 1 = recalling), cues and content values
+    operations = np.random.randint(0, 2, numberOfOperations)
+    decimalCue = np.random.randint(1, cueSize + 1, numberOfOperations)
+    decimalCont = np.random.randint(1, 2 ** contSize, numberOfOperations)
+    operationLog = operation_log.OperationLog.from_operations(operations, decimalCue, decimalCont, cueSizeInBin, contSize,
+                                                              [writingOperationTime, readingOperationTime],
+                                                              [writingOperationDataHolding, readingOperationDataHolding])
+    return operationLog, np.count_nonzero(operations == 0), np.count_nonzero(operations == 1)
+
+
+def testbench(cueSize, contSize, cueSizeInBin, readingOperationTime, readingOperationDataHolding, writingOperationTime, writingOperationDataHolding, tbPath, numberOfOperations, workloadFormat="ini"):
     """
     Call a battery of memory testbench to generate the input sequence to the spike memory
 
@@ -529,6 +626,8 @@ def testbench(cueSize, contSize, cueSizeInBin, readingOperationTime, readingOper
     @param writingOperationDataHolding: Data holding time at the input for a writing operation
     @param tbPath: path to store the testbench
     @param numberOfOperations: number of random operation for the random test
+    @param workloadFormat: (optional) format of the random test: "ini" (input_spikes.ini with the spikes of each input
+        neuron) or "oplog" (input_spikes.oplog operation log, see operation_log.py)
     @return:
     """
 
@@ -578,53 +677,64 @@ def testbench(cueSize, contSize, cueSizeInBin, readingOperationTime, readingOper
     print(path + "\n\n")
 
     # Testbench 4 -> random operations
-    cue_seq, cont_seq, minTimeSim, numOperations, numLearning, numRecalling = tb_random_operations(cueSize, contSize, cueSizeInBin,
-                                                                                                  readingOperationTime,
-                                                                                                  readingOperationDataHolding,
-                                                                                                  writingOperationTime,
-                                                                                                  writingOperationDataHolding, numberOfOperations)
+    if workloadFormat == "oplog":
+        operationLog, numLearning, numRecalling = tb_random_operations_log(cueSize, contSize, cueSizeInBin,
+                                                                           readingOperationTime,
+                                                                           readingOperationDataHolding,
+                                                                           writingOperationTime,
+                                                                           writingOperationDataHolding, numberOfOperations)
+        minTimeSim, numOperations = operationLog.endTime, len(operationLog)
+    else:
+        cue_seq, cont_seq, minTimeSim, numOperations, numLearning, numRecalling = tb_random_operations(cueSize, contSize, cueSizeInBin,
+                                                                                                      readingOperationTime,
+                                                                                                      readingOperationDataHolding,
+                                                                                                      writingOperationTime,
+                                                                                                      writingOperationDataHolding, numberOfOperations)
     print("Testbench 4: random operations")
     print("Min simulation time to simulate all operations = " + str(minTimeSim) + " ms")
     print("Num of operations = " + str(numOperations))
     print(" - Learning = " + str(numLearning))
     print(" - Recalling = " + str(numRecalling))
     # Write the results
-    tb_data = "[input_cue]\nInputSpikesCue = " + str(cue_seq) + "\n[input_cont]\nInputSpikesCont = " + str(cont_seq)
     tbFullPath = tools.check_and_create_folder(tbBasePath + "tb4_random_operations/")
-    path, filename = tools.write_file(tbFullPath, "input_spikes", ".ini", tb_data)
+    if workloadFormat == "oplog":
+        path, filename = operationLog.write(tbFullPath, "input_spikes")
+    else:
+        tb_data = "[input_cue]\nInputSpikesCue = " + str(cue_seq) + "\n[input_cont]\nInputSpikesCont = " + str(cont_seq)
+        path, filename = tools.write_file(tbFullPath, "input_spikes", ".ini", tb_data)
     print(path + "\n\n")
 
 
 if __name__ == "__main__":
-    # * Open configparser object interface to read config files
-    config = configparser.ConfigParser()
+    # * Read the config files
     #   + Check the active config file directory
-    config.read("config_files/configFileParameters.ini")
-    activeConfigFilePath = "config_files/" + eval(config["configFileParameters"]["activeConfigFiles"]) + "/"
+    activeConfigFilePath = config_loader.get_active_config_path()
     #   + Input memory parameters
-    config.read(activeConfigFilePath + "memory_config.ini")
+    memoryParameters = config_loader.read_memory_parameters(activeConfigFilePath)
     #       - Max number of patterns to store
-    cueSize = eval(config["memory"]["cueSize"])
+    cueSize = memoryParameters["cueSize"]
     #       - Size of patterns to store (number of bits)
-    contSize = eval(config["memory"]["contSize"])
+    contSize = memoryParameters["contSize"]
     #       - Calculate the input cue size in binary
     cueSizeInBin = math.ceil(math.log2(cueSize + 1))
     #   + Memory times
-    config.read(activeConfigFilePath + "simulation_config.ini")
+    testbenchParameters = config_loader.read_testbench_parameters(activeConfigFilePath)
     #       - Time to begin the next operation after a read operation
-    readingOperationTime = eval(config["testbench"]["readingOperationTime"])
+    readingOperationTime = testbenchParameters["readingOperationTime"]
     #       - Time to begin the next operation after a write operation
-    writingOperationTime = eval(config["testbench"]["writingOperationTime"])
+    writingOperationTime = testbenchParameters["writingOperationTime"]
     #   + Data holding time at the input
     #       - Read
-    readingOperationDataHolding = eval(config["testbench"]["readingOperationDataHolding"])
+    readingOperationDataHolding = testbenchParameters["readingOperationDataHolding"]
     #       - Write
-    writingOperationDataHolding = eval(config["testbench"]["writingOperationDataHolding"])
+    writingOperationDataHolding = testbenchParameters["writingOperationDataHolding"]
     #   + Path to store the testbench txt
-    tbPath = eval(config["testbench"]["tbPath"])
+    tbPath = testbenchParameters["tbPath"]
     #   + Number of randoms operations for the random testbench
-    numberOfOperations = eval(config["testbench"]["numberOfOperations"])
+    numberOfOperations = testbenchParameters["numberOfOperations"]
+    #   + Format of the random testbench: "ini" (spikes of each input neuron) or "oplog" (operation log)
+    workloadFormat = testbenchParameters["workloadFormat"]
 
     # * Create battery of test input sequence
     testbench(cueSize, contSize, cueSizeInBin, readingOperationTime, readingOperationDataHolding, writingOperationTime,
-              writingOperationDataHolding, tbPath, numberOfOperations)
+              writingOperationDataHolding, tbPath, numberOfOperations, workloadFormat)
@@ -0,0 +1,195 @@
+import os
+import json
+import sys
+import time
+import contextlib
+
+try:
+    # Unix-only: without it, the peak RSS is only known on Linux (/proc)
+    import resource
+except ImportError:
+    resource = None
+
+"""
+Per-phase instrumentation of a run
+
+For each phase: wall time, CPU time of the process and peak RSS (resident memory) reached during the phase. On Linux the
+peak RSS of the process is reset at the beginning of each phase (/proc/self/clear_refs), so it is the peak of the phase
+itself; in other systems it is the peak of the process since it began
+"""
+
+# Extension of the metrics record stored next to a result file
+METRICS_EXTENSION = ".metrics.json"
+
+
+def reset_peak_rss():
+    """
+    Reset the peak RSS of the process (only supported on Linux)
+
+    @return: True if the peak RSS has been reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def get_peak_rss():
+    """
+    Get the peak RSS of the process since it began or since the last reset_peak_rss
+
+    @return: peak RSS in bytes (0 if it is not known in the system)
+    """
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxRss if sys.platform == "darwin" else maxRss * 1024
+
+
+def get_metrics_path(resultPath):
+    """
+    Get the path of the metrics record of a result file: same path and name with METRICS_EXTENSION
+
+    @param resultPath: path + filename to the result file
+    @return: full path to the metrics file
+    """
+    return os.path.splitext(resultPath)[0] + METRICS_EXTENSION
+
+
+class RunMetrics:
+    """
+    Class used to record the metrics (wall time, CPU time and peak RSS) of the phases of a run. The phases can be nested
+    (the peak RSS of a phase includes the one of its inner phases) and the phases measured in other processes can be
+    added to the record
+    """
+
+    def __init__(self, name):
+        """
+        Init an object of type RunMetrics
+
+        @param name: name of the run
+        """
+        self.name = name
+        self.beginTime = time.time()
+        self.phases = []
+        self.openPhases = []
+
+    def begin(self, phaseName):
+        """
+        Begin a phase (inside the current phase, if there is one)
+
+        @param phaseName: name of the phase
+        @return:
+        """
+        if self.openPhases:
+            # The peak RSS of the current phase until now, before it is reset for the inner phase
+            self.openPhases[-1]["peakRss"] = max(self.openPhases[-1]["peakRss"], get_peak_rss())
+        reset_peak_rss()
+        phase = {"name": phaseName, "parent": self.openPhases[-1]["name"] if self.openPhases else None,
+                 "wallTime": time.perf_counter(), "cpuTime": time.process_time(), "peakRss": 0, "pid": os.getpid()}
+        self.phases.append(phase)
+        self.openPhases.append(phase)
+
+    def end(self):
+        """
+        End the current phase
+
+        @return: record of the phase -> {"name", "parent", "wallTime" (s), "cpuTime" (s), "peakRss" (bytes), "pid"}
+        """
+        phase = self.openPhases.pop()
+        phase["wallTime"] = time.perf_counter() - phase["wallTime"]
+        phase["cpuTime"] = time.process_time() - phase["cpuTime"]
+        phase["peakRss"] = max(phase["peakRss"], get_peak_rss())
+        if self.openPhases:
+            self.openPhases[-1]["peakRss"] = max(self.openPhases[-1]["peakRss"], phase["peakRss"])
+        return phase
+
+    @contextlib.contextmanager
+    def phase(self, phaseName):
+        """
+        Measure the code inside a with block as a phase
+
+        @param phaseName: name of the phase
+        @return:
+        """
+        self.begin(phaseName)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def add_phases(self, phases, parent=None):
+        """
+        Add phases measured in other process (or other RunMetrics) to the record
+
+        @param phases: list of records of phases (see end)
+        @param parent: (optional) name of the phase where the phases were executed
+        @return:
+        """
+        for phase in phases:
+            self.phases.append(dict(phase, parent=phase["parent"] if phase["parent"] is not None else parent))
+
+    def to_dict(self):
+        """
+        Get the metrics record
+
+        @return: dict -> "name", "begin" (date and time when the run began), "phases" (records of the phases in the
+            order they began), "wallTime" (of the outer phases of this process), "cpuTime" (of the outer phases of this
+            process and of the outer phases measured in each other process, whose CPU time is not included in the one
+            of this process) and "peakRss"
+        """
+        outerPhases = [phase for phase in self.phases if phase["parent"] is None and phase["pid"] == os.getpid()]
+        # Phases of other processes which are not inside another phase of their own process
+        phaseNames = {}
+        for phase in self.phases:
+            phaseNames.setdefault(phase["pid"], set()).add(phase["name"])
+        childPhases = [phase for phase in self.phases
+                       if phase["pid"] != os.getpid() and phase["parent"] not in phaseNames[phase["pid"]]]
+        return {"name": self.name, "begin": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.beginTime)),
+                "phases": self.phases, "wallTime": sum(phase["wallTime"] for phase in outerPhases),
+                "cpuTime": sum(phase["cpuTime"] for phase in outerPhases + childPhases),
+                "peakRss": max([phase["peakRss"] for phase in self.phases], default=0)}
+
+    def save(self, resultPath):
+        """
+        Store the metrics record next to a result file (see get_metrics_path)
+
+        @param resultPath: path + filename to the result file
+        @return: full path to the metrics file
+        """
+        metricsPath = get_metrics_path(resultPath)
+        with open(metricsPath, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+        return metricsPath
+
+    def get_summary(self):
+        """
+        Get a text table with the metrics of each phase (inner phases indented)
+
+        @return: list of lines of the table
+        """
+        record = self.to_dict()
+        depths = {}
+        rows = []
+        for phase in self.phases:
+            depths[phase["name"]] = depths.get(phase["parent"], -1) + 1
+            rows.append(["  " * depths[phase["name"]] + phase["name"], "{:.3f}".format(phase["wallTime"]),
+                         "{:.3f}".format(phase["cpuTime"]), "{:.1f}".format(phase["peakRss"] / 1024 ** 2)])
+        rows.append(["total", "{:.3f}".format(record["wallTime"]), "{:.3f}".format(record["cpuTime"]),
+                     "{:.1f}".format(record["peakRss"] / 1024 ** 2)])
+        headers = ["Phase (" + self.name + ")", "Wall (s)", "CPU (s)", "Peak RSS (MB)"]
+        widths = [max(len(row[index]) for row in rows + [headers]) for index in range(len(headers))]
+        lines = ["  ".join(value.ljust(widths[index]) for index, value in enumerate(headers)).rstrip()]
+        for row in rows:
+            lines.append("  ".join(value.ljust(widths[index]) for index, value in enumerate(row)).rstrip())
+        return lines
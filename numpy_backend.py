@@ -0,0 +1,337 @@
+import math
+import numpy as np
+import tools
+
+"""
+NumPy backend of the DG-CA3-CA1 one-hot memory
+
+Clock-driven simulation (one iteration per time step) where each population is updated as a whole with numpy arrays.
+All the state (membrane potentials, synaptic currents, STDP traces and weights) has a leading batch axis, so K
+independent copies of the memory (one for each input spike set) are simulated together in the same loop.
+It reproduces the behaviour of the network built with sPyNNaker:
+
++ IF_curr_exp populations (CA3cue, CA3cont and Output) integrated with the closed form used by sPyNNaker:
+  exponential synapses scaled by tau_syn/dt*(1-exp(-dt/tau_syn)), refractory period in time steps and the membrane
+  potential recorded at the beginning of each time step
++ sPyBlocks gates modelled as ideal logic gates with the latency of their internal layers:
+    + NeuralDecoder (DG): the one-hot output of the binary input fires 3 synaptic delays later (NOT and AND layers)
+    + ConstantSpikeSource: feeds the output 0 of the decoder (no input bits) once the set/latch source is stable
+    + NeuralEncoder (CA1): each OR gate fires one synaptic delay after any CA3cue neuron with its bit set
++ SpikePairRule + AdditiveWeightDependence STDP on CA3cue-CA3cont with all-to-all pairing of the spike times
+  (depression when a presynaptic spike arrives, potentiation when a postsynaptic spike is fired)
+"""
+
+# Time step (ms) from which the output 0 of the decoder can fire: start up of the set/latch of the ConstantSpikeSource
+CONSTANT_SOURCE_ONSET = 7.0
+
+
+class IFCurrExpPopulation:
+    """
+    Population of IF_curr_exp neurons with exponential excitatory synapses
+    """
+
+    def __init__(self, numBatch, numNeurons, neuronParameters, vInit, timeStep):
+        """
+        Init a population of IF_curr_exp neurons
+
+        @param numBatch: number of independent copies of the population
+        @param numNeurons: number of neurons of the population
+        @param neuronParameters: PyNN parameters of the IF_curr_exp model
+        @param vInit: initial membrane potential
+        @param timeStep: time step of the simulation in ms
+        """
+        self.numNeurons = numNeurons
+        self.vRest = neuronParameters["v_rest"]
+        self.vReset = neuronParameters["v_reset"]
+        self.vThresh = neuronParameters["v_thresh"]
+        self.iOffset = neuronParameters.get("i_offset", 0.0)
+        self.resistance = neuronParameters["tau_m"] / neuronParameters["cm"]
+        self.expTauM = math.exp(-timeStep / neuronParameters["tau_m"])
+        self.expTauSyn = math.exp(-timeStep / neuronParameters["tau_syn_E"])
+        self.initSyn = neuronParameters["tau_syn_E"] / timeStep * (1.0 - self.expTauSyn)
+        self.refracSteps = int(round(neuronParameters["tau_refrac"] / timeStep))
+        self.v = np.full((numBatch, numNeurons), float(vInit))
+        self.iSyn = np.zeros((numBatch, numNeurons))
+        self.refracCount = np.zeros((numBatch, numNeurons), dtype=int)
+
+    def step(self, inputCurrent):
+        """
+        Advance one time step of the population
+
+        @param inputCurrent: weight (nA) of the spikes arriving in this time step to each neuron (batch x neurons)
+        @return: boolean array (batch x neurons) with the neurons that fired in this time step
+        """
+        self.iSyn = self.iSyn + inputCurrent * self.initSyn
+        active = self.refracCount <= 0
+        alpha = (self.iSyn + self.iOffset) * self.resistance + self.vRest
+        self.v = np.where(active, alpha - self.expTauM * (alpha - self.v), self.v)
+        self.refracCount = np.where(active, self.refracCount, self.refracCount - 1)
+        fired = active & (self.v >= self.vThresh)
+        self.v[fired] = self.vReset
+        self.refracCount[fired] = self.refracSteps
+        self.iSyn = self.iSyn * self.expTauSyn
+        return fired
+
+
+class DelayLine:
+    """
+    Ring buffer that accumulates the input of a population for the next time steps (synaptic delays)
+    """
+
+    def __init__(self, numBatch, numNeurons, maxDelaySteps):
+        """
+        Init an empty delay line
+
+        @param numBatch: number of independent copies of the target population
+        @param numNeurons: number of neurons of the target population
+        @param maxDelaySteps: max delay (in time steps) of the synapses that use the delay line
+        """
+        self.buffer = np.zeros((maxDelaySteps + 1, numBatch, numNeurons))
+
+    def add(self, step, delaySteps, values, indexes=slice(None)):
+        """
+        Add input to arrive in the time step step + delaySteps
+
+        @param step: current time step
+        @param delaySteps: delay in time steps
+        @param values: input values to add (batch x neurons)
+        @param indexes: (optional) neurons of the target population that receive the input
+        @return:
+        """
+        self.buffer[(step + delaySteps) % len(self.buffer)][:, indexes] += values
+
+    def pop(self, step):
+        """
+        Extract (and clear) the input that arrives in the time step step
+
+        @param step: current time step
+        @return: input of each neuron in this time step (batch x neurons)
+        """
+        slot = step % len(self.buffer)
+        values = self.buffer[slot].copy()
+        self.buffer[slot] = 0.0
+        return values
+
+
+class NumpyNetwork:
+    """
+    DG-CA3-CA1 one-hot memory simulated with numpy
+    """
+
+    def __init__(self, cueSize, contSize, neuronParameters, initNeuronParameters, synParameters, timeStep):
+        """
+        Init the memory network
+
+        @param cueSize: max number of patterns to store
+        @param contSize: size of patterns to store (number of bits)
+        @param neuronParameters: neuron parameters of each population (network_config.json)
+        @param initNeuronParameters: initial neuron parameters of each population (network_config.json)
+        @param synParameters: synapses parameters (network_config.json)
+        @param timeStep: time step of the simulation in ms
+        """
+        self.cueSize = cueSize
+        self.contSize = contSize
+        self.dgInputSize = math.ceil(math.log2(cueSize + 1))
+        self.ilInputSize = self.dgInputSize + contSize
+        self.neuronParameters = neuronParameters
+        self.initNeuronParameters = initNeuronParameters
+        self.synParameters = synParameters
+        self.timeStep = timeStep
+
+        # Delays in time steps
+        self.delaySteps = {name: int(round(syn["delay"] / timeStep)) for name, syn in synParameters.items()}
+        # Weights of the static synapses
+        self.staticWeights = {name: syn["initWeight"] for name, syn in synParameters.items()}
+        self.decoderLatency = 3 * self.delaySteps["IL-DGL"]
+        self.encoderLatency = self.delaySteps["CA3cueL-CA1L"]
+
+        # Weight of each DG output in the binary code of the input cue
+        self.binaryWeights = 2 ** np.arange(self.dgInputSize)
+        # Connections CA3cue-CA1 (OR gates): CA3cue neuron i activate the bits of the value i+1
+        self.encoderMatrix = ((np.arange(1, cueSize + 1)[:, None] >> np.arange(self.dgInputSize)) & 1).astype(bool)
+
+    def create_input_raster(self, inputSpikesBatch, numSteps):
+        """
+        Convert the spike times of the input population of each copy of the network to a matrix of
+        time steps x batch x neurons
+
+        @param inputSpikesBatch: list with the input spike set of each copy of the network (list of spike times (ms) for
+            each neuron of the input population)
+        @param numSteps: number of time steps of the simulation
+        @return: boolean matrix where True marks a spike of the neuron in the time step
+        """
+        raster = np.zeros((numSteps, len(inputSpikesBatch), self.ilInputSize), dtype=bool)
+        for indexBatch, inputSpikes in enumerate(inputSpikesBatch):
+            if len(inputSpikes) != self.ilInputSize:
+                raise ValueError("The input spike set " + str(indexBatch) + " has " + str(len(inputSpikes)) +
+                                 " neurons but the input population has " + str(self.ilInputSize))
+            for indexNeuron, spikeTimes in enumerate(inputSpikes):
+                steps = np.rint(np.asarray(spikeTimes, dtype=float) / self.timeStep).astype(int)
+                steps = steps[(steps >= 0) & (steps < numSteps)]
+                raster[steps, indexBatch, indexNeuron] = True
+        return raster
+
+    def run(self, inputSpikes, simTime, recordWeight, weightRecordTimes=None, onlyChanges=False, initialWeights=None):
+        """
+        Simulate the network
+
+        @param inputSpikes: list of spike times (ms) for each neuron of the input population (cue + cont)
+        @param simTime: duration of the simulation in ms
+        @param recordWeight: if record the weights of the CA3cue-CA3cont synapses
+        @param weightRecordTimes: (optional) time stamps (ms) where the weights are recorded, every time step if None
+        @param onlyChanges: (optional) if only keep the weights of the time stamps where a synapse changed
+        @param initialWeights: (optional) weights of the CA3cue-CA3cont synapses at the beginning of the simulation
+            (cueSize x contSize), initWeight of the STDP synapses by default
+        @return: dict with the spikes and membrane potentials of each population (same format as tools.format_neo_data),
+            the weights of CA3cue-CA3cont as a float32 array of time x src neuron x dst neuron and the time stamp of each
+            snapshot (if recordWeight)
+        """
+        return self.run_batch([inputSpikes], simTime, recordWeight, weightRecordTimes, onlyChanges, initialWeights)[0]
+
+    def run_batch(self, inputSpikesBatch, simTime, recordWeight, weightRecordTimes=None, onlyChanges=False,
+                  initialWeights=None):
+        """
+        Simulate K independent copies of the network, each one with its own input spikes, in the same vectorized run
+
+        @param inputSpikesBatch: list with K input spike sets (list of spike times (ms) for each neuron of the input
+            population)
+        @param simTime: duration of the simulation in ms
+        @param recordWeight: if record the weights of the CA3cue-CA3cont synapses
+        @param weightRecordTimes: (optional) time stamps (ms) where the weights are recorded, every time step if None
+        @param onlyChanges: (optional) if only keep the weights of the time stamps where a synapse changed
+        @param initialWeights: (optional) weights of the CA3cue-CA3cont synapses at the beginning of the simulation
+            (cueSize x contSize, the same for all the copies), initWeight of the STDP synapses by default
+        @return: list with the K dicts of recorded data (same format as run)
+        """
+        numBatch = len(inputSpikesBatch)
+        numSteps = int(round(simTime / self.timeStep))
+        inputRaster = self.create_input_raster(inputSpikesBatch, numSteps)
+        stdp = self.synParameters["CA3cueL-CA3contL"]
+        batchIndexes = np.arange(numBatch)
+
+        # Populations
+        CA3cueLayer = IFCurrExpPopulation(numBatch, self.cueSize, self.neuronParameters["CA3cueL"],
+                                          self.initNeuronParameters["CA3cueL"]["vInit"], self.timeStep)
+        CA3contLayer = IFCurrExpPopulation(numBatch, self.contSize, self.neuronParameters["CA3contL"],
+                                           self.initNeuronParameters["CA3contL"]["vInit"], self.timeStep)
+        OLayer = IFCurrExpPopulation(numBatch, self.ilInputSize, self.neuronParameters["OL"],
+                                     self.initNeuronParameters["OL"]["vInit"], self.timeStep)
+        maxDelay = max(self.delaySteps.values()) + self.decoderLatency + self.encoderLatency
+        CA3cueInput = DelayLine(numBatch, self.cueSize, maxDelay)
+        CA3contInput = DelayLine(numBatch, self.contSize, maxDelay)
+        OLInput = DelayLine(numBatch, self.ilInputSize, maxDelay)
+        DGOutput = DelayLine(numBatch, 2 ** self.dgInputSize, maxDelay)
+        CA1Output = DelayLine(numBatch, self.dgInputSize, maxDelay)
+
+        # STDP state: weights and traces of pre (CA3cue) and post (CA3cont) spikes
+        if initialWeights is None:
+            weights = np.full((numBatch, self.cueSize, self.contSize), float(stdp["initWeight"]))
+        else:
+            if np.shape(initialWeights) != (self.cueSize, self.contSize):
+                raise ValueError("The initial weights of CA3cue-CA3cont must be a matrix of " + str(self.cueSize) + " x " +
+                                 str(self.contSize))
+            weights = np.repeat(np.asarray(initialWeights, dtype=float)[None], numBatch, axis=0)
+        preTrace = np.zeros((numBatch, self.cueSize))
+        postTrace = np.zeros((numBatch, self.contSize))
+        preDecay = math.exp(-self.timeStep / stdp["tau_plus"])
+        postDecay = math.exp(-self.timeStep / stdp["tau_minus"])
+
+        # Recorded data
+        vCA3cue = np.zeros((numSteps, numBatch, self.cueSize))
+        vCA3cont = np.zeros((numSteps, numBatch, self.contSize))
+        spikes = {name: np.zeros((numSteps, numBatch, size), dtype=bool) for name, size in
+                  [("CA3cue", self.cueSize), ("CA3cont", self.contSize), ("DG", 2 ** self.dgInputSize),
+                   ("CA1", self.dgInputSize), ("OL", self.ilInputSize)]}
+        # Weights recorded: the snapshot i is taken after i time steps
+        if weightRecordTimes is None:
+            isRecordStep = np.ones(numSteps + 1, dtype=bool)
+        else:
+            isRecordStep = np.zeros(numSteps + 1, dtype=bool)
+            recordSteps = np.rint(np.asarray(weightRecordTimes, dtype=float) / self.timeStep).astype(int)
+            isRecordStep[recordSteps[(recordSteps >= 0) & (recordSteps <= numSteps)]] = True
+        isRecordStep[[0, numSteps]] = True
+        if recordWeight:
+            wHistory = np.zeros((np.count_nonzero(isRecordStep), numBatch, self.cueSize, self.contSize), dtype=np.float32)
+            wHistory[0] = weights
+            wSteps = [0]
+
+        for step in range(numSteps):
+            # IL-DG: the decoder codifies the binary input cue in one-hot
+            inputCue = inputRaster[step, :, :self.dgInputSize]
+            hasInput = inputCue.any(axis=1)
+            decoderOutput = np.zeros((numBatch, 2 ** self.dgInputSize))
+            decoderOutput[batchIndexes[hasInput], np.dot(inputCue[hasInput], self.binaryWeights)] = 1.0
+            if (step + self.decoderLatency) * self.timeStep >= CONSTANT_SOURCE_ONSET:
+                decoderOutput[~hasInput, 0] = 1.0
+            DGOutput.add(step, self.decoderLatency, decoderOutput)
+            firedDG = DGOutput.pop(step) > 0
+            # DG-CA3cue and IL-CA3cont
+            CA3cueInput.add(step, self.delaySteps["DGL-CA3cueL"],
+                            self.staticWeights["DGL-CA3cueL"] * firedDG[:, 1:self.cueSize + 1])
+            CA3contInput.add(step, self.delaySteps["IL-CA3contL"],
+                             self.staticWeights["IL-CA3contL"] * inputRaster[step, :, self.dgInputSize:])
+
+            # CA3 update
+            vCA3cue[step] = CA3cueLayer.v
+            vCA3cont[step] = CA3contLayer.v
+            firedCA3cue = CA3cueLayer.step(CA3cueInput.pop(step))
+            firedCA3cont = CA3contLayer.step(CA3contInput.pop(step))
+
+            # STDP: depression of the arriving presynaptic spikes with previous postsynaptic spikes
+            previousWeights = weights
+            preTrace = preTrace * preDecay
+            postTrace = postTrace * postDecay
+            if firedCA3cue.any():
+                preMask = firedCA3cue[:, :, None]
+                weights = np.where(preMask, np.maximum(weights - stdp["A_minus"] * postTrace[:, None, :], stdp["w_min"]),
+                                   weights)
+                preTrace = preTrace + firedCA3cue
+                # CA3cue-CA3cont delivered with the updated weights
+                CA3contInput.add(step, self.delaySteps["CA3cueL-CA3contL"], np.einsum("kc,kcd->kd", firedCA3cue, weights))
+            # STDP: potentiation of the postsynaptic spikes with previous (and simultaneous) presynaptic spikes
+            if firedCA3cont.any():
+                postMask = firedCA3cont[:, None, :]
+                weights = np.where(postMask, np.minimum(weights + stdp["A_plus"] * preTrace[:, :, None], stdp["w_max"]),
+                                   weights)
+                postTrace = postTrace + firedCA3cont
+
+            # CA3cue-CA1: OR gates of the encoder
+            CA1Output.add(step, self.encoderLatency, np.dot(firedCA3cue, self.encoderMatrix) > 0)
+            firedCA1 = CA1Output.pop(step) > 0
+            # CA1-OL and CA3cont-OL
+            OLInput.add(step, self.delaySteps["CA1L-OL"], self.staticWeights["CA1L-OL"] * firedCA1,
+                        slice(0, self.dgInputSize))
+            OLInput.add(step, self.delaySteps["CA3contL-OL"],
+                        self.staticWeights["CA3contL-OL"] * firedCA3cont,
+                        slice(self.dgInputSize, self.ilInputSize))
+            firedOL = OLayer.step(OLInput.pop(step))
+
+            # Record
+            spikes["CA3cue"][step] = firedCA3cue
+            spikes["CA3cont"][step] = firedCA3cont
+            spikes["DG"][step] = firedDG
+            spikes["CA1"][step] = firedCA1
+            spikes["OL"][step] = firedOL
+            if recordWeight and isRecordStep[step + 1]:
+                if not onlyChanges or step + 1 == numSteps or not np.array_equal(weights, previousWeights):
+                    wHistory[len(wSteps)] = weights
+                    wSteps.append(step + 1)
+
+        # Split the batch in the recorded data of each copy of the network
+        timeStamps = np.arange(numSteps) * self.timeStep
+        formatDataBatch = []
+        for indexBatch in range(numBatch):
+            formatData = {"vCA3cue": vCA3cue[:, indexBatch].T, "vCA3cont": vCA3cont[:, indexBatch].T}
+            for name, raster in spikes.items():
+                formatData["spikes" + name] = [timeStamps[raster[:, indexBatch, indexNeuron]].tolist()
+                                               for indexNeuron in range(raster.shape[2])]
+            if recordWeight:
+                wSnapshots = np.ascontiguousarray(wHistory[:len(wSteps), indexBatch])
+                wTimeStamps = [float(wStep * self.timeStep) for wStep in wSteps]
+                if onlyChanges:
+                    # Other copies of the batch may have changed in some of the snapshots
+                    wSnapshots, wTimeStamps = tools.remove_unchanged_weights(wSnapshots, wTimeStamps)
+                formatData["wCA3cueL_CA3contL"] = wSnapshots
+                formatData["wTimeStamps"] = wTimeStamps
+            formatDataBatch.append(formatData)
+        return formatDataBatch
@@ -0,0 +1,350 @@
+import os
+import math
+import json
+import tempfile
+import numpy as np
+import memory_testbench
+
+"""
+Operation log: compact binary format of the workloads of the memory
+
+Instead of the spike times of each input neuron, it stores the operations: type, cue, content bits and begin time of
+each one. The spikes are expanded from the operations only for the time window simulated
+  * OPERATION_LOG_MAGIC (8 bytes) + length of the header (uint64, little endian) + json header: memory size, holding time
+    of each type of operation, number of operations, end time and dtype, shape and offset of each array
+  * Data section: each array aligned to OPERATION_LOG_ALIGNMENT bytes. "types" (1 bit per operation: 0 = writing and
+    1 = reading), "cues" (smallest unsigned int type for the cues), "contents" (contSize bits per operation) and
+    "startDeltas" (time from the begin of the previous operation, smallest unsigned int type)
+The arrays are memory-mapped when the file is read, so opening a log does not depend on its number of operations
+"""
+
+# Extension of the operation log files
+OPERATION_LOG_EXTENSION = ".oplog"
+OPERATION_LOG_MAGIC = b"HIPPOOPS"
+OPERATION_LOG_ALIGNMENT = 64
+
+
+class OperationLog:
+    """
+    Class used to store a workload of the memory as a sequence of operations and expand it to the spikes of the input
+    population (cue + cont) on demand
+    """
+
+    def __init__(self, cueSizeInBin, contSize, holdingTime, operations, cues, contents, startTimes, endTime):
+        """
+        Init an object of type OperationLog
+
+        @param cueSizeInBin: number of input cue neurons (binary cue)
+        @param contSize: number of input cont neurons (bits of the content)
+        @param holdingTime: number of units of time to hold the values of each type of operation [writing, reading]
+        @param operations: type of each operation (0 = writing and 1 = reading)
+        @param cues: cue of each operation (decimal)
+        @param contents: content of each operation packed in bytes (operations x ceil(contSize/8), most significant
+            bit first, see numpy.packbits)
+        @param startTimes: begin time of each operation (integer units of time, in non-decreasing order)
+        @param endTime: time after the last operation
+        """
+        self.cueSizeInBin = cueSizeInBin
+        self.contSize = contSize
+        self.holdingTime = get_integer_times(holdingTime, "holding times")
+        self.operations = operations
+        self.cues = cues
+        self.contents = contents
+        self.startTimes = startTimes
+        self.endTime = int(endTime)
+
+    @classmethod
+    def from_operations(cls, operations, cues, contents, cueSizeInBin, contSize, operationTime, holdingTime,
+                        currentOperationTime=1, startTimes=None):
+        """
+        Create the operation log of a sequence of operations
+
+        @param operations: type of each operation (0 = writing and 1 = reading)
+        @param cues: cue of each operation (decimal)
+        @param contents: content of each operation: decimal values (lower than 2**64) or binary values (operations x
+            contSize, most significant bit first)
+        @param cueSizeInBin: number of input cue neurons (binary cue)
+        @param contSize: number of input cont neurons (bits of the content)
+        @param operationTime: units of time needed to get to the next operation of each type [writing, reading]
+        @param holdingTime: number of units of time to hold the values of each type of operation [writing, reading]
+        @param currentOperationTime: (optional) time of the first operation, if startTimes is not given
+        @param startTimes: (optional) begin time of each operation, by default each operation begins when the previous
+            one ends (see memory_testbench.get_operation_start_times)
+        @return: the OperationLog
+        """
+        operationTime = get_integer_times(operationTime, "operation times")
+        operations = np.asarray(operations, dtype=np.uint8).reshape(-1)
+        if np.any(operations > 1):
+            raise ValueError("Type of operation not supported. Supported types: 0 (writing) and 1 (reading)")
+        cues = np.asarray(cues, dtype=np.uint64).reshape(-1)
+        if len(cues) != len(operations) or np.any(cues >= 2 ** cueSizeInBin):
+            raise ValueError("There must be a cue for each operation, lower than 2**" + str(cueSizeInBin))
+        contents = np.asarray(contents)
+        if contents.ndim == 1:
+            contents = memory_testbench.values_to_binary_matrix(contents, contSize)
+        if contents.shape != (len(operations), contSize):
+            raise ValueError("The contents must have " + str(contSize) + " bits for each operation")
+        times = memory_testbench.get_operation_start_times(operations, operationTime, currentOperationTime)
+        if startTimes is None:
+            startTimes = times[:-1]
+        startTimes = np.asarray(startTimes).reshape(-1)
+        if len(startTimes) != len(operations):
+            raise ValueError("The number of start times must be the number of operations")
+        if np.any(startTimes != np.round(startTimes)) or np.any(np.diff(startTimes) < 0):
+            raise ValueError("The start times of the operations must be integer and in non-decreasing order")
+        startTimes = startTimes.astype(np.int64)
+        endTime = startTimes[-1] + np.asarray(operationTime)[operations[-1]] if len(operations) > 0 else currentOperationTime
+        return cls(cueSizeInBin, contSize, holdingTime, operations, cues, np.packbits(contents.astype(bool), axis=1),
+                   startTimes, endTime)
+
+    @classmethod
+    def read(cls, fullPath):
+        """
+        Open an operation log file: its arrays are memory-mapped, only the start times are decoded
+
+        @param fullPath: path + filename to the operation log
+        @return: the OperationLog
+        """
+        with open(fullPath, "rb") as file:
+            if file.read(len(OPERATION_LOG_MAGIC)) != OPERATION_LOG_MAGIC:
+                raise ValueError("The file " + fullPath + " is not an operation log")
+            headerLength = int.from_bytes(file.read(8), "little")
+            header = json.loads(file.read(headerLength).decode("utf-8"))
+        dataBegin = get_data_begin(headerLength)
+
+        fileMap = np.memmap(fullPath, dtype=np.uint8, mode="r")
+        arrays = {}
+        for name, arrayInfo in header["arrays"].items():
+            dtype = np.dtype(arrayInfo["dtype"])
+            numBytes = int(np.prod(arrayInfo["shape"])) * dtype.itemsize
+            begin = dataBegin + arrayInfo["offset"]
+            arrays[name] = fileMap[begin:begin + numBytes].view(dtype).reshape(arrayInfo["shape"])
+        numOperations = header["numOperations"]
+        operations = np.unpackbits(arrays["types"], count=numOperations)
+        startTimes = np.cumsum(arrays["startDeltas"], dtype=np.int64)
+        return cls(header["cueSizeInBin"], header["contSize"], header["holdingTime"], operations, arrays["cues"],
+                   arrays["contents"], startTimes, header["endTime"])
+
+    def write(self, basePath, filename):
+        """
+        Store the operation log in a file
+
+        @param basePath: directory path where the file will be stored
+        @param filename: name of the file (without extension)
+        @return: full path to the file created, name of the file created
+        """
+        startDeltas = np.diff(self.startTimes, prepend=0) if len(self.startTimes) > 0 else np.zeros(0, dtype=np.int64)
+        arrays = {"types": np.packbits(np.asarray(self.operations, dtype=bool)),
+                  "cues": np.asarray(self.cues).astype(np.min_scalar_type(int(np.max(self.cues, initial=0)))),
+                  "contents": np.asarray(self.contents, dtype=np.uint8),
+                  "startDeltas": startDeltas.astype(np.min_scalar_type(int(np.max(startDeltas, initial=0))))}
+        header = get_header(self.cueSizeInBin, self.contSize, self.holdingTime, len(self), self.endTime,
+                            {name: (array.dtype, array.shape) for name, array in arrays.items()})
+        fullPath = basePath + filename + OPERATION_LOG_EXTENSION
+        with open(fullPath, "wb") as file:
+            write_header(file, header)
+            for array in arrays.values():
+                file.write(np.ascontiguousarray(array).tobytes())
+                file.write(bytes(-array.nbytes % OPERATION_LOG_ALIGNMENT))
+        return fullPath, filename
+
+    def __len__(self):
+        return len(self.operations)
+
+    def get_last_spike_time(self):
+        """
+        Get the time of the last input spike of the workload
+
+        @return: time of the last spike (0 if there is no spike)
+        """
+        # Operations with spikes: a cue different from 0 or a writing operation of a content different from 0, held
+        #  for some time
+        operations = np.asarray(self.operations, dtype=int)
+        holdings = np.asarray(self.holdingTime)[operations]
+        hasSpikes = ((np.asarray(self.cues) != 0) | ((operations == 0) & np.asarray(self.contents).any(axis=1))) & \
+                    (holdings > 0)
+        return int((self.startTimes + holdings - 1)[hasSpikes].max(initial=0))
+
+    def get_operation_range(self, beginTime=None, endTime=None):
+        """
+        Get the operations that can have spikes in a time window
+
+        @param beginTime: (optional) begin of the window, from the beginning of the workload by default
+        @param endTime: (optional) end of the window (not included), until the end of the workload by default
+        @return: index of the first operation and index after the last operation
+        """
+        first = 0 if beginTime is None else \
+            int(np.searchsorted(self.startTimes, beginTime - max(self.holdingTime), side="right"))
+        last = len(self) if endTime is None else int(np.searchsorted(self.startTimes, endTime, side="left"))
+        return first, max(first, last)
+
+    def get_input_spikes(self, beginTime=None, endTime=None):
+        """
+        Expand the operations of a time window to the spike times of the input neurons
+
+        @param beginTime: (optional) begin of the window, from the beginning of the workload by default
+        @param endTime: (optional) end of the window (not included), until the end of the workload by default
+        @return: list of spike times of each cue neuron and list of spike times of each cont neuron (most significant
+            bit first, as in the input_spikes.ini files)
+        """
+        first, last = self.get_operation_range(beginTime, endTime)
+        binaryCue = memory_testbench.values_to_binary_matrix(self.cues[first:last], self.cueSizeInBin)
+        binaryCont = np.unpackbits(self.contents[first:last], axis=1, count=self.contSize)
+        return memory_testbench.expand_operations(self.operations[first:last], binaryCue, binaryCont,
+                                                  self.startTimes[first:last], self.holdingTime, beginTime, endTime)
+
+
+def get_integer_times(times, name):
+    """
+    Check that the times of each type of operation are integer units of time (the only ones an operation log stores)
+
+    @param times: time of each type of operation [writing, reading]
+    @param name: name of the times in the error message
+    @return: list of the times as int or raise a ValueError if any of them is not integer
+    """
+    if any(value != int(value) for value in times):
+        raise ValueError("The " + name + " of an operation log must be integer units of time, got " + str(list(times)))
+    return [int(value) for value in times]
+
+
+def get_data_begin(headerLength):
+    """
+    Get the position of the data section of an operation log
+
+    @param headerLength: length of the json header in bytes
+    @return: offset of the data section from the file beginning
+    """
+    return -(-(len(OPERATION_LOG_MAGIC) + 8 + headerLength) // OPERATION_LOG_ALIGNMENT) * OPERATION_LOG_ALIGNMENT
+
+
+def get_header(cueSizeInBin, contSize, holdingTime, numOperations, endTime, arrays):
+    """
+    Get the header of an operation log: the offset of each array in the data section is aligned to
+    OPERATION_LOG_ALIGNMENT bytes
+
+    @param cueSizeInBin: number of input cue neurons (binary cue)
+    @param contSize: number of input cont neurons (bits of the content)
+    @param holdingTime: number of units of time to hold the values of each type of operation [writing, reading]
+    @param numOperations: number of operations of the log
+    @param endTime: time after the last operation
+    @param arrays: dict of name -> (dtype, shape) of each array, in the order they are stored
+    @return: dict with the header
+    """
+    header = {"cueSizeInBin": cueSizeInBin, "contSize": contSize, "holdingTime": [int(holding) for holding in holdingTime],
+              "numOperations": int(numOperations), "endTime": int(endTime), "arrays": {}}
+    offset = 0
+    for name, (dtype, shape) in arrays.items():
+        header["arrays"][name] = {"dtype": np.dtype(dtype).str, "shape": [int(size) for size in shape], "offset": offset}
+        numBytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += -(-numBytes // OPERATION_LOG_ALIGNMENT) * OPERATION_LOG_ALIGNMENT
+    return header
+
+
+def write_header(file, header):
+    """
+    Write the magic number and the header of an operation log at the beginning of a file. The header is padded so the
+    data section begins aligned
+
+    @param file: file opened in binary write mode
+    @param header: dict with the header (see get_header)
+    @return:
+    """
+    headerBytes = json.dumps(header).encode("utf-8")
+    headerBytes = headerBytes.ljust(get_data_begin(len(headerBytes)) - len(OPERATION_LOG_MAGIC) - 8)
+    file.write(OPERATION_LOG_MAGIC)
+    file.write(len(headerBytes).to_bytes(8, "little"))
+    file.write(headerBytes)
+
+
+def write_operation_log_chunks(chunks, basePath, filename, blockSize=2 ** 20):
+    """
+    Store a workload given as a sequence of operation logs (chunks of consecutive operations) in one operation log file,
+    without holding the whole workload in memory: the arrays of the chunks are spilled to temporary files and then
+    copied in blocks to the data section
+
+    @param chunks: iterable of OperationLog with the same memory size and holding times, each one beginning after the
+        begin of the last operation of the previous one
+    @param basePath: directory path where the file will be stored
+    @param filename: name of the file (without extension)
+    @param blockSize: (optional) number of operations copied at the same time
+    @return: full path to the file created, name of the file created, number of operations stored
+    """
+    blockSize = -(-blockSize // 8) * 8
+    with tempfile.TemporaryDirectory(dir=basePath) as spillPath:
+        spillFiles = {name: open(os.path.join(spillPath, name), "wb+") for name in
+                      ["types", "cues", "contents", "startDeltas"]}
+        try:
+            firstChunk = None
+            numOperations, lastStartTime, endTime, maxCue, maxDelta = 0, 0, 1, 0, 0
+            for chunk in chunks:
+                if firstChunk is None:
+                    firstChunk, endTime = chunk, chunk.endTime
+                elif chunk.cueSizeInBin != firstChunk.cueSizeInBin or chunk.contSize != firstChunk.contSize or \
+                        chunk.holdingTime != firstChunk.holdingTime:
+                    raise ValueError("All the chunks of an operation log must have the same memory size and holding "
+                                     "times")
+                if len(chunk) == 0:
+                    continue
+                startTimes = np.asarray(chunk.startTimes, dtype=np.int64)
+                if startTimes[0] < lastStartTime:
+                    raise ValueError("The chunks of an operation log must be in non-decreasing order of time")
+                startDeltas = np.diff(startTimes, prepend=lastStartTime)
+                cues = np.asarray(chunk.cues, dtype=np.uint64)
+                spillFiles["types"].write(np.asarray(chunk.operations, dtype=np.uint8).tobytes())
+                spillFiles["cues"].write(cues.tobytes())
+                spillFiles["contents"].write(np.ascontiguousarray(chunk.contents, dtype=np.uint8).tobytes())
+                spillFiles["startDeltas"].write(startDeltas.tobytes())
+                numOperations += len(chunk)
+                lastStartTime, endTime = int(startTimes[-1]), chunk.endTime
+                maxCue, maxDelta = max(maxCue, int(cues.max())), max(maxDelta, int(startDeltas.max()))
+            if firstChunk is None:
+                raise ValueError("The workload must have at least one chunk")
+
+            contBytes = -(-firstChunk.contSize // 8)
+            arrays = {"types": (np.uint8, (-(-numOperations // 8),)),
+                      "cues": (np.min_scalar_type(maxCue), (numOperations,)),
+                      "contents": (np.uint8, (numOperations, contBytes)),
+                      "startDeltas": (np.min_scalar_type(maxDelta), (numOperations,))}
+            # Spilled dtype and number of bytes per operation of each array
+            spillFormats = {"types": (np.uint8, 1), "cues": (np.uint64, 1), "contents": (np.uint8, contBytes),
+                            "startDeltas": (np.int64, 1)}
+            header = get_header(firstChunk.cueSizeInBin, firstChunk.contSize, firstChunk.holdingTime, numOperations,
+                                endTime, arrays)
+            fullPath = basePath + filename + OPERATION_LOG_EXTENSION
+            with open(fullPath, "wb") as file:
+                write_header(file, header)
+                for name, (dtype, shape) in arrays.items():
+                    spillFile = spillFiles[name]
+                    spillFile.flush()
+                    spillFile.seek(0)
+                    spillDtype, itemsPerOperation = spillFormats[name]
+                    numBytes = 0
+                    for begin in range(0, numOperations, blockSize):
+                        block = np.fromfile(spillFile, dtype=spillDtype,
+                                            count=min(blockSize, numOperations - begin) * itemsPerOperation)
+                        block = np.packbits(block.astype(bool)) if name == "types" else block.astype(dtype)
+                        file.write(block.tobytes())
+                        numBytes += block.nbytes
+                    file.write(bytes(-numBytes % OPERATION_LOG_ALIGNMENT))
+        finally:
+            for spillFile in spillFiles.values():
+                spillFile.close()
+    return fullPath, filename, numOperations
+
+
+def read_operation_log(fullPath, cueSize, contSize):
+    """
+    Open an operation log file and check it against the size of the memory
+
+    @param fullPath: path + filename to the operation log
+    @param cueSize: max number of patterns to store (the log must have ceil(log2(cueSize+1)) cue neurons)
+    @param contSize: size of patterns to store (the log must have contSize content neurons)
+    @return: the OperationLog
+    """
+    operationLog = OperationLog.read(fullPath)
+    cueSizeInBin = math.ceil(math.log2(cueSize + 1))
+    if operationLog.cueSizeInBin != cueSizeInBin or operationLog.contSize != contSize:
+        raise ValueError("The operation log " + fullPath + " has " + str(operationLog.cueSizeInBin) + " cue and " +
+                         str(operationLog.contSize) + " cont neurons, the memory needs " + str(cueSizeInBin) + " and " +
+                         str(contSize))
+    return operationLog
@@ -0,0 +1,201 @@
+import copy
+import time
+import random
+import itertools
+import concurrent.futures
+import config_loader
+import DG_CA3_CA1_one_hot
+import tools
+
+
+def get_parameter(parameters, path):
+    """
+    Get a parameter of the network from its path
+
+    @param parameters: network parameters (network_config.json) -> {"neuronParameters", "initNeuronParameters",
+        "synParameters"}
+    @param path: keys of the parameter separated by dots, e.g. "neuronParameters.CA3cueL.v_thresh" or
+        "synParameters.CA3cueL-CA3contL.tau_plus"
+    @return: value of the parameter
+    """
+    value = parameters
+    for key in path.split("."):
+        value = value[key]
+    return value
+
+
+def set_parameter(parameters, path, value):
+    """
+    Change a parameter of the network from its path
+
+    @param parameters: network parameters (network_config.json)
+    @param path: keys of the parameter separated by dots (see get_parameter)
+    @param value: new value of the parameter
+    @return:
+    """
+    keys = path.split(".")
+    container = get_parameter(parameters, ".".join(keys[:-1])) if len(keys) > 1 else parameters
+    if keys[-1] not in container:
+        raise KeyError("The parameter " + path + " does not exist in the network parameters")
+    container[keys[-1]] = value
+
+
+def generate_grid_points(searchSpace):
+    """
+    Get all the points of a grid search
+
+    @param searchSpace: dict of parameter path -> list of values of the parameter
+    @return: list of points (dict of parameter path -> value), one for each combination of values
+    """
+    paths = list(searchSpace.keys())
+    return [dict(zip(paths, values)) for values in itertools.product(*[searchSpace[path] for path in paths])]
+
+
+def generate_random_points(searchSpace, numPoints, seed=None):
+    """
+    Get the points of a random search
+
+    @param searchSpace: dict of parameter path -> [min, max] (uniform distribution, integer if both are int) or list of
+        more than 2 values (one of them is chosen)
+    @param numPoints: number of points
+    @param seed: (optional) seed of the random generator
+    @return: list of points (dict of parameter path -> value)
+    """
+    generator = random.Random(seed)
+    points = []
+    for indexPoint in range(numPoints):
+        point = {}
+        for path, values in searchSpace.items():
+            if len(values) != 2:
+                point[path] = generator.choice(values)
+            elif isinstance(values[0], int) and isinstance(values[1], int):
+                point[path] = generator.randint(values[0], values[1])
+            else:
+                point[path] = generator.uniform(values[0], values[1])
+        points.append(point)
+    return points
+
+
+def run_sweep_point(point, baseParameters, inputSpikes, simTime):
+    """
+    Simulate the network (numpy backend) with the parameters of a point of the sweep and evaluate its read operations.
+    It is executed in a worker process
+
+    @param point: dict of parameter path -> value, the rest of parameters are the ones of baseParameters
+    @param baseParameters: parameters of the memory (see DG_CA3_CA1_one_hot.read_network_parameters)
+    @param inputSpikes: spike times of the input population
+    @param simTime: duration of the simulation in ms
+    @return: dict -> "point", "status" ("ok" or "error"), "error", "time" (wall clock time in s) and the recall score
+        (see tools.get_recall_score) if status is "ok"
+    """
+    result = {"point": point, "status": "error", "error": "", "time": 0.0}
+    beginTime = time.perf_counter()
+    try:
+        parameters = copy.deepcopy(baseParameters)
+        for path, value in point.items():
+            set_parameter(parameters, path, value)
+        parameters["inputSpikes"] = inputSpikes
+        parameters["simulationParameters"]["simTime"] = simTime
+        network = DG_CA3_CA1_one_hot.MemoryNetwork(**parameters)
+        formatData = network.run_numpy(False)
+        # First output spike possible: decoder (IL-DG) and DG-CA3cue
+        minLatency = 3 * parameters["synParameters"]["IL-DGL"]["delay"] + parameters["synParameters"]["DGL-CA3cueL"]["delay"]
+        result.update(tools.get_recall_score(inputSpikes, formatData["spikesOL"], network.dgInputSize,
+                                             network.simulationParameters["timeStep"], simTime, minLatency))
+        result["status"] = "ok"
+    except Exception as e:
+        result["error"] = repr(e)
+    result["time"] = time.perf_counter() - beginTime
+    return result
+
+
+def run_sweep(points, baseParameters, inputSpikes, simTime, numWorkers):
+    """
+    Simulate and evaluate all the points of a sweep, up to numWorkers at the same time
+
+    @param points: list of points (dict of parameter path -> value)
+    @param baseParameters: parameters of the memory (see DG_CA3_CA1_one_hot.read_network_parameters)
+    @param inputSpikes: spike times of the input population
+    @param simTime: duration of the simulation in ms
+    @param numWorkers: number of processes used to simulate the points concurrently
+    @return: list with the result of each point (see run_sweep_point), ordered from the best to the worst: higher accuracy,
+        fewer bit errors and lower mean latency
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(numWorkers, 1)) as executor:
+        results = list(executor.map(run_sweep_point, points, [baseParameters] * len(points), [inputSpikes] * len(points),
+                                    [simTime] * len(points)))
+    results.sort(key=lambda result: (result["status"] != "ok", -result.get("accuracy", 0), result.get("bitErrors", 0),
+                                     result.get("meanLatency") if result.get("meanLatency") is not None else float("inf")))
+    return results
+
+
+def format_sweep_table(results, paths):
+    """
+    Create a text table with one row for each point of the sweep: value of each parameter, accuracy, correct reads,
+    bit errors, mean and max latency
+
+    @param results: list with the result of each point (see run_sweep_point)
+    @param paths: parameter paths of the sweep
+    @return: list of lines of the table
+    """
+    headers = [path.split(".", 1)[1] for path in paths] + ["accuracy", "correct", "bitErrors", "meanLatency", "maxLatency"]
+    rows = []
+    for result in results:
+        row = ["{:g}".format(result["point"][path]) if isinstance(result["point"][path], (int, float))
+               else str(result["point"][path]) for path in paths]
+        if result["status"] == "ok":
+            row += ["{:.3f}".format(result["accuracy"]), str(result["numCorrect"]) + "/" + str(result["numReads"]),
+                    str(result["bitErrors"])]
+            row += ["-" if result[key] is None else "{:g}".format(result[key]) for key in ["meanLatency", "maxLatency"]]
+        else:
+            row += ["error: " + result["error"]]
+        rows.append(row)
+    widths = [max([len(headers[index])] + [len(row[index]) for row in rows if index < len(row)])
+              for index in range(len(headers))]
+    lines = ["  ".join(header.ljust(widths[index]) for index, header in enumerate(headers))]
+    for row in rows:
+        lines.append("  ".join(value.ljust(widths[index]) for index, value in enumerate(row)).rstrip())
+    return lines
+
+
+if __name__ == "__main__":
+    # Read the config files: active config file directory and parameter sweep parameters
+    activeConfigFilePath = config_loader.get_active_config_path()
+    sweepParameters = config_loader.read_sweep_parameters(activeConfigFilePath)
+
+    # + Type of search: "grid" or "random"
+    searchType = sweepParameters["searchType"]
+    # + Values of each parameter (grid: list of values, random: [min, max] or list of values)
+    searchSpace = sweepParameters["searchSpace"]
+    # + Number of points and seed of the random search
+    numRandomPoints = sweepParameters["numRandomPoints"]
+    randomSeed = sweepParameters["randomSeed"]
+    # + Input spikes used to evaluate each point ("" for the input_spikes.ini of the active config files) and simulation
+    #   time (None for the simTime of the simulation parameters)
+    inputSpikesPath = sweepParameters["inputSpikesPath"]
+    sweepSimTime = sweepParameters["simTime"]
+    # + Number of points simulated concurrently
+    numWorkers = sweepParameters["numWorkers"]
+    # + Path to store the table of results
+    sweepSavePath = sweepParameters["sweepSavePath"]
+
+    if searchType == "grid":
+        points = generate_grid_points(searchSpace)
+    elif searchType == "random":
+        points = generate_random_points(searchSpace, numRandomPoints, randomSeed)
+    else:
+        raise ValueError("Type of search not supported. Supported types: grid and random")
+    baseParameters = DG_CA3_CA1_one_hot.read_network_parameters(activeConfigFilePath)
+    simTime = sweepSimTime if sweepSimTime is not None else baseParameters["simulationParameters"]["simTime"]
+    inputSpikes = DG_CA3_CA1_one_hot.read_input_spikes(inputSpikesPath, baseParameters["cueSize"],
+                                                       baseParameters["contSize"], baseParameters["endianness"],
+                                                       simTime) if inputSpikesPath else baseParameters["inputSpikes"]
+
+    beginTime = time.perf_counter()
+    results = run_sweep(points, baseParameters, inputSpikes, simTime, numWorkers)
+    lines = format_sweep_table(results, list(searchSpace.keys()))
+    print("\n".join(lines))
+    print(str(len(points)) + " points evaluated in " + "{:.2f}".format(time.perf_counter() - beginTime) + " s")
+    if tools.check_and_create_folder(sweepSavePath):
+        fullPath, filename = tools.write_txt_with_stamp(sweepSavePath, "sweep_" + searchType, "\n".join(lines) + "\n")
+        print("Results stored in: " + fullPath)
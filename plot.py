@@ -1,19 +1,27 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
-from operator import itemgetter
 import tools
 from excel_controller import ExcelSpikeTracer
+from spike_index import SpikeIndex
+from trace_table import get_trace_table, TRACE_TABLE_NUM_VALUES
 
 
-def plot_weight_syn_in_single_neuron(x_neuronId, y_timestamp, z_weight, zlimit, xlimit, colors, xlabel, ylabel, zlabel, figSize, fontsize, figTitle, iSplot, iSsave, saveFigName, saveFigPath):
+# Max number of time stamps with spikes labelled in plot_spike_sequence (with more, only every k-th one is labelled)
+MAX_SPIKE_SEQUENCE_LABELS = 200
+# Max k of the labelling of every k-th time stamp with spikes in plot_spike_sequence (with more, it is plotted as a
+#  raster)
+MAX_SPIKE_SEQUENCE_THINNING = 8
+
+
+def plot_weight_syn_in_single_neuron(timeStamps, weights, srcNeuronIds, zlimit, xlimit, colors, xlabel, ylabel, zlabel, figSize, fontsize, figTitle, iSplot, iSsave, saveFigName, saveFigPath):
     """
     Plots the evolution of the weight of all input synapses on a postsynaptic neuron (3D figure). For each synapse 
     (x axis) is represented the weight (z axis) in each time stamp (y axis) during the simulation.
 
-    :param x_neuronId: streams of presynaptic neurons ID with synapses to the same neuron
-    :param y_timestamp: streams of time stamps
-    :param z_weight: streams of weight for each input synapses
+    :param timeStamps: time stamp of each weight snapshot
+    :param weights: weight of each input synapse in each time stamp (array of time x src neuron)
+    :param srcNeuronIds: presynaptic neurons ID of the input synapses (columns of weights)
     :param zlimit: list of 2 elements, min and max value to label z axis
     :param xlimit: list of 2 elements, min and max value to label x axis
     :param colors: color list to represent each synapse
@@ -32,23 +40,17 @@ def plot_weight_syn_in_single_neuron(x_neuronId, y_timestamp, z_weight, zlimit,
     fig = plt.figure(figsize=figSize)
     ax = plt.axes(projection="3d")
 
-    # For each unique neuron ID, represent the evolution of weight
-    xUniqueValues = list(set(x_neuronId))
-    for xUniqueValue in xUniqueValues:
-        # Extract all x indeces which have the same x value (for the same neuron ID)
-        xIndeces = [i for i, value in enumerate(x_neuronId) if value == xUniqueValue]
-        # Extract the values for the neuron ID, time stamp and weight information of the unique neuronID-value indeces 
-        xForSameX = itemgetter(*xIndeces)(x_neuronId)
-        yForSameX = itemgetter(*xIndeces)(y_timestamp)
-        zForSameX = itemgetter(*xIndeces)(z_weight)
-        ax.plot(xForSameX, yForSameX, zForSameX, color=colors[xUniqueValue], label="Neuron ID " + str(xUniqueValue))
+    # For each presynaptic neuron ID, represent the evolution of weight
+    for indexSrc, srcNeuronId in enumerate(srcNeuronIds):
+        ax.plot(np.full(len(timeStamps), srcNeuronId), timeStamps, weights[:, indexSrc], color=colors[srcNeuronId],
+                label="Neuron ID " + str(srcNeuronId))
 
     # Metadata
     ax.set_title(figTitle, fontsize=fontsize)
     ax.set_xlabel(xlabel, fontsize=fontsize)
     ax.set_ylabel(ylabel, fontsize=fontsize)
     ax.set_zlabel(zlabel, fontsize=fontsize)
-    ax.set_xticks(xUniqueValues)
+    ax.set_xticks(list(srcNeuronIds))
     ax.set_zlim3d(zlimit[0], zlimit[1])
     ax.set_xlim3d(xlimit[0], xlimit[1])
     ax.legend(fontsize=fontsize)
@@ -61,15 +63,13 @@ def plot_weight_syn_in_single_neuron(x_neuronId, y_timestamp, z_weight, zlimit,
     plt.close()
 
 
-def plot_weight_syn_in_all_neuron(srcNeuronIds, dstNeuronIds, timeStreams, weightsStream, zlimit, colors, baseFigTitle, figSize, fontsize, iSplot, iSsave, saveFigName, saveFigPath):
+def plot_weight_syn_in_all_neuron(timeStamps, weights, zlimit, colors, baseFigTitle, figSize, fontsize, iSplot, iSsave, saveFigName, saveFigPath, dstNeuronIds=None):
     """
     Create a 3D graph for each postsynaptic neuron ID showing the evolution of the weight of each input synapse 
     throughout the simulation.
 
-    :param srcNeuronIds: presynaptic neurons ID stream
-    :param dstNeuronIds: postsynaptic neurons ID stream
-    :param timeStreams: time stamp stream
-    :param weightsStream: stream of synapses weight
+    :param timeStamps: time stamp of each weight snapshot
+    :param weights: weight history (array of time x presynaptic neuron x postsynaptic neuron)
     :param zlimit: list of 2 elements, min and max value to label z axis (weight)
     :param colors: color list to represent each synapse, it needs a lenght of the max numbers of synapse input
     :param baseFigTitle: base name of the fig title
@@ -79,28 +79,76 @@ def plot_weight_syn_in_all_neuron(srcNeuronIds, dstNeuronIds, timeStreams, weigh
     :param iSsave: bool, if save the figure in a png file
     :param saveFigName: (optional) base name of the output png file
     :param saveFigPath: (optional) path where to store the png file
+    :param dstNeuronIds: (optional) postsynaptic neurons ID to plot, by default all of them
     :return:
     """
-    # For each postsynaptic neuron ID
-    dstUniqueIds = list(set(dstNeuronIds))
-    for dstNeuronId in dstUniqueIds:
-        # Extract all postsynaptic neuron ID indeces for the same neuron ID
-        dstIndeces = [i for i, value in enumerate(dstNeuronIds) if value == dstNeuronId]
-        # Extract the values for the neuron ID, time stamp and weight information of the unique neuronID-value indeces 
-        srcForSameDst = itemgetter(*dstIndeces)(srcNeuronIds)
-        timeForSameDst = itemgetter(*dstIndeces)(timeStreams)
-        wForSameDst = itemgetter(*dstIndeces)(weightsStream)
-
-        # Plot it
-        plot_weight_syn_in_single_neuron(x_neuronId=srcForSameDst, y_timestamp=timeForSameDst, z_weight=wForSameDst,
-                                         zlimit=zlimit, xlimit=[0, len(dstUniqueIds)],
+    numSrcNeurons, numDstNeurons = weights.shape[1], weights.shape[2]
+    if dstNeuronIds is None:
+        dstNeuronIds = range(numDstNeurons)
+    # For each postsynaptic neuron ID, its input synapses are a column of the weight matrix
+    for dstNeuronId in dstNeuronIds:
+        plot_weight_syn_in_single_neuron(timeStamps=timeStamps, weights=weights[:, :, dstNeuronId],
+                                         srcNeuronIds=range(numSrcNeurons), zlimit=zlimit, xlimit=[0, numSrcNeurons],
                                          colors=colors, xlabel="Src Neuron", ylabel="Time (ms)", zlabel="Synaptic weight (nA)",
                                          figSize=figSize, fontsize=fontsize, figTitle=baseFigTitle + str(dstNeuronId),
                                          iSplot=iSplot, iSsave=iSsave, saveFigName=saveFigName + "_w_Ni_N" + str(dstNeuronId),
                                          saveFigPath=saveFigPath)
 
 
-def plot_spike_sequence(spikesInfo, timeStream, numCueBinaryNeuron, numContNeuron, spikeAmplitude, marginAddLim, fontsize, figSize, figTitle, isPlot, isSave, saveFigName, saveFigPath):
+def plot_weight_matrix_evolution(timeStamps, weights, zlimit, numWindows, figTitle, figSize, fontsize, iSplot, iSsave, saveFigName, saveFigPath):
+    """
+    Plot the evolution of the full weight matrix (presynaptic x postsynaptic neurons) in a single figure: the simulation
+    is split in time windows and each tile is a heatmap of the weights at the end of a window
+
+    :param timeStamps: time stamp of each weight snapshot
+    :param weights: weight history (array of time x presynaptic neuron x postsynaptic neuron)
+    :param zlimit: list of 2 elements, min and max value of the color scale (weight)
+    :param numWindows: number of time windows (tiles) in the figure, as much as the number of snapshots
+    :param figTitle: title of the figure
+    :param figSize: set of 2 values, the size of the figure
+    :param fontsize: size of the font used in the figure
+    :param iSplot: bool, if plot the figure
+    :param iSsave: bool, if save the figure in a png file
+    :param saveFigName: (optional) name of the output png file
+    :param saveFigPath: (optional) path where to store the png file
+    :return: full path (path + fig name) where the figure has been stored, if isSave is True
+    """
+    timeStamps = np.asarray(timeStamps, dtype=float)
+    numWindows = max(min(numWindows, len(timeStamps)), 1)
+    # Weights at the end of each window: the last snapshot taken until then (snapshots may only be stored on changes)
+    windowEnds = np.linspace(timeStamps[0], timeStamps[-1], numWindows + 1)[1:]
+    snapshotIndexes = np.searchsorted(timeStamps, windowEnds, side="right") - 1
+
+    numColumns = int(np.ceil(np.sqrt(numWindows)))
+    numRows = int(np.ceil(numWindows / numColumns))
+    fig, axes = plt.subplots(numRows, numColumns, figsize=figSize, squeeze=False, sharex=True, sharey=True)
+    for indexWindow, ax in enumerate(axes.flat):
+        if indexWindow >= numWindows:
+            ax.axis("off")
+            continue
+        image = ax.imshow(weights[snapshotIndexes[indexWindow]], vmin=zlimit[0], vmax=zlimit[1], cmap="viridis",
+                          aspect="auto", interpolation="nearest", origin="lower")
+        ax.set_title("t = " + "{:g}".format(windowEnds[indexWindow]) + " ms", fontsize=fontsize)
+    # Metadata
+    for ax in axes[-1]:
+        ax.set_xlabel("Dst Neuron", fontsize=fontsize)
+    for ax in axes[:, 0]:
+        ax.set_ylabel("Src Neuron", fontsize=fontsize)
+    fig.suptitle(figTitle, fontsize=fontsize)
+    colorbar = fig.colorbar(image, ax=axes.ravel().tolist())
+    colorbar.set_label("Synaptic weight (nA)", fontsize=fontsize)
+
+    # Save and/or plot the figure
+    if iSsave:
+        plt.savefig(saveFigPath + saveFigName + ".png")
+    if iSplot:
+        plt.show()
+    plt.close()
+
+    return saveFigPath + saveFigName + ".png"
+
+
+def plot_spike_sequence(spikesInfo, timeStream, numCueBinaryNeuron, numContNeuron, spikeAmplitude, marginAddLim, fontsize, figSize, figTitle, isPlot, isSave, saveFigName, saveFigPath, spikeIndex=None, maxLabels=MAX_SPIKE_SEQUENCE_LABELS, maxThinning=MAX_SPIKE_SEQUENCE_THINNING):
     """
     Plot all spikes of population of neuron given throughout the simulation.
 
@@ -118,66 +166,102 @@ def plot_spike_sequence(spikesInfo, timeStream, numCueBinaryNeuron, numContNeuro
     @param iSsave: bool, if save the figure in a png file
     @param saveFigName: (optional) base name of the output png file
     @param saveFigPath: (optional) path where to store the png file
+    @param spikeIndex: (optional) SpikeIndex of the populations of spikesInfo over timeStream, created if not given
+    @param maxLabels: (optional) max number of time stamps with spikes to mark in the x axis and to annotate with the
+        neurons fired. If there are more, only every k-th time stamp with spikes is marked and annotated
+    @param maxThinning: (optional) max k of the marking of every k-th time stamp with spikes. If a greater k is needed
+        (long simulations), the spikes are plotted as a raster (a row for each neuron) with automatic ticks and without
+        annotations
     @return: full path (path + fig name) where the figure has been stored, if isSave is True
     """
+    if spikeIndex is None:
+        spikeIndex = SpikeIndex(spikesInfo, timeStream)
     plt.figure(figsize=figSize)
-    
-    # Add spikes for each population of neuron that has been passed
-    listXticks = [0, max(timeStream) + 1]
+
+    # Time stamps with spikes of the neurons drawn (the DG neuron 0 is not drawn). If there are too many to label them,
+    #  only every k-th one is labelled and long simulations (k greater than maxThinning) are plotted as a raster: a row
+    #  for each neuron
+    activeTicks = np.unique(np.concatenate(
+        [spikeIndex.ticks[population][spikeIndex.neurons[population] != 0]
+         if spikesInfoSinglePop["label"] == "DG" else spikeIndex.ticks[population]
+         for population, spikesInfoSinglePop in spikesInfo.items()] + [np.zeros(0, dtype=int)]))
+    labelStep = -(-len(activeTicks) // max(maxLabels, 1))
+    isRaster = labelStep > maxThinning
+    activeTicks = activeTicks[::max(labelStep, 1)]
+
+    # Add spikes for each population of neuron that has been passed, all the neurons of a population in a single
+    #  collection of lines
+    rasterRow = 0
+    rasterLabelRows = []
     for spikesInfoSinglePop in spikesInfo.values():
         label = spikesInfoSinglePop["label"]
-        for indexNeuron, spikeStream in enumerate(spikesInfoSinglePop["spikeStream"]):
-            if label == "DG" and indexNeuron == 0:
-                continue
-            plt.vlines(spikeStream, ymin=0, ymax=spikeAmplitude, color=spikesInfoSinglePop["color"], label=label)
-            label = "_nolegend_"
-            # List of values to mark in axis
-            listXticks = listXticks + spikeStream
-
-    # Create custom labels for each time stamp where all neuron that spikes in each time stamp are grouped
-    for stamp in timeStream:
+        spikeStreams = [np.asarray(spikeStream, dtype=float).ravel()
+                        for indexNeuron, spikeStream in enumerate(spikesInfoSinglePop["spikeStream"])
+                        if not (label == "DG" and indexNeuron == 0)]
+        spikeTimesPop = np.concatenate(spikeStreams) if spikeStreams else np.zeros(0)
+        if isRaster:
+            rows = rasterRow + np.repeat(np.arange(len(spikeStreams)), [len(spikeStream) for spikeStream in spikeStreams])
+            plt.vlines(spikeTimesPop, ymin=rows - 0.4, ymax=rows + 0.4, color=spikesInfoSinglePop["color"], label=label)
+            rasterLabelRows.append(rasterRow + (len(spikeStreams) - 1) / 2)
+            rasterRow = rasterRow + len(spikeStreams)
+        else:
+            plt.vlines(spikeTimesPop, ymin=0, ymax=spikeAmplitude, color=spikesInfoSinglePop["color"], label=label)
+    # List of values to mark in axis: the time stamps labelled
+    listXticks = np.unique(np.concatenate([[0, max(timeStream) + 1], spikeIndex.timeStream[activeTicks]]))
+
+    # Create custom labels for each time stamp with spikes where all neuron that spikes in each time stamp are grouped
+    if isRaster:
+        activeTicks = []
+    for tick in activeTicks:
+        stamp = timeStream[tick]
         labelTimeStamp = ""
         # Check what population of neurons fires in the current time stamp
-        for spikesInfoSinglePop in spikesInfo.values():
+        for population, spikesInfoSinglePop in spikesInfo.items():
             # Get labels and sublabel strings
             labelSpike = spikesInfoSinglePop["label"]
             sublabel = " " + spikesInfoSinglePop["sublabels"][0] + "="
             if labelSpike == "IN" or labelSpike == "OUT":
                 sublabelCue = " " + spikesInfoSinglePop["sublabels"][0] + "="
                 sublabelCont = " " + spikesInfoSinglePop["sublabels"][1] + "="
-            # For each population of neuron:
-            for indexNeuron, spikeStream in enumerate(spikesInfoSinglePop["spikeStream"]):
-                # If the neuron of the current population of neuron fires in the current time stamp:
-                if stamp in spikeStream:
-                    # Check restriction with DG neuron
-                    if labelSpike == "DG":
-                        if indexNeuron == 0:
-                            continue
-                        indexNeuron = indexNeuron - 1
-                    # Check label restriction with IN and OUT neuron, difference between IN cue and IN cont
-                    if labelSpike == "IN" or labelSpike == "OUT":
-                        if indexNeuron < numCueBinaryNeuron:
-                            sublabel = sublabelCue
-                            sublabelCue = "-"
-                        else:
-                            sublabel = sublabelCont
-                            sublabelCont = "-"
-                            indexNeuron = indexNeuron - numCueBinaryNeuron
-                    # Add new information to the label of the current time stamp
-                    labelTimeStamp = labelTimeStamp + sublabel + str(indexNeuron)
-                    sublabel = "-"
-        # Realizamos la anotación sobre el instante temporal actual
-        plt.annotate(labelTimeStamp, xy=(stamp + 0.1, 0.01), rotation=90, fontsize=fontsize)
+            # For each neuron of the current population of neuron that fires in the current time stamp:
+            for indexNeuron in spikeIndex.neurons_at(population, tick).tolist():
+                # Check restriction with DG neuron
+                if labelSpike == "DG":
+                    if indexNeuron == 0:
+                        continue
+                    indexNeuron = indexNeuron - 1
+                # Check label restriction with IN and OUT neuron, difference between IN cue and IN cont
+                if labelSpike == "IN" or labelSpike == "OUT":
+                    if indexNeuron < numCueBinaryNeuron:
+                        sublabel = sublabelCue
+                        sublabelCue = "-"
+                    else:
+                        sublabel = sublabelCont
+                        sublabelCont = "-"
+                        indexNeuron = indexNeuron - numCueBinaryNeuron
+                # Add new information to the label of the current time stamp
+                labelTimeStamp = labelTimeStamp + sublabel + str(indexNeuron)
+                sublabel = "-"
+        # Realizamos la anotación sobre el instante temporal actual (solo si hay alguna neurona que mostrar)
+        if labelTimeStamp:
+            plt.annotate(labelTimeStamp, xy=(stamp + 0.1, 0.01), rotation=90, fontsize=fontsize)
     
     # Metadata
     plt.xlabel("Simulation time (ms)", fontsize=fontsize)
-    plt.ylabel("Spikes", fontsize=fontsize)
     plt.title(figTitle, fontsize=fontsize)
-    plt.ylim([-marginAddLim, spikeAmplitude + marginAddLim])
     plt.xlim(-0.5, max(timeStream) + 1.5)
-    listXticks = list(set(listXticks))
-    plt.xticks(listXticks, fontsize=fontsize)
-    plt.yticks([])
+    if isRaster:
+        # Automatic ticks in x axis and the name of each population in y axis
+        plt.ylabel("Neuron", fontsize=fontsize)
+        plt.ylim([-1, max(rasterRow, 1)])
+        plt.xticks(fontsize=fontsize)
+        plt.yticks(rasterLabelRows, [spikesInfoSinglePop["label"] for spikesInfoSinglePop in spikesInfo.values()],
+                   fontsize=fontsize)
+    else:
+        plt.ylabel("Spikes", fontsize=fontsize)
+        plt.ylim([-marginAddLim, spikeAmplitude + marginAddLim])
+        plt.xticks(listXticks.tolist(), fontsize=fontsize)
+        plt.yticks([])
     plt.legend(bbox_to_anchor=(1.0, 1.0), loc='upper left', fontsize=fontsize)
     plt.xticks(rotation=90)
 
@@ -193,7 +277,7 @@ def plot_spike_sequence(spikesInfo, timeStream, numCueBinaryNeuron, numContNeuro
 
 def generate_table_txt(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron,
                        endianness, allTimeStampInTrace, iSMetaDataSave, fileSavePath, fileSaveName, headers,
-                       boxTableSize):
+                       boxTableSize, spikeIndex=None):
     """
     Create a table with all spike information formatted and store in a txt file
 
@@ -210,67 +294,40 @@ def generate_table_txt(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotN
     @param fileSaveName: (optional) base name of the output txt file
     @param headers: headers used in table
     @param boxTableSize: size of box in table
+    @param spikeIndex: (optional) SpikeIndex of the populations of spikesInfo over timeStream, created if not given
     @return: the full path to the txt file
     """
 
     # Check if folder path exist and create in other case
     tools.check_and_create_folder(fileSavePath)
 
-    # Get the spikes ordered by time stamp when they were fired and formatted to a more readable style
-    spikesOrderedByTimeStampFormatted = tools.get_format_spike_info(spikesInfo, timeStream, numCueBinaryNeuron,
-                                                                    numCueOneHotNeuron, numContNeuron,
-                                                                    endianness, iSMetaDataSave, iSMetaDataSave, allTimeStampInTrace,
-                                                                    fileSavePath=fileSavePath, fileSaveName=fileSaveName)
-
-
-    # Create header
-    tableFormatString = "\t {:{}} {:{}} {:{}} {:{}} {:{}} {:{}}" \
-                        " {:{}} {:{}} {:{}} {:{}} {:{}} \n".format(headers[0], boxTableSize, headers[1], boxTableSize,
-                                         headers[2], boxTableSize, headers[3], boxTableSize,
-                                         headers[4], boxTableSize, headers[5], boxTableSize,
-                                         headers[6], boxTableSize, headers[7], boxTableSize,
-                                         headers[8], boxTableSize, headers[9], boxTableSize,
-                                         headers[10], boxTableSize)
-    tableFormatString = tableFormatString + "--------" + "-" * len(headers) * boxTableSize + "\n"
-
-    # Add rows to the table, each row is a different time stamp:
-    operationCountBegin = 0
-    operationCountEnd = 0
-    sameOperationBeginCount = 0
-    sameOperationEndCount = 0
-    beginingOperations = []
-    for stamp, spikes in spikesOrderedByTimeStampFormatted.items():
-        [inCue, inContBin, dgOneHot, ca3Cue, ca3ContBin, ca1bin, outCue, outCont, operationNameBegin, operationNameEnd] = tools.get_string_format_spike_info_each_timestamp(
-            spikes, numCueOneHotNeuron, numContNeuron, operationCountBegin, operationCountEnd)
-
-        # Update the count of operations
-        operationNameBegin, sameOperationBeginCount, operationCountBegin, operationNameEnd, sameOperationEndCount, operationCountEnd, beginingOperations = \
-            tools.calculate_index_operation(operationNameBegin, sameOperationBeginCount, operationCountBegin, operationNameEnd,
-                                  sameOperationEndCount, operationCountEnd, beginingOperations)
-
-        # Add separation between rows
-        tableFormatString = tableFormatString + "\t {:{}} {:{}} {:{}} {:{}} {:{}} {:{}}" \
-                                                " {:{}} {:{}} {:{}} {:{}} {:{}} \n".format(str(stamp), boxTableSize,
-                                                                  str(inCue), boxTableSize,
-                                                                  str(inContBin), boxTableSize,
-                                                                  str(dgOneHot), boxTableSize,
-                                                                  str(ca3Cue), boxTableSize,
-                                                                  str(ca3ContBin), boxTableSize,
-                                                                  str(ca1bin), boxTableSize,
-                                                                  str(outCue), boxTableSize,
-                                                                  str(outCont), boxTableSize,
-                                                                  operationNameBegin, boxTableSize,
-                                                                  operationNameEnd, boxTableSize)
-        tableFormatString = tableFormatString + "--------" + "-" * len(headers) * boxTableSize + "\n"
-
-    # Store in a txt file
-    fullFilePath, _ = tools.write_file(fileSavePath, fileSaveName + "_table", ".txt", tableFormatString)
+    # Get the trace table of the simulation (spikes formatted in each time stamp), shared with the rest of exporters
+    traceTable = get_trace_table(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron,
+                                 endianness, allTimeStampInTrace, iSMetaDataSave, fileSavePath=fileSavePath,
+                                 fileSaveName=fileSaveName, spikeIndex=spikeIndex)
+
+    # Each row of the table (header and time stamps) and the separation between rows
+    rowFormat = "\t {:{}} {:{}} {:{}} {:{}} {:{}} {:{}} {:{}} {:{}} {:{}} {:{}} {:{}} \n"
+    rowSeparator = "--------" + "-" * len(headers) * boxTableSize + "\n"
+
+    # Write the table row by row straight from the trace table, so the text of the table is never held in memory
+    fullFilePath = fileSavePath + fileSaveName + "_table.txt"
+    with open(fullFilePath, "w") as file:
+        # Create header
+        file.write(rowFormat.format(*[field for header in headers[:11] for field in (header, boxTableSize)]))
+        file.write(rowSeparator)
+
+        # Add rows to the table, each row is a different time stamp:
+        for row in traceTable:
+            file.write(rowFormat.format(*[field for value in row for field in (str(value), boxTableSize)]))
+            # Add separation between rows
+            file.write(rowSeparator)
     return fullFilePath
 
 
 def generate_table_excel(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron,
                          endianness, allTimeStampInTrace, iSMetaDataSave, fileSavePath, fileSaveName, simTime, colors,
-                         orientationFormat, headers, boxTableSize):
+                         orientationFormat, headers, boxTableSize, spikeIndex=None, maxTimeStampsPerSheet=None):
     """
         Create an excel table with all spike information formatted
 
@@ -290,61 +347,32 @@ def generate_table_excel(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHo
         @param orientationFormat: orientation of the time stamp: "vertical" or "horizontal"
         @param headers: headers used in table
         @param boxTableSize: size of box in table
+        @param spikeIndex: (optional) SpikeIndex of the populations of spikesInfo over timeStream, created if not given
+        @param maxTimeStampsPerSheet: (optional) max number of time stamps in each sheet of the excel, by default as many
+            as the excel limits allow
         @return: the full path to the txt file
     """
 
     # Check if folder path exist and create in other case
     tools.check_and_create_folder(fileSavePath)
 
-    # Get the spikes ordered by time stamp when they were fired and formatted to a more readable style
-    spikesOrderedByTimeStampFormatted = tools.get_format_spike_info(spikesInfo, timeStream, numCueBinaryNeuron,
-                                                                    numCueOneHotNeuron, numContNeuron,
-                                                                    endianness, iSMetaDataSave, iSMetaDataSave,
-                                                                    allTimeStampInTrace,
-                                                                    fileSavePath=fileSavePath,
-                                                                    fileSaveName=fileSaveName)
-
-    # Create matrix of information whose rows is the spike information formatted at a specific time stamp and
-    #  columns represent the values for a specific population of neuron along the simulation time
-    matrixSpikeInfo = []
-    operationCountBegin = 0
-    operationCountEnd = 0
-    sameOperationBeginCount = 0
-    sameOperationEndCount = 0
-    beginingOperations = []
-    for stamp, spikes in spikesOrderedByTimeStampFormatted.items():
-        [inCue, inContBin, dgOneHot, ca3Cue, ca3ContBin, ca1bin, outCue, outCont, operationNameBegin, operationNameEnd] = tools.get_string_format_spike_info_each_timestamp(
-            spikes, numCueOneHotNeuron, numContNeuron, operationCountBegin, operationCountEnd)
-
-        # Update the count of operations
-        operationNameBegin, sameOperationBeginCount, operationCountBegin, operationNameEnd, sameOperationEndCount, operationCountEnd, beginingOperations = \
-            tools.calculate_index_operation(operationNameBegin, sameOperationBeginCount, operationCountBegin,
-                                      operationNameEnd,
-                                      sameOperationEndCount, operationCountEnd, beginingOperations)
-
-        matrixSpikeInfo.append([inCue, inContBin, dgOneHot, ca3Cue, ca3ContBin, ca1bin, outCue, outCont, operationNameBegin, operationNameEnd])
-
-
-    # Excel file creation
-    excelFile = ExcelSpikeTracer(fileSavePath, fileSaveName, simTime, len(matrixSpikeInfo[0]), colors["bgColor"], colors["hdColor"],
-                                 orientationFormat, boxTableSize)
-
-    # Add the headers to the excel table depend on the orientation
-    if orientationFormat == "horizontal":
-        excelFile.print_column(0, True, headers, colors["hdColor"])
-    else:
-        excelFile.print_row(0, True, headers, colors["hdColor"])
+    # Get the trace table of the simulation (spikes formatted in each time stamp), shared with the rest of exporters:
+    #  its rows are the spike information formatted at a specific time stamp and its columns represent the values for
+    #  a specific population of neuron along the simulation time
+    traceTable = get_trace_table(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron,
+                                 endianness, allTimeStampInTrace, iSMetaDataSave, fileSavePath=fileSavePath,
+                                 fileSaveName=fileSaveName, spikeIndex=spikeIndex)
+
+    # Excel file creation: the rows are streamed from the trace table to the file (constant memory) and long
+    #  simulations are split in several sheets
+    excelFile = ExcelSpikeTracer(fileSavePath, fileSaveName, simTime, TRACE_TABLE_NUM_VALUES, colors["bgColor"],
+                                 colors["hdColor"], orientationFormat, boxTableSize, constantMemory=True,
+                                 maxTimeStampsPerSheet=maxTimeStampsPerSheet)
 
-    # Add the format spike information to the excel table depend on the orientation
-    indexCount = 1
+    # Add the headers and the format spike information to the excel table depend on the orientation
     cellColor = [colors["IN"], colors["IN"], colors["DG"], colors["CA3"], colors["CA3"], colors["CA1"], colors["OUT"],
                  colors["OUT"], colors["operation"], colors["operation"]]
-    for spikePop in matrixSpikeInfo:
-        if orientationFormat == "horizontal":
-            excelFile.print_column(indexCount, False, spikePop, cellColor)
-        else:
-            excelFile.print_row(indexCount, False, spikePop, cellColor)
-        indexCount = indexCount + 1
+    excelFile.print_table(headers, ((row[0], row[1:]) for row in traceTable), cellColor)
 
     # Close and save file
     excelFile.closeExcel()
@@ -0,0 +1,152 @@
+import os
+import math
+import time
+import json
+import traceback
+import concurrent.futures
+import config_loader
+import operation_log
+import DG_CA3_CA1_one_hot
+
+
+def discover_testbenches(tbPath):
+    """
+    Search all the testbenches (folders with an input_spikes.ini file or an input_spikes.oplog operation log) under a
+    path
+
+    @param tbPath: path where the testbenches are stored (memory_testbench.py tbPath)
+    @return: sorted list of the paths to the folders of the testbenches
+    """
+    tbDirs = []
+    for dirPath, dirNames, fileNames in os.walk(tbPath):
+        if "input_spikes.ini" in fileNames or "input_spikes" + operation_log.OPERATION_LOG_EXTENSION in fileNames:
+            tbDirs.append(dirPath.rstrip("/") + "/")
+    return sorted(tbDirs)
+
+
+def get_testbench_sim_time(inputSpikes, tailTime):
+    """
+    Get the simulation time needed to execute all the operations of a testbench
+
+    @param inputSpikes: spikes of each input neuron
+    @param tailTime: time after the last input spike to let the last operation finish
+    @return: simulation time in ms
+    """
+    lastSpike = max([max(spikes) for spikes in inputSpikes if len(spikes) > 0], default=0)
+    return int(math.ceil(lastSpike)) + tailTime
+
+
+def get_testbench_name(tbDir, tbPath):
+    """
+    Get the name of a testbench: the path of its folder relative to tbPath with "_" between folders (testbenches of
+    different runs of memory_testbench.py can have the same folder name)
+
+    @param tbDir: path to the folder of the testbench
+    @param tbPath: path where the testbenches are stored
+    @return: name of the testbench
+    """
+    relativePath = os.path.relpath(tbDir, tbPath)
+    if relativePath == os.curdir:
+        return os.path.basename(os.path.abspath(tbDir))
+    return relativePath.replace(os.sep, "_").replace("/", "_")
+
+
+def run_testbench(tbDir, recordWeight, tailTime, tbPath=None):
+    """
+    Execute the simulation of the network with the input spikes of a testbench and store the result. It is executed in
+    its own process
+
+    @param tbDir: path to the folder of the testbench
+    @param recordWeight: if record weight information or not
+    @param tailTime: time after the last input spike to let the last operation finish
+    @param tbPath: (optional) path where the testbenches are stored, the result is named by the path of tbDir relative
+            to it (see get_testbench_name). By default, by the parent folder of tbDir
+    @return: summary of the run -> {"testbench", "status" ("ok" or "error"), "error", "simTime", "time" (wall clock
+            time in s), "resultPath"}
+    """
+    summary = {"testbench": tbDir, "status": "error", "error": "", "simTime": None, "time": 0.0, "resultPath": None}
+    beginTime = time.perf_counter()
+    try:
+        # Network of the active config files with the inputs and duration of the testbench and its name in the result file
+        parameters = DG_CA3_CA1_one_hot.read_network_parameters()
+        inputSpikesPath = DG_CA3_CA1_one_hot.get_input_spikes_path(tbDir)
+        if inputSpikesPath.endswith(operation_log.OPERATION_LOG_EXTENSION):
+            # The duration is known from the operations, the spikes are expanded only once
+            lastSpike = operation_log.read_operation_log(inputSpikesPath, parameters["cueSize"],
+                                                         parameters["contSize"]).get_last_spike_time()
+            simTime = lastSpike + tailTime
+            inputSpikes = DG_CA3_CA1_one_hot.read_input_spikes(inputSpikesPath, parameters["cueSize"],
+                                                               parameters["contSize"], parameters["endianness"], simTime)
+        else:
+            inputSpikes = DG_CA3_CA1_one_hot.read_input_spikes(inputSpikesPath, parameters["cueSize"],
+                                                               parameters["contSize"], parameters["endianness"])
+            simTime = get_testbench_sim_time(inputSpikes, tailTime)
+        parameters["inputSpikes"] = inputSpikes
+        parameters["simulationParameters"]["simTime"] = simTime
+        if tbPath is None:
+            tbPath = os.path.dirname(os.path.abspath(tbDir))
+        parameters["simulationParameters"]["networkName"] += "_" + get_testbench_name(tbDir, tbPath)
+        network = DG_CA3_CA1_one_hot.MemoryNetwork(**parameters)
+        fullPath, filename = network.run(recordWeight)
+        summary.update({"status": "ok", "simTime": simTime, "resultPath": fullPath})
+    except Exception as e:
+        summary["error"] = repr(e) + "\n" + traceback.format_exc()
+    summary["time"] = time.perf_counter() - beginTime
+    return summary
+
+
+def run_all_testbenches(tbPath, numWorkers, recordWeight, tailTime, isSave=True):
+    """
+    Execute all the testbenches under a path, each one in its own process with up to numWorkers processes at the same
+    time, and create a summary of all the runs
+
+    @param tbPath: path where the testbenches are stored
+    @param numWorkers: number of testbenches executed concurrently
+    @param recordWeight: if record weight information or not
+    @param tailTime: time after the last input spike of each testbench to let the last operation finish
+    @param isSave: (optional) if store the summary in a json file in tbPath
+    @return: list with the summary of each run (see run_testbench) and the path to the json file (None if not isSave)
+    """
+    tbDirs = discover_testbenches(tbPath)
+    summaries = []
+    # A new process for each testbench, so the memory of a simulation is released before the next one
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(numWorkers, 1), max_tasks_per_child=1) as executor:
+        futures = {executor.submit(run_testbench, tbDir, recordWeight, tailTime, tbPath): tbDir for tbDir in tbDirs}
+        for future in concurrent.futures.as_completed(futures):
+            summary = future.result()
+            print("[" + summary["status"] + "] " + summary["testbench"] + " (" + "{:.2f}".format(summary["time"]) + " s)")
+            summaries.append(summary)
+    summaries.sort(key=lambda summary: summary["testbench"])
+
+    summaryPath = None
+    if isSave:
+        summaryPath = tbPath + "summary_" + time.strftime("%Y_%m_%d__%H_%M_%S") + ".json"
+        with open(summaryPath, "w") as file:
+            json.dump(summaries, file, indent=4)
+    return summaries, summaryPath
+
+
+if __name__ == "__main__":
+    # Read the config files: active config file directory, testbench and test parameters
+    activeConfigFilePath = config_loader.get_active_config_path()
+    testbenchParameters = config_loader.read_testbench_parameters(activeConfigFilePath)
+    testParameters = config_loader.read_test_parameters(activeConfigFilePath)
+
+    # + Path where the testbenches are stored
+    tbPath = testbenchParameters["tbPath"]
+    # + Number of testbenches executed concurrently
+    numWorkers = testbenchParameters["batchNumWorkers"]
+    # + If record weight information or not
+    recordWeight = testParameters["recordWeight"]
+    # + Time after the last input spike to let the last operation finish: the longest time between operations
+    tailTime = max(testbenchParameters["readingOperationTime"], testbenchParameters["writingOperationTime"])
+
+    # Execute all testbenches and show the summary
+    summaries, summaryPath = run_all_testbenches(tbPath, numWorkers, recordWeight, tailTime)
+    numOk = len([summary for summary in summaries if summary["status"] == "ok"])
+    print("\n" + str(numOk) + "/" + str(len(summaries)) + " testbenches executed without problems")
+    for summary in summaries:
+        print(" - " + summary["testbench"] + ": " + summary["status"] + ", " + "{:.2f}".format(summary["time"]) + " s, " +
+              (summary["resultPath"] if summary["status"] == "ok" else summary["error"].split("\n")[0]))
+    if summaryPath:
+        print("Summary stored in: " + summaryPath)
@@ -0,0 +1,264 @@
+import copy
+import math
+import json
+import time
+import tempfile
+import numpy as np
+import config_loader
+import metrics
+import operation_log
+import tools
+import workload_generator
+import DG_CA3_CA1_one_hot
+
+"""
+Capacity and scaling benchmark of the memory
+
+For each combination of cueSize and contSize, the memory executes a synthetic workload (workload section of the config
+files) of operationsPerCue operations for each cue, and the time and memory of its phases are grouped in:
+  * build: setup of the simulator and construction of the network (populations, decoder/encoder gates and projections)
+  * simulation: execution of the network
+  * extraction: retrieval and formatting of the recorded data and storage of the result
+With the number of neurons and synapses of each size (the all-to-all CA3cue-CA3cont STDP projection grows with
+cueSize*contSize and the decoder/encoder with 2**dgInputSize), the size from which each phase becomes dominant and its
+growth exponent along each axis are reported
+"""
+
+# Phases of the run of the memory (see metrics.RunMetrics) in each group. The import of the simulator is not included:
+#  it is only done by the first size executed in the process
+PHASE_GROUPS = {"build": ["sim.setup", "network construction"], "simulation": ["run", "sim.run"],
+                "extraction": ["get_data", "sim.end", "format_neo_data", "create_data_out", "write_result"]}
+
+
+def create_scaling_workload(cueSize, contSize, numOperations, workloadParameters, testbenchParameters, savePath):
+    """
+    Generate the synthetic workload of a size of the memory and store it as an operation log
+
+    @param cueSize: max number of patterns to store
+    @param contSize: size of patterns to store (number of bits)
+    @param numOperations: number of operations of the workload
+    @param workloadParameters: parameters of the workload (see config_loader.read_workload_parameters), the trace
+        pattern is not supported (the trace has a fixed size of the memory)
+    @param testbenchParameters: testbench parameters (see config_loader.read_testbench_parameters), times of the
+        operations
+    @param savePath: path where the operation log is stored
+    @return: the operation log (see operation_log.OperationLog)
+    """
+    if workloadParameters["pattern"] == "trace":
+        raise ValueError("The scaling benchmark needs a synthetic workload, the trace pattern is not supported")
+    parameters = dict(workloadParameters, numOperations=numOperations)
+    chunks = workload_generator.generate_workload(parameters, cueSize, contSize,
+                                                  [testbenchParameters["writingOperationTime"],
+                                                   testbenchParameters["readingOperationTime"]],
+                                                  [testbenchParameters["writingOperationDataHolding"],
+                                                   testbenchParameters["readingOperationDataHolding"]])
+    fullPath, filename, numOperations = operation_log.write_operation_log_chunks(chunks, savePath, "workload")
+    return operation_log.OperationLog.read(fullPath)
+
+
+def get_phase_groups(record):
+    """
+    Group the phases of a metrics record (see PHASE_GROUPS)
+
+    @param record: metrics record of a run (see metrics.RunMetrics.to_dict)
+    @return: dict of group -> {"wallTime" (s), "cpuTime" (s), "peakRss" (bytes)}
+    """
+    groups = {}
+    for group, phaseNames in PHASE_GROUPS.items():
+        phases = [phase for phase in record["phases"] if phase["name"] in phaseNames]
+        groups[group] = {"wallTime": sum(phase["wallTime"] for phase in phases),
+                         "cpuTime": sum(phase["cpuTime"] for phase in phases),
+                         "peakRss": max([phase["peakRss"] for phase in phases], default=0)}
+    return groups
+
+
+def run_scaling_point(cueSize, contSize, networkParameters, workloadParameters, testbenchParameters, scalingParameters):
+    """
+    Execute the memory of a size with its synthetic workload and measure its phases
+
+    @param cueSize: max number of patterns to store
+    @param contSize: size of patterns to store (number of bits)
+    @param networkParameters: parameters of the memory (see DG_CA3_CA1_one_hot.read_network_parameters), the size,
+        simulation time and input spikes are replaced
+    @param workloadParameters: parameters of the workload (see config_loader.read_workload_parameters)
+    @param testbenchParameters: testbench parameters (see config_loader.read_testbench_parameters)
+    @param scalingParameters: parameters of the benchmark (see config_loader.read_scaling_parameters)
+    @return: dict -> "cueSize", "contSize", "dgInputSize", "numOperations", "simTime", "network" (see
+        DG_CA3_CA1_one_hot.MemoryNetwork.get_network_size), "phases" (group -> min wall and CPU time and max peak RSS
+        of the repetitions, see get_phase_groups) and "shares" (group -> share of the wall time of the size)
+    """
+    numOperations = int(math.ceil(scalingParameters["operationsPerCue"] * cueSize))
+    # Time after the last input spike to let the last operation finish: the longest time between operations
+    tailTime = max(testbenchParameters["readingOperationTime"], testbenchParameters["writingOperationTime"])
+    repetitions = []
+    with tempfile.TemporaryDirectory() as savePath:
+        savePath = savePath + "/"
+        workloadLog = create_scaling_workload(cueSize, contSize, numOperations, workloadParameters, testbenchParameters,
+                                              savePath)
+        simTime = workloadLog.get_last_spike_time() + tailTime
+        parameters = copy.deepcopy(networkParameters)
+        # The content table of the config files is not loaded: it is for another size of the memory
+        parameters.update({"cueSize": cueSize, "contSize": contSize, "contentTable": None,
+                           "inputSpikes": DG_CA3_CA1_one_hot.read_input_spikes(
+                               savePath + "workload" + operation_log.OPERATION_LOG_EXTENSION, cueSize, contSize,
+                               networkParameters["endianness"], simTime)})
+        parameters["simulationParameters"].update({"simTime": simTime, "networkName": "scaling",
+                                                   "weightRecordPolicy": scalingParameters["weightRecordPolicy"]})
+        network = DG_CA3_CA1_one_hot.MemoryNetwork(**parameters)
+        recordWeight = scalingParameters["recordWeight"]
+        for repetition in range(scalingParameters["repeat"]):
+            runMetrics = metrics.RunMetrics("scaling cueSize=" + str(cueSize) + " contSize=" + str(contSize))
+            with runMetrics.phase("simulation"):
+                formatData = network.backends[scalingParameters["backend"]](network, recordWeight, runMetrics)
+            with runMetrics.phase("create_data_out"):
+                dataOut = network.create_data_out(formatData, network.inputSpikes, recordWeight)
+            with runMetrics.phase("write_result"):
+                tools.write_result(savePath, "scaling_" + str(repetition), dataOut)
+            del formatData, dataOut
+            repetitions.append(get_phase_groups(runMetrics.to_dict()))
+
+    phases = {group: {"wallTime": min(groups[group]["wallTime"] for groups in repetitions),
+                      "cpuTime": min(groups[group]["cpuTime"] for groups in repetitions),
+                      "peakRss": max(groups[group]["peakRss"] for groups in repetitions)} for group in PHASE_GROUPS}
+    totalTime = sum(phase["wallTime"] for phase in phases.values())
+    return {"cueSize": cueSize, "contSize": contSize, "dgInputSize": network.dgInputSize,
+            "numOperations": numOperations, "simTime": simTime, "network": network.get_network_size(),
+            "phases": phases, "shares": {group: phase["wallTime"] / totalTime if totalTime > 0 else 0.0
+                                         for group, phase in phases.items()}}
+
+
+def get_dominant_phase(point, dominanceShare):
+    """
+    Get the phase that takes most of the time of a size, if its share reaches dominanceShare
+
+    @param point: result of a size (see run_scaling_point)
+    @param dominanceShare: share of the wall time from which a phase is dominant
+    @return: name of the dominant group of phases or None
+    """
+    group = max(point["shares"], key=point["shares"].get)
+    return group if point["shares"][group] >= dominanceShare else None
+
+
+def analyze_series(points, axis, dominanceShare):
+    """
+    Analyze the growth of the phases along one axis (cueSize or contSize) for each value of the other one
+
+    @param points: results of the sizes (see run_scaling_point)
+    @param axis: "cueSize" or "contSize"
+    @param dominanceShare: share of the wall time from which a phase is dominant
+    @return: list of series (only the ones with more than one size) -> "axis", "fixed" (dict with the value of the other
+        axis), "sizes", "dominant" (dominant phase of each size), "dominantFrom" (phase -> first size from which the
+        phase is dominant in all the larger sizes) and "growth" (phase -> exponent k of the fit wallTime ~ size**k)
+    """
+    otherAxis = "contSize" if axis == "cueSize" else "cueSize"
+    series = []
+    for fixedValue in sorted(set(point[otherAxis] for point in points)):
+        seriesPoints = sorted([point for point in points if point[otherAxis] == fixedValue], key=lambda point: point[axis])
+        if len(seriesPoints) < 2:
+            continue
+        sizes = [point[axis] for point in seriesPoints]
+        dominant = [get_dominant_phase(point, dominanceShare) for point in seriesPoints]
+        dominantFrom = {}
+        for group in PHASE_GROUPS:
+            # First size of the last run of sizes where the phase is dominant, if it lasts until the largest size
+            index = len(dominant)
+            while index > 0 and dominant[index - 1] == group:
+                index -= 1
+            dominantFrom[group] = sizes[index] if index < len(dominant) else None
+        growth = {}
+        for group in PHASE_GROUPS:
+            wallTimes = np.array([point["phases"][group]["wallTime"] for point in seriesPoints])
+            growth[group] = float(np.polyfit(np.log(sizes), np.log(wallTimes), 1)[0]) \
+                if np.all(wallTimes > 0) and len(set(sizes)) > 1 else None
+        series.append({"axis": axis, "fixed": {otherAxis: fixedValue}, "sizes": sizes, "dominant": dominant,
+                       "dominantFrom": dominantFrom, "growth": growth})
+    return series
+
+
+def format_scaling_table(points, dominanceShare):
+    """
+    Create a text table with the size, phases and dominant phase of each point
+
+    @param points: results of the sizes (see run_scaling_point)
+    @param dominanceShare: share of the wall time from which a phase is dominant
+    @return: list of lines of the table
+    """
+    headers = ["cueSize", "contSize", "neurons", "synapses", "STDP syn", "build (s)", "sim (s)", "extract (s)",
+               "peak RSS (MB)", "dominant"]
+    rows = []
+    for point in points:
+        peakRss = max(phase["peakRss"] for phase in point["phases"].values())
+        rows.append([str(point["cueSize"]), str(point["contSize"]), str(point["network"]["numNeurons"]),
+                     str(point["network"]["numSynapses"]), str(point["network"]["synapses"]["CA3cueL-CA3contL"])] +
+                    ["{:.4f}".format(point["phases"][group]["wallTime"]) for group in PHASE_GROUPS] +
+                    ["{:.1f}".format(peakRss / 1024 ** 2), get_dominant_phase(point, dominanceShare) or "-"])
+    widths = [max(len(row[index]) for row in rows + [headers]) for index in range(len(headers))]
+    lines = ["  ".join(header.ljust(widths[index]) for index, header in enumerate(headers)).rstrip()]
+    for row in rows:
+        lines.append("  ".join(value.ljust(widths[index]) for index, value in enumerate(row)).rstrip())
+    return lines
+
+
+def format_series_summary(series):
+    """
+    Create a text summary of the growth and dominance of the phases of each series
+
+    @param series: series of the sizes (see analyze_series)
+    @return: list of lines of the summary
+    """
+    lines = []
+    for serie in series:
+        fixedName, fixedValue = list(serie["fixed"].items())[0]
+        lines.append(serie["axis"] + " " + str(serie["sizes"]) + " (" + fixedName + " = " + str(fixedValue) + "):")
+        for group in PHASE_GROUPS:
+            growth = "-" if serie["growth"][group] is None else "{:.2f}".format(serie["growth"][group])
+            dominantFrom = "not dominant" if serie["dominantFrom"][group] is None else \
+                "dominant from " + serie["axis"] + " = " + str(serie["dominantFrom"][group])
+            lines.append(" - " + group + ": time ~ size**" + growth + ", " + dominantFrom)
+    return lines
+
+
+def run_scaling_benchmark(scalingParameters, networkParameters, workloadParameters, testbenchParameters):
+    """
+    Execute the memory for each combination of the sizes of the benchmark
+
+    @param scalingParameters: parameters of the benchmark (see config_loader.read_scaling_parameters)
+    @param networkParameters: parameters of the memory (see DG_CA3_CA1_one_hot.read_network_parameters)
+    @param workloadParameters: parameters of the workload (see config_loader.read_workload_parameters)
+    @param testbenchParameters: testbench parameters (see config_loader.read_testbench_parameters)
+    @return: dict -> "config", "date", "points" (see run_scaling_point) and "series" (see analyze_series)
+    """
+    points = []
+    for contSize in sorted(set(scalingParameters["contSizes"])):
+        for cueSize in sorted(set(scalingParameters["cueSizes"])):
+            point = run_scaling_point(cueSize, contSize, networkParameters, workloadParameters, testbenchParameters,
+                                      scalingParameters)
+            print("cueSize = " + str(cueSize) + ", contSize = " + str(contSize) + ": " +
+                  ", ".join(group + " " + "{:.4f}".format(phase["wallTime"]) + " s"
+                            for group, phase in point["phases"].items()))
+            points.append(point)
+    series = analyze_series(points, "cueSize", scalingParameters["dominanceShare"]) + \
+        analyze_series(points, "contSize", scalingParameters["dominanceShare"])
+    config = dict(scalingParameters, workload={key: value for key, value in workloadParameters.items()
+                                               if key not in ["numOperations", "workloadSavePath"]})
+    return {"config": config, "date": time.strftime("%Y-%m-%d %H:%M:%S"), "points": points, "series": series}
+
+
+if __name__ == "__main__":
+    # Read the config files: active config file directory, scaling benchmark, network, workload and testbench parameters
+    activeConfigFilePath = config_loader.get_active_config_path()
+    scalingParameters = config_loader.read_scaling_parameters(activeConfigFilePath)
+    networkParameters = DG_CA3_CA1_one_hot.read_network_parameters(activeConfigFilePath)
+    workloadParameters = config_loader.read_workload_parameters(activeConfigFilePath)
+    # The workloads are stored as operation logs: integer times of the operations
+    testbenchParameters = config_loader.read_testbench_parameters(activeConfigFilePath, integerTimes=True)
+
+    record = run_scaling_benchmark(scalingParameters, networkParameters, workloadParameters, testbenchParameters)
+    print("\n".join(format_scaling_table(record["points"], scalingParameters["dominanceShare"])))
+    print("\n".join(format_series_summary(record["series"])))
+
+    tools.check_and_create_folder(scalingParameters["scalingSavePath"])
+    recordPath = scalingParameters["scalingSavePath"] + "scaling_" + time.strftime("%Y_%m_%d__%H_%M_%S") + ".json"
+    with open(recordPath, "w") as file:
+        json.dump(record, file, indent=4)
+    print("Results stored in: " + recordPath)
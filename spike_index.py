@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class SpikeIndex:
+    """
+    Class used to index the spikes of several populations of neurons by the time stamp (tick) when they were fired. It
+    is built once for the data of a simulation and shared by all the functions that need to know which neurons fired in
+    each time stamp
+    """
+
+    def __init__(self, spikesInfo, timeStream):
+        """
+        Init an object of type SpikeIndex: for each population, all its spikes are stored as events sorted by tick (and
+        neuron inside the same tick) with the offset of the first event of each tick, and also sorted by neuron (and tick
+        inside the same neuron) with the offset of the first event of each neuron
+
+        @param spikesInfo: dictionary with as keys as population which values are the spike stream of that population
+            {"population_i":{"spikeStream":spikeStream, ...}:, ...}
+        @param timeStream: time stamp stream, each time stamp is a tick (the spikes fired at other times are ignored)
+        """
+        self.timeStream = np.asarray(timeStream, dtype=float)
+        self.numTicks = len(self.timeStream)
+        self.ticks = {}
+        self.neurons = {}
+        self.tickOffsets = {}
+        self.neuronTicks = {}
+        self.neuronOffsets = {}
+        self.numNeurons = {}
+        for population, spikesInfoSinglePop in spikesInfo.items():
+            self.add_population(population, spikesInfoSinglePop["spikeStream"])
+
+    def add_population(self, population, spikeStream):
+        """
+        Index the spikes of a population of neurons
+
+        @param population: key of the population
+        @param spikeStream: list of the spike times of each neuron of the population
+        @return:
+        """
+        numNeurons = len(spikeStream)
+        eventKeys = []
+        for indexNeuron, neuronSpikes in enumerate(spikeStream):
+            times = np.asarray(neuronSpikes, dtype=float).ravel()
+            ticks = np.searchsorted(self.timeStream, times)
+            isTick = ticks < self.numTicks
+            isTick[isTick] = self.timeStream[ticks[isTick]] == times[isTick]
+            eventKeys.append(ticks[isTick] * numNeurons + indexNeuron)
+        # Sort by tick and neuron, a neuron only appears once in each tick
+        eventKeys = np.unique(np.concatenate(eventKeys)) if eventKeys else np.zeros(0, dtype=int)
+        self.ticks[population] = eventKeys // max(numNeurons, 1)
+        self.neurons[population] = eventKeys % max(numNeurons, 1)
+        self.tickOffsets[population] = np.searchsorted(self.ticks[population], np.arange(self.numTicks + 1))
+        # The same events sorted by neuron (stable, so the ticks of each neuron stay in ascending order)
+        neuronOrder = np.argsort(self.neurons[population], kind="stable")
+        self.neuronTicks[population] = self.ticks[population][neuronOrder]
+        self.neuronOffsets[population] = np.searchsorted(self.neurons[population][neuronOrder],
+                                                         np.arange(numNeurons + 1))
+        self.numNeurons[population] = numNeurons
+
+    def get_tick(self, stamp):
+        """
+        Get the tick of a time stamp
+
+        @param stamp: time stamp
+        @return: the tick of the time stamp or None if it is not in the time stream
+        """
+        tick = int(np.searchsorted(self.timeStream, stamp))
+        if tick < self.numTicks and self.timeStream[tick] == stamp:
+            return tick
+        return None
+
+    def neurons_at(self, population, tick):
+        """
+        Get the neurons of a population which fired in a tick
+
+        @param population: key of the population
+        @param tick: tick (index of the time stamp in the time stream)
+        @return: array of neuron indexes in ascending order
+        """
+        offsets = self.tickOffsets[population]
+        return self.neurons[population][offsets[tick]:offsets[tick + 1]]
+
+    def spikes_in(self, population, tickBegin, tickEnd):
+        """
+        Get all the spikes of a population fired in the interval of ticks [tickBegin, tickEnd)
+
+        @param population: key of the population
+        @param tickBegin: first tick of the interval (included)
+        @param tickEnd: last tick of the interval (not included)
+        @return: array of ticks and array of neuron indexes of the spikes, sorted by tick and neuron
+        """
+        offsets = self.tickOffsets[population]
+        tickBegin, tickEnd = max(tickBegin, 0), min(max(tickEnd, tickBegin), self.numTicks)
+        if tickBegin >= tickEnd:
+            return self.ticks[population][:0], self.neurons[population][:0]
+        eventSlice = slice(offsets[tickBegin], offsets[tickEnd])
+        return self.ticks[population][eventSlice], self.neurons[population][eventSlice]
+
+    def neuron_ticks(self, population, neuron):
+        """
+        Get the ticks when a neuron of a population fired
+
+        @param population: key of the population
+        @param neuron: index of the neuron in the population
+        @return: array of ticks in ascending order
+        """
+        offsets = self.neuronOffsets[population]
+        return self.neuronTicks[population][offsets[neuron]:offsets[neuron + 1]]
+
+    def active_ticks(self, populations=None):
+        """
+        Get the ticks when any neuron of the populations fired
+
+        @param populations: (optional) keys of the populations, by default all of them
+        @return: array of ticks in ascending order
+        """
+        if populations is None:
+            populations = self.ticks.keys()
+        ticks = [self.ticks[population] for population in populations]
+        return np.unique(np.concatenate(ticks)) if ticks else np.zeros(0, dtype=int)
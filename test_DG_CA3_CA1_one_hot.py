@@ -1,14 +1,169 @@
 
 import random
+import concurrent.futures
+import matplotlib
 import tools
 import plot
 import DG_CA3_CA1_one_hot
-import configparser
+import config_loader
+import metrics
+from spike_index import SpikeIndex
+
+
+# Data of the simulations opened by the artifact builders of the current process, by (fullPathFile, recordWeight,
+#  colors)
+processingContexts = {}
+
+
+def get_processing_context(fullPathFile, recordWeight, colors):
+    """
+    Open the data of a simulation and prepare the spike information used by the artifact builders. It is done once in
+    each process: each worker reads the result bundle by itself (only the variables used), the data is not sent to it
+    by the parent process
+
+    @param fullPathFile: the full path to the file with the data recorded from the simulation (result bundle or old txt
+            data file)
+    @param recordWeight: if weight information war recorded or not
+    @param colors: dict, colors used to represent information: one for each population of neuron
+    @return: dict with the data, the time stream, the spike information (all and only in/out), the spike index and the
+            weight variable, or False if the data file could not be opened
+    """
+    key = (fullPathFile, recordWeight, tuple(sorted(colors.items())))
+    if key in processingContexts:
+        return processingContexts[key]
+
+    # Open data file of the simulation (only the variables used below, v traces are not loaded)
+    usedVariables = [("spikes", "CA3cueL"), ("spikes", "CA3contL"), ("spikes", "DGL"), ("spikes", "IL"), ("spikes", "CA1L"),
+                     ("spikes", "OL")]
+    if recordWeight:
+        usedVariables.append(("w", "CA3cueL-CA3contL"))
+    data = tools.read_result(fullPathFile, usedVariables)
+    if not data:
+        return False
+
+    # Search all variables which are going to be used to create the plots and representations
+    spikesCA3cue, spikesCA3cont, spikesDG, wCA3cue_CA3cont, spikesInput, spikesCA1, spikesOutput = {}, {}, {}, {}, {}, {}, {}
+    for variable in data["variables"]:
+        if variable["type"] == "spikes" and variable["popNameShort"] == "CA3cueL":
+            spikesCA3cue = variable
+        elif variable["type"] == "spikes" and variable["popNameShort"] == "CA3contL":
+            spikesCA3cont = variable
+        elif variable["type"] == "spikes" and variable["popNameShort"] == "DGL":
+            spikesDG = variable
+        elif variable["type"] == "spikes" and variable["popNameShort"] == "IL":
+            spikesInput = variable
+        elif variable["type"] == "w" and variable["popNameShort"] == "CA3cueL-CA3contL":
+            wCA3cue_CA3cont = variable
+        elif variable["type"] == "spikes" and variable["popNameShort"] == "CA1L":
+            spikesCA1 = variable
+        elif variable["type"] == "spikes" and variable["popNameShort"] == "OL":
+            spikesOutput = variable
+
+    # Create the stream of time stamp and format spikes information
+    timeStream = tools.generate_time_streams(data["simTime"], data["timeStep"], "ms")
+    spikesInfo = {"IN":{"spikeStream":spikesInput["data"], "label":"IN", "sublabels":["INcue", "INcont"], "color":colors["IN"]},
+                  "OUT":{"spikeStream":spikesOutput["data"], "label":"OUT", "sublabels":["OUTcue", "OUTcont"], "color":colors["OUT"]}}
+    spikesInOutInfo = dict(spikesInfo)
+    spikesInfo["DG"] = {"spikeStream":spikesDG["data"], "label":"DG", "sublabels":["DG"], "color":colors["DG"]}
+    spikesInfo["CA3cue"] = {"spikeStream":spikesCA3cue["data"], "label":"CA3cue", "sublabels":["CA3cue"], "color":colors["CA3cue"]}
+    spikesInfo["CA3cont"] = {"spikeStream":spikesCA3cont["data"], "label":"CA3cont", "sublabels":["CA3cont"], "color":colors["CA3cont"]}
+    spikesInfo["CA1"] = {"spikeStream": spikesCA1["data"], "label": "CA1", "sublabels": ["CA1"], "color": colors["CA1"]}
+
+    processingContexts[key] = {"data": data, "timeStream": timeStream, "spikesInfo": spikesInfo,
+                               "spikesInOutInfo": spikesInOutInfo,
+                               # Index the spikes of all populations by time stamp once, it is shared by all the plots and tables
+                               "spikeIndex": SpikeIndex(spikesInfo, timeStream),
+                               "numCueBinaryNeuron": spikesDG["numNeurons"], "numCueNeuron": spikesCA3cue["numNeurons"],
+                               "wCA3cue_CA3cont": wCA3cue_CA3cont}
+    return processingContexts[key]
+
+
+def build_artifact(artifact, fullPathFile, params):
+    """
+    Create one of the files of the visual representation of the data of a simulation
+
+    @param artifact: "inOutSpikes" (plot of input/output spikes), "allSpikes" (plot of all spikes), "tables" (txt and
+            excel tables of spikes, built in the same process so the trace table is computed once), "weightMatrix"
+            (heatmaps of the weight matrix in each time window) or "weights" (3D weight plots of some CA3cont neurons)
+    @param fullPathFile: the full path to the file with the data recorded from the simulation
+    @param params: dict with the parameters of processing_data (folder where store the files in "baseSavePath") and, for
+            "weights", the CA3cont neurons to plot ("dstNeuronIds") and the color of each CA3cue neuron ("weightColors")
+    @return: metrics record of the creation of the artifact (see metrics.RunMetrics.end), named as the artifact
+    """
+    artifactMetrics = metrics.RunMetrics(artifact)
+    artifactMetrics.begin(artifact)
+    context = get_processing_context(fullPathFile, params["recordWeight"], params["colors"])
+    data = context["data"]
+    if artifact == "inOutSpikes" or artifact == "allSpikes":
+        # Create visual plot of sequence of spikes along the network during simulation: only in/out or all spikes
+        plot.plot_spike_sequence(spikesInfo=context["spikesInOutInfo"] if artifact == "inOutSpikes" else context["spikesInfo"],
+                                 timeStream=context["timeStream"], numCueBinaryNeuron=context["numCueBinaryNeuron"],
+                                 numContNeuron=data["contSize"], spikeAmplitude=params["spikeAmplitude"],
+                                 marginAddLim=params["marginAddLim"], fontsize=params["fontsize"], figSize=params["figSize"],
+                                 figTitle=params["figSpikeTitle"], isPlot=params["isPlotShow"], isSave=params["isPlotSave"],
+                                 saveFigName=params["saveFileName"] + ("_in_out_spikes" if artifact == "inOutSpikes" else "_all_spikes"),
+                                 saveFigPath=params["baseSavePath"], spikeIndex=context["spikeIndex"])
+    elif artifact == "tables":
+        # Create a txt file and an excel table with the sequence of spikes formatted (the second one takes the trace
+        #  table of the first one from the cache of trace_table)
+        plot.generate_table_txt(spikesInfo=context["spikesInfo"], timeStream=context["timeStream"],
+                                numCueBinaryNeuron=context["numCueBinaryNeuron"],
+                                numCueOneHotNeuron=data["cueSize"], numContNeuron=data["contSize"],
+                                endianness=data["endianness"], allTimeStampInTrace=params["allTimeStampInTrace"],
+                                iSMetaDataSave=False,
+                                fileSavePath=params["baseSavePath"], fileSaveName=params["saveFileName"] + "_all_spike",
+                                headers=params["headers"], boxTableSize=params["boxTableSize"], spikeIndex=context["spikeIndex"])
+        plot.generate_table_excel(spikesInfo=context["spikesInfo"], timeStream=context["timeStream"],
+                                  numCueBinaryNeuron=context["numCueBinaryNeuron"],
+                                  numCueOneHotNeuron=data["cueSize"], numContNeuron=data["contSize"],
+                                  endianness=data["endianness"], allTimeStampInTrace=params["allTimeStampInTrace"],
+                                  iSMetaDataSave=False,
+                                  fileSavePath=params["baseSavePath"], fileSaveName=params["saveFileName"] + "_all_spike",
+                                  simTime=data["simTime"],
+                                  colors=params["excelColors"], orientationFormat=params["orientationFormat"],
+                                  headers=params["headers"], boxTableSize=params["boxTableSize"],
+                                  spikeIndex=context["spikeIndex"])
+    elif artifact == "weightMatrix":
+        # Create a single figure with the full weight matrix in each time window
+        wTimeStamps, wHistory = tools.get_weight_history(context["wCA3cue_CA3cont"]["data"])
+        plot.plot_weight_matrix_evolution(timeStamps=wTimeStamps, weights=wHistory,
+                                          zlimit=[data["synParameters"]["CA3cueL-CA3contL"]["w_min"],
+                                                  data["synParameters"]["CA3cueL-CA3contL"]["w_max"]],
+                                          numWindows=params["weightNumWindows"],
+                                          figTitle="Weight evolution of " + context["wCA3cue_CA3cont"]["popName"],
+                                          figSize=params["figSize"], fontsize=params["fontsize"],
+                                          iSplot=params["isPlotShow"], iSsave=params["isPlotSave"],
+                                          saveFigName=params["saveFileName"] + "_weight_matrix",
+                                          saveFigPath=params["baseSavePath"])
+    elif artifact == "weights":
+        # Create the weight plots from the dense weight history (time x CA3cue x CA3cont)
+        wTimeStamps, wHistory = tools.get_weight_history(context["wCA3cue_CA3cont"]["data"])
+        plot.plot_weight_syn_in_all_neuron(timeStamps=wTimeStamps, weights=wHistory,
+                                           zlimit=[data["synParameters"]["CA3cueL-CA3contL"]["w_min"] - 0.5,
+                                                   data["synParameters"]["CA3cueL-CA3contL"]["w_max"] + 0.5],
+                                           colors=params["weightColors"], baseFigTitle=params["figWeightTitle"],
+                                           figSize=params["figSize"], fontsize=params["fontsize"],
+                                           iSplot=params["isPlotShow"], iSsave=params["isPlotSave"],
+                                           saveFigName=params["saveFileName"] + "_weight",
+                                           saveFigPath=params["baseSavePath"], dstNeuronIds=params["dstNeuronIds"])
+    else:
+        raise ValueError("Artifact not supported. Supported artifacts: inOutSpikes, allSpikes, tables, weightMatrix "
+                         "and weights")
+    return artifactMetrics.end()
+
+
+def init_artifact_worker():
+    """
+    Prepare a process of the pool of processing_data: the plots are rendered without display (Agg backend)
+
+    @return:
+    """
+    matplotlib.use("Agg")
 
 
 def processing_data(spikeAmplitude, marginAddLim, fontsize, figSize, figSpikeTitle, figWeightTitle, recordWeight, allTimeStampInTrace,
                     colors, fullPathFile, isPlotShow, isPlotSave, saveFileName, baseSavePath, orientationFormat, excelColors,
-                    headers, boxTableSize):
+                    headers, boxTableSize, numWorkers=1, weightPlotStyle="heatmap", weightNumWindows=16, printMetrics=False):
     """
     Processing the data from a simulation to get a visual representation of the result
 
@@ -21,7 +176,8 @@ def processing_data(spikeAmplitude, marginAddLim, fontsize, figSize, figSpikeTit
     @param recordWeight: if weight information war recorded or not
     @param allTimeStampInTrace: if represent all time stamp in trace files or only time stamps where the network is spiking
     @param colors: dict, colors used to represent information: one for each population of neuron
-    @param fullPathFile: the full path to the file with the data recorded from the simulation
+    @param fullPathFile: the full path to the file with the data recorded from the simulation (result bundle or old txt
+            data file)
     @param isPlotShow: if show the plot in running time
     @param isPlotSave: if store the plots
     @param saveFileName: the base name used to store the generated files (txt, png, ...)
@@ -30,12 +186,21 @@ def processing_data(spikeAmplitude, marginAddLim, fontsize, figSize, figSpikeTit
     @param excelColors: colors to use in excel table
     @param headers: headers used in table
     @param boxTableSize: size of box in table
+    @param numWorkers: (optional) number of processes used to create the files (plots, tables...) concurrently. With 1
+            or if the plots are shown, they are created one after another in the current process
+    @param weightPlotStyle: (optional) representation of the weights: "heatmap" (a single figure with the weight matrix
+            in each time window), "3d" (a 3D figure for each CA3cont neuron) or "both"
+    @param weightNumWindows: (optional) number of time windows of the "heatmap" representation
+    @param printMetrics: (optional) if print the time and memory of each phase. They are always stored in the folder of
+            the generated files (saveFileName + metrics.METRICS_EXTENSION)
     @return: True if the simulation and/or the creation of the visual representation of the data has been done correctly
             or False in other cases
     """
+    processingMetrics = metrics.RunMetrics("processing " + saveFileName)
     # Open data file of the simulation
-    data = tools.read_file(fullPathFile)
-    if not data:
+    with processingMetrics.phase("read result"):
+        context = get_processing_context(fullPathFile, recordWeight, colors)
+    if not context:
         print("Error to open data file")
         return False
     # Create folder to store all the generated files
@@ -44,90 +209,53 @@ def processing_data(spikeAmplitude, marginAddLim, fontsize, figSize, figSpikeTit
         print("Error to create a folder to store generated files")
         return False
 
-    # Search all variables which are going to be used to create the plots and representations
-    vCA3cue, spikesCA3cue, vCA3cont, spikesCA3cont, spikesDG, wCA3cue_CA3cont, spikesInput, spikesCA1, spikesOutput = {}, {}, {}, {}, {}, {}, {}, {}, {}
-    for variable in data["variables"]:
-        if variable["type"] == "v" and variable["popNameShort"] == "CA3cueL":
-            vCA3cue = variable
-        elif variable["type"] == "spikes" and variable["popNameShort"] == "CA3cueL":
-            spikesCA3cue = variable
-        elif variable["type"] == "v" and variable["popNameShort"] == "CA3contL":
-            vCA3cont = variable
-        elif variable["type"] == "spikes" and variable["popNameShort"] == "CA3contL":
-            spikesCA3cont = variable
-        elif variable["type"] == "spikes" and variable["popNameShort"] == "DGL":
-            spikesDG = variable
-        elif variable["type"] == "spikes" and variable["popNameShort"] == "IL":
-            spikesInput = variable
-        elif variable["type"] == "w" and variable["popNameShort"] == "CA3cueL-CA3contL":
-            wCA3cue_CA3cont = variable
-        elif variable["type"] == "spikes" and variable["popNameShort"] == "CA1L":
-            spikesCA1 = variable
-        elif variable["type"] == "spikes" and variable["popNameShort"] == "OL":
-            spikesOutput = variable
-
-    # Create the stream of time stamp and format spikes information
-    timeStream = tools.generate_time_streams(data["simTime"], data["timeStep"], "ms")
-    spikesInfo = {"IN":{"spikeStream":spikesInput["data"], "label":"IN", "sublabels":["INcue", "INcont"], "color":colors["IN"]},
-                  "OUT":{"spikeStream":spikesOutput["data"], "label":"OUT", "sublabels":["OUTcue", "OUTcont"], "color":colors["OUT"]}}
-
-    # Create visual plot of sequence of spikes along the network during simulation
-    # Only in/out
-    plot.plot_spike_sequence(spikesInfo=spikesInfo, timeStream=timeStream, numCueBinaryNeuron=spikesDG["numNeurons"],
-                             numContNeuron=data["contSize"], spikeAmplitude=spikeAmplitude, marginAddLim=marginAddLim,
-                             fontsize=fontsize, figSize=figSize, figTitle=figSpikeTitle, isPlot=isPlotShow, isSave=isPlotSave,
-                             saveFigName=saveFileName+"_in_out_spikes", saveFigPath=baseSavePath)
-    # All spikes
-    spikesInfo["DG"] = {"spikeStream":spikesDG["data"], "label":"DG", "sublabels":["DG"], "color":colors["DG"]}
-    spikesInfo["CA3cue"] = {"spikeStream":spikesCA3cue["data"], "label":"CA3cue", "sublabels":["CA3cue"], "color":colors["CA3cue"]}
-    spikesInfo["CA3cont"] = {"spikeStream":spikesCA3cont["data"], "label":"CA3cont", "sublabels":["CA3cont"], "color":colors["CA3cont"]}
-    spikesInfo["CA1"] = {"spikeStream": spikesCA1["data"], "label": "CA1", "sublabels": ["CA1"], "color": colors["CA1"]}
-    plot.plot_spike_sequence(spikesInfo=spikesInfo, timeStream=timeStream,
-                             numCueBinaryNeuron=spikesDG["numNeurons"],
-                             numContNeuron=data["contSize"], spikeAmplitude=spikeAmplitude, marginAddLim=marginAddLim,
-                             fontsize=fontsize, figSize=figSize, figTitle=figSpikeTitle, isPlot=isPlotShow,
-                             isSave=isPlotSave,
-                             saveFigName=saveFileName + "_all_spikes", saveFigPath=baseSavePath)
-
-    # Create a txt file with the sequence of spikes formatted
-    plot.generate_table_txt(spikesInfo=spikesInfo, timeStream=timeStream,
-                            numCueBinaryNeuron=spikesDG["numNeurons"],
-                            numCueOneHotNeuron=data["cueSize"], numContNeuron=data["contSize"],
-                            endianness=data["endianness"], allTimeStampInTrace=allTimeStampInTrace,
-                            iSMetaDataSave=False,
-                            fileSavePath=baseSavePath, fileSaveName=saveFileName + "_all_spike", headers=headers,
-                            boxTableSize=boxTableSize)
-    # Create an excel table with the sequence of spikes formatted
-    plot.generate_table_excel(spikesInfo=spikesInfo, timeStream=timeStream,
-                              numCueBinaryNeuron=spikesDG["numNeurons"],
-                              numCueOneHotNeuron=data["cueSize"], numContNeuron=data["contSize"],
-                              endianness=data["endianness"], allTimeStampInTrace=allTimeStampInTrace,
-                              iSMetaDataSave=False,
-                              fileSavePath=baseSavePath, fileSaveName=saveFileName + "_all_spike",
-                              simTime=data["simTime"],
-                              colors=excelColors, orientationFormat=orientationFormat, headers=headers,
-                              boxTableSize=boxTableSize)
-
+    # Independent files to create: the plots of spikes, the tables and the weight plots (split between the processes)
+    params = {"spikeAmplitude": spikeAmplitude, "marginAddLim": marginAddLim, "fontsize": fontsize, "figSize": figSize,
+              "figSpikeTitle": figSpikeTitle, "figWeightTitle": figWeightTitle, "recordWeight": recordWeight,
+              "allTimeStampInTrace": allTimeStampInTrace, "colors": colors, "isPlotShow": isPlotShow,
+              "isPlotSave": isPlotSave, "saveFileName": saveFileName, "baseSavePath": baseSavePath,
+              "orientationFormat": orientationFormat, "excelColors": excelColors, "headers": headers,
+              "boxTableSize": boxTableSize, "weightNumWindows": weightNumWindows}
+    artifacts = [("inOutSpikes", params), ("allSpikes", params), ("tables", params)]
     # Plot weight evolution of the CA3cue-CA3cont layer neurons if applicable
-    if recordWeight:
+    if recordWeight and weightPlotStyle not in ["heatmap", "3d", "both"]:
+        raise ValueError("Weight plot style not supported. Supported styles: heatmap, 3d and both")
+    if recordWeight and weightPlotStyle in ["heatmap", "both"]:
+        artifacts.append(("weightMatrix", params))
+    if recordWeight and weightPlotStyle in ["3d", "both"]:
         # Generate as many colors as number of CA3cue neurons
-        colors = []
-        for i in range(spikesCA3cue["numNeurons"]):
-            colors.append('#%06X' % random.randint(0, 0xFFFFFF))
-        # Create the weight plots
-        plot.plot_weight_syn_in_all_neuron(srcNeuronIds=wCA3cue_CA3cont["data"]["srcNeuronId"], dstNeuronIds=wCA3cue_CA3cont["data"]["dstNeuronId"],
-                                           timeStreams=wCA3cue_CA3cont["data"]["timeStamp"], weightsStream=wCA3cue_CA3cont["data"]["w"],
-                                           zlimit=[data["synParameters"]["CA3cueL-CA3contL"]["w_min"] - 0.5,
-                                         data["synParameters"]["CA3cueL-CA3contL"]["w_max"] + 0.5],
-                                           colors=colors, baseFigTitle=figWeightTitle, figSize=figSize, fontsize=fontsize,
-                                           iSplot=isPlotShow, iSsave=isPlotSave, saveFigName=saveFileName+"_weight",
-                                           saveFigPath=baseSavePath)
+        weightColors = []
+        for i in range(context["numCueNeuron"]):
+            weightColors.append('#%06X' % random.randint(0, 0xFFFFFF))
+        numDstNeurons = context["data"]["contSize"]
+        numWeightArtifacts = max(min(numWorkers, numDstNeurons), 1)
+        for indexArtifact in range(numWeightArtifacts):
+            dstNeuronIds = list(range(indexArtifact, numDstNeurons, numWeightArtifacts))
+            artifacts.append(("weights", dict(params, weightColors=weightColors, dstNeuronIds=dstNeuronIds)))
+
+    # Create the files: concurrently in a pool of processes or one after another. The metrics of each file are measured
+    #  in the process that creates it
+    processingMetrics.begin("artifacts")
+    if numWorkers > 1 and not isPlotShow:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=numWorkers, initializer=init_artifact_worker) as executor:
+            futures = [executor.submit(build_artifact, artifact, fullPathFile, artifactParams)
+                       for artifact, artifactParams in artifacts]
+            artifactPhases = [future.result() for future in futures]
+    else:
+        artifactPhases = [build_artifact(artifact, fullPathFile, artifactParams)
+                          for artifact, artifactParams in artifacts]
+    processingMetrics.end()
+    processingMetrics.add_phases(artifactPhases, parent="artifacts")
+    processingMetrics.save(baseSavePath + saveFileName)
+    if printMetrics:
+        print("\n".join(processingMetrics.get_summary()))
     return True
 
 
 def test(isPlotShow, isPlotSave, colors, spikeAmplitude, marginAddLim, fontsize, figSize, figSpikeTitle, figWeightTitle,
          baseSavePath, allTimeStampInTrace, executeSim, recordWeight, fullPathFile, saveFileName, orientationFormat, excelColors,
-         headers, boxTableSize):
+         headers, boxTableSize, numWorkers=1, weightPlotStyle="heatmap", weightNumWindows=16, useResultCache=True,
+         printMetrics=False):
     """
     Execute the simulation of the network and/or create a visual representation of the data recorded
 
@@ -150,12 +278,20 @@ def test(isPlotShow, isPlotSave, colors, spikeAmplitude, marginAddLim, fontsize,
     @param excelColors: colors to use in excel table
     @param headers: headers used in table
     @param boxTableSize: size of box in table
+    @param numWorkers: (optional) number of processes used to create the files of the visual representation concurrently
+    @param weightPlotStyle: (optional) representation of the weights: "heatmap", "3d" or "both"
+    @param weightNumWindows: (optional) number of time windows of the "heatmap" representation of the weights
+    @param useResultCache: (optional) if execute, if take the result of the same simulation from the result cache (data/)
+            instead of executing it again
+    @param printMetrics: (optional) if print the time and memory of each phase of the simulation and of the processing
+            of the data (they are always stored next to the generated files)
     @return: True if the simulation and/or the creation of the visual representation of the data has been done correctly
             or False in other cases
     """
     # Execute the model if applicable
     if executeSim:
-        fullPathFile, filename = DG_CA3_CA1_one_hot.main(recordWeight)
+        fullPathFile, filename = DG_CA3_CA1_one_hot.main(recordWeight, useCache=useResultCache,
+                                                                 printMetrics=printMetrics)
         saveFileName = filename
     # Check and/or create the base folder to store all the plot
     checkStatus = tools.check_and_create_folder(baseSavePath)
@@ -165,72 +301,78 @@ def test(isPlotShow, isPlotSave, colors, spikeAmplitude, marginAddLim, fontsize,
     # Processing the data to plot it
     exitStatus = processing_data(spikeAmplitude, marginAddLim, fontsize, figSize, figSpikeTitle, figWeightTitle,
                                  recordWeight, allTimeStampInTrace, colors, fullPathFile, isPlotShow, isPlotSave, saveFileName,
-                                 baseSavePath, orientationFormat, excelColors, headers, boxTableSize)
+                                 baseSavePath, orientationFormat, excelColors, headers, boxTableSize, numWorkers,
+                                 weightPlotStyle, weightNumWindows, printMetrics)
     return exitStatus
 
 
 if __name__ == "__main__":
-    # Open configparser object interface to read config files
-    config = configparser.ConfigParser()
-    # + Check the active config file directory
-    config.read("config_files/configFileParameters.ini")
-    activeConfigFilePath = "config_files/" + eval(config["configFileParameters"]["activeConfigFiles"]) + "/"
-
-    # + Simulation parameters
-    config.read(activeConfigFilePath + "simulation_config.ini")
+    # Read the config files: active config file directory and test parameters
+    activeConfigFilePath = config_loader.get_active_config_path()
+    testParameters = config_loader.read_test_parameters(activeConfigFilePath)
 
     # Plot and execution parameters
     # + If show the plot in running time
-    isPlotShow = eval(config["testParameters"]["isPlotShow"])
+    isPlotShow = testParameters["isPlotShow"]
     # + If store the plots
-    isPlotSave = eval(config["testParameters"]["isPlotSave"])
+    isPlotSave = testParameters["isPlotSave"]
     # + Base path where store the plot
-    baseSavePath = eval(config["testParameters"]["baseSavePath"])
+    baseSavePath = testParameters["baseSavePath"]
     # + If represent all time stamp in trace files or only time stamps where the network is spiking
-    allTimeStampInTrace = eval(config["testParameters"]["allTimeStampInTrace"])
+    allTimeStampInTrace = testParameters["allTimeStampInTrace"]
     # + If execute the network or take already generated data
-    executeSim = eval(config["testParameters"]["executeSim"])
+    executeSim = testParameters["executeSim"]
     # + If execute, if record weight information or not
-    recordWeight = eval(config["testParameters"]["recordWeight"])
+    recordWeight = testParameters["recordWeight"]
     # + If not execute, the full path to the file with the data recorded from the simulation and the base name used to store
     #   the generated files (txt, png, ...)
-    fullPathFile = eval(config["testParameters"]["fullPathFile"])
-    saveFileName = eval(config["testParameters"]["saveFileName"])
+    fullPathFile = testParameters["fullPathFile"]
+    saveFileName = testParameters["saveFileName"]
 
     # Meta info parameters
     # + Colors used to represent information: as many as there are different populations
-    colorsPopName = eval(config["testParameters"]["colorsPopName"])
-    colorsPopType = eval(config["testParameters"]["colorsPopType"])
+    colorsPopName = testParameters["colorsPopName"]
+    colorsPopType = testParameters["colorsPopType"]
     colors = {}
     [colors.update({colorsPopName[i]:colorsPopType[i]})  for i in range(len(colorsPopName))]
     # + Amplitude of the spike represented in the plot
-    spikeAmplitude = eval(config["testParameters"]["spikeAmplitude"])
+    spikeAmplitude = testParameters["spikeAmplitude"]
     # + Margin added to the longitude of the spike representation to make a gap
-    marginAddLim = eval(config["testParameters"]["marginAddLim"])
+    marginAddLim = testParameters["marginAddLim"]
     # + Size of the font used in plots
-    fontsize = eval(config["testParameters"]["fontsize"])
+    fontsize = testParameters["fontsize"]
     # + Size of the figure
-    figSize = eval(config["testParameters"]["figSize"])
+    figSize = testParameters["figSize"]
     # + Title of the spikes plots
-    figSpikeTitle = eval(config["testParameters"]["figSpikeTitle"])
+    figSpikeTitle = testParameters["figSpikeTitle"]
     # + Title of the weights plot
-    figWeightTitle = eval(config["testParameters"]["figWeightTitle"])
+    figWeightTitle = testParameters["figWeightTitle"]
     # + Orientation of the time stamp: "vertical" or "horizontal", in the excel file
-    orientationFormat = eval(config["testParameters"]["orientationFormat"])
+    orientationFormat = testParameters["orientationFormat"]
     # + Colors to use in excel table
-    colorsPopName = eval(config["testParameters"]["excelColorsPopName"])
-    colorsPopType = eval(config["testParameters"]["excelColorsPopType"])
+    colorsPopName = testParameters["excelColorsPopName"]
+    colorsPopType = testParameters["excelColorsPopType"]
     excelColors = {}
     [excelColors.update({colorsPopName[i]: colorsPopType[i]}) for i in range(len(colorsPopName))]
     # Headers used in excel and txt table
-    headers = eval(config["testParameters"]["headers"])
+    headers = testParameters["headers"]
     # Size of box in table
-    boxTableSize = eval(config["testParameters"]["boxTableSize"])
+    boxTableSize = testParameters["boxTableSize"]
+    # Number of processes used to create the plots and tables concurrently
+    numWorkers = testParameters["numWorkers"]
+    # Representation of the weights ("heatmap", "3d" or "both") and number of time windows of the heatmap
+    weightPlotStyle = testParameters["weightPlotStyle"]
+    weightNumWindows = testParameters["weightNumWindows"]
+    # If take the result of the same simulation from the result cache instead of executing it again
+    useResultCache = testParameters["useResultCache"]
+    # If print the time, CPU time and peak memory of each phase of the simulation and the processing of the data
+    printMetrics = testParameters["printMetrics"]
 
     # Simulation and/or representation
     exisStatus = test(isPlotShow, isPlotSave, colors, spikeAmplitude, marginAddLim, fontsize, figSize, figSpikeTitle, figWeightTitle,
                       baseSavePath, allTimeStampInTrace, executeSim, recordWeight, fullPathFile, saveFileName, orientationFormat,
-                      excelColors, headers, boxTableSize)
+                      excelColors, headers, boxTableSize, numWorkers, weightPlotStyle, weightNumWindows, useResultCache,
+                      printMetrics)
     if exisStatus:
         print("Finished without problems")
     else:
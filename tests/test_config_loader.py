@@ -0,0 +1,81 @@
+import pytest
+import config_loader
+
+
+SCHEMA = {"name": (str, config_loader.REQUIRED), "size": (int, 5), "rate": (config_loader.NUMBER, 1.0),
+          "mode": (str, "a", ["a", "b"])}
+
+
+def write_config(tmp_path, text, filename="config.ini"):
+    fullPath = str(tmp_path) + "/" + filename
+    with open(fullPath, "w") as file:
+        file.write(text)
+    return fullPath
+
+
+def test_read_section_defaults(tmp_path):
+    fullPath = write_config(tmp_path, "[section]\nname = \"x\"\nrate = 2\n")
+    assert config_loader.read_section(fullPath, "section", SCHEMA) == {"name": "x", "size": 5, "rate": 2, "mode": "a"}
+
+
+@pytest.mark.parametrize("text", [
+    # Missing required parameter
+    "size = 3\n",
+    # Wrong type (a bool is not a number)
+    "name = \"x\"\nsize = \"3\"\n",
+    "name = \"x\"\nrate = True\n",
+    # Value not allowed
+    "name = \"x\"\nmode = \"c\"\n",
+    # Not a literal (no code is executed)
+    "name = __import__(\"os\").getcwd()\n",
+])
+def test_read_section_rejections(tmp_path, text):
+    fullPath = write_config(tmp_path, "[section]\n" + text)
+    with pytest.raises(ValueError):
+        config_loader.read_section(fullPath, "section", SCHEMA)
+
+
+def test_read_section_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        config_loader.read_section(str(tmp_path) + "/missing.ini", "section", SCHEMA)
+    with pytest.raises(ValueError):
+        config_loader.read_section(write_config(tmp_path, "[other]\n"), "section", SCHEMA)
+
+
+@pytest.fixture
+def inputSpikesCache(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_loader, "INPUT_SPIKES_CACHE_PATH", str(tmp_path) + "/cache/")
+    monkeypatch.setattr(config_loader, "inputSpikesCache", {})
+
+
+def test_read_input_spikes(tmp_path, inputSpikesCache):
+    fullPath = write_config(tmp_path, "[input_cue]\nInputSpikesCue = [[1, 2], [], [3]]\n"
+                                      "[input_cont]\nInputSpikesCont = [[1], [2]]\n", "input_spikes.ini")
+    inputSpikesCue, inputSpikesCont = config_loader.read_input_spikes(fullPath, 7, 2)
+    assert inputSpikesCue == [[1, 2], [], [3]] and inputSpikesCont == [[1], [2]]
+    # The cached spikes are not shared with the caller
+    inputSpikesCue[0].append(10)
+    assert config_loader.read_input_spikes(fullPath, 7, 2)[0] == [[1, 2], [], [3]]
+    config_loader.inputSpikesCache.clear()
+    assert config_loader.read_input_spikes(fullPath, 7, 2)[0] == [[1, 2], [], [3]]
+
+
+@pytest.mark.parametrize("text, cueSize, contSize", [
+    # Size of the memory
+    ("[input_cue]\nInputSpikesCue = [[1], [], [3]]\n[input_cont]\nInputSpikesCont = [[1], [2]]\n", 3, 2),
+    ("[input_cue]\nInputSpikesCue = [[1], [], [3]]\n[input_cont]\nInputSpikesCont = [[1], [2]]\n", 7, 3),
+    # Invalid spike times
+    ("[input_cue]\nInputSpikesCue = [[1], [], [-3]]\n[input_cont]\nInputSpikesCont = [[1], [2]]\n", 7, 2),
+    ("[input_cue]\nInputSpikesCue = [1, 2, 3]\n[input_cont]\nInputSpikesCont = [[1], [2]]\n", 7, 2),
+    # Missing section
+    ("[input_cue]\nInputSpikesCue = [[1], [], [3]]\n", 7, 2),
+])
+def test_read_input_spikes_rejections(tmp_path, inputSpikesCache, text, cueSize, contSize):
+    fullPath = write_config(tmp_path, text, "input_spikes.ini")
+    with pytest.raises(ValueError):
+        config_loader.read_input_spikes(fullPath, cueSize, contSize)
+
+
+def test_read_input_spikes_missing(tmp_path, inputSpikesCache):
+    with pytest.raises(FileNotFoundError):
+        config_loader.read_input_spikes(str(tmp_path) + "/input_spikes.ini", 7, 2)
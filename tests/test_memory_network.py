@@ -0,0 +1,153 @@
+import os
+import numpy as np
+import pytest
+import DG_CA3_CA1_one_hot
+import memory_testbench
+import metrics
+import tools
+
+
+CONFIG_FILES_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/config_files/test_01/"
+
+
+@pytest.fixture
+def network(tmp_path, monkeypatch):
+    # The files of the simulations (data/) are created in a temporary working directory
+    monkeypatch.chdir(tmp_path)
+    network = DG_CA3_CA1_one_hot.MemoryNetwork.from_config_files(CONFIG_FILES_PATH)
+    network.simulationParameters["backend"] = "numpy"
+    return network
+
+
+def run_with_policy(network, policy, period=1):
+    network.simulationParameters["weightRecordPolicy"] = policy
+    network.simulationParameters["weightRecordPeriod"] = period
+    formatData = network.run_numpy(True)
+    return formatData["wTimeStamps"], formatData["wCA3cueL_CA3contL"]
+
+
+def get_snapshots_at(timeStamps, weights, stamps):
+    # Weights at each time stamp: the last snapshot taken at or before it
+    return weights[np.searchsorted(timeStamps, stamps, side="right") - 1]
+
+
+def test_weight_record_policies(network):
+    simTime = network.simulationParameters["simTime"]
+    everyTimeStamps, everyWeights = run_with_policy(network, "every")
+    assert everyTimeStamps == tools.generate_sequence(0, simTime + 1, 1, 1)
+
+    timeStamps, weights = run_with_policy(network, "every", 5)
+    assert timeStamps == sorted(set(tools.generate_sequence(0, simTime, 5, 1) + [float(simTime)]))
+    np.testing.assert_array_equal(weights, get_snapshots_at(everyTimeStamps, everyWeights, timeStamps))
+
+    timeStamps, weights = run_with_policy(network, "boundaries")
+    operationBegins = tools.get_operation_begin_times(network.inputSpikes, network.dgInputSize,
+                                                     network.simulationParameters["timeStep"])
+    assert timeStamps == sorted(set([0.0, float(simTime)] + operationBegins))
+    np.testing.assert_array_equal(weights, get_snapshots_at(everyTimeStamps, everyWeights, timeStamps))
+
+    # Only the snapshots where a synapse changed are kept, but the full history can be rebuilt from them
+    timeStamps, weights = run_with_policy(network, "change")
+    assert len(timeStamps) < len(everyTimeStamps)
+    assert np.all(np.any(weights[1:-1] != weights[:-2], axis=(1, 2)))
+    np.testing.assert_array_equal(get_snapshots_at(timeStamps, weights, everyTimeStamps), everyWeights)
+
+
+def test_change_record_times_cover_the_changes(network):
+    # The time stamps of the "change" policy (used by the SpiNNaker backend) include every change of the weights
+    simTime = network.simulationParameters["simTime"]
+    everyTimeStamps, everyWeights = run_with_policy(network, "every")
+    network.simulationParameters["weightRecordPolicy"] = "change"
+    recordTimes = network.get_weight_record_times(network.inputSpikes, simTime)
+    changeTimes = [everyTimeStamps[index] for index in range(1, len(everyWeights))
+                   if np.any(everyWeights[index] != everyWeights[index - 1])]
+    assert changeTimes and set(changeTimes) <= set(recordTimes)
+
+
+def get_result_paths():
+    return sorted(filename for filename in os.listdir("data/") if filename.endswith(tools.RESULT_EXTENSION))
+
+
+def test_run_result_cache_hit(network):
+    fullPath, filename = network.run(False)
+    assert network.run(False) == (fullPath, filename)
+    # The weight recording policy does not change a simulation without weights
+    network.simulationParameters["weightRecordPolicy"] = "change"
+    assert network.run(False) == (fullPath, filename)
+    assert network.run(True)[0] != fullPath
+    assert len(get_result_paths()) == 2
+
+
+def test_run_result_cache_bypass(network):
+    fullPath, _ = network.run(False)
+    newPath, _ = network.run(False, useCache=False)
+    # The new result replaces the cached one
+    assert newPath != fullPath and not os.path.exists(fullPath)
+    assert network.run(False)[0] == newPath and get_result_paths() == [os.path.basename(newPath)]
+
+
+def test_run_result_cache_eviction(network):
+    fullPath, _ = network.run(False)
+    network.simulationParameters["resultCacheMaxSize"] = 0
+    newPath, _ = network.run(True)
+    assert not os.path.exists(fullPath) and not os.path.exists(metrics.get_metrics_path(fullPath))
+    assert get_result_paths() == [os.path.basename(newPath)]
+    # The evicted simulation is executed again
+    lastPath, _ = network.run(False)
+    assert not os.path.exists(newPath) and get_result_paths() == [os.path.basename(lastPath)]
+
+
+CONTENT_TABLE = {1: [1, 0, 1, 1, 0, 0, 0, 0, 1, 1], 2: [0, 1, 1, 0, 0, 1, 0, 0, 0, 0], 3: 1023}
+
+
+def set_operations(network, operations, cues):
+    # Input spikes of a sequence of operations (with the contents of CONTENT_TABLE) in the endianness of the memory
+    contents = np.array([DG_CA3_CA1_one_hot.get_content_bits(CONTENT_TABLE[cue], network.contSize) for cue in cues])
+    cueSpikes, contSpikes, endTime = memory_testbench.compile_operations(
+        np.array(operations), memory_testbench.values_to_binary_matrix(cues, network.dgInputSize), contents, [7, 6],
+        [3, 1])
+    if network.endianness == "little_endian":
+        cueSpikes, contSpikes = cueSpikes[::-1], contSpikes[::-1]
+    network.inputSpikes = [[float(spike) for spike in neuron] for neuron in cueSpikes + contSpikes]
+    network.simulationParameters["simTime"] = int(endTime) + 10
+    return int(endTime)
+
+
+def test_preload_same_recall_as_writing(network):
+    cues = list(CONTENT_TABLE)
+    writingTime = set_operations(network, [0] * len(cues), cues)
+    writingOutput = network.run_numpy(False)["spikesOL"]
+    set_operations(network, [0] * len(cues) + [1] * len(cues), cues + cues)
+    writtenOutput = network.run_numpy(False)["spikesOL"]
+    set_operations(network, [1] * len(cues), cues)
+    network.preload(CONTENT_TABLE)
+    preloadedOutput = network.run_numpy(False)["spikesOL"]
+    # The recall of a preloaded memory is the recall after the writing operations (the operations begin at 1 ms)
+    assert any(preloadedOutput)
+    assert preloadedOutput == [[spike - writingTime + 1 for spike in neuron if spike not in writingNeuron]
+                               for neuron, writingNeuron in zip(writtenOutput, writingOutput)]
+
+
+def test_preload_weights(network):
+    network.preload(CONTENT_TABLE)
+    stdp = network.synParameters["CA3cueL-CA3contL"]
+    assert network.initialWeights.shape == (network.cueSize, network.contSize)
+    assert np.count_nonzero(network.initialWeights == stdp["w_max"]) == 5 + 3 + 10
+    assert np.all((network.initialWeights == stdp["w_max"]) | (network.initialWeights == stdp["initWeight"]))
+    assert network.contentTable[3] == [1] * network.contSize
+    # The content table is part of the key of the result cache
+    key = network.get_simulation_key(False, "numpy")
+    network.preload({1: 1})
+    assert network.get_simulation_key(False, "numpy") != key
+
+
+@pytest.mark.parametrize("contentTable", [{0: 1}, {6: 1}, {1: 1024}, {1: [1, 0]}, {1: [2] * 10}])
+def test_preload_rejections(network, contentTable):
+    with pytest.raises(ValueError):
+        network.preload(contentTable)
+
+
+def test_preload_requires_saturating_writing(network):
+    network.synParameters["CA3cueL-CA3contL"]["A_plus"] = 1.0
+    with pytest.raises(ValueError):
+        network.preload(CONTENT_TABLE)
@@ -0,0 +1,69 @@
+import glob
+import os
+import numpy as np
+import pytest
+import numpy_backend
+import tools
+
+
+DATA_PATHS = sorted(glob.glob(os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/data/*.txt"))
+# Spikes of each population recorded on SpiNNaker -> key of the data of the numpy backend
+SPIKE_VARIABLES = {"CA3cueL": "spikesCA3cue", "CA3contL": "spikesCA3cont", "DGL": "spikesDG", "CA1L": "spikesCA1",
+                   "OL": "spikesOL"}
+
+
+def read_spinnaker_result(fullPath):
+    data = tools.read_result(fullPath)
+    variables = {(variable["type"], variable["popNameShort"]): variable["data"] for variable in data["variables"]}
+    return data, variables
+
+
+def get_network(data):
+    return numpy_backend.NumpyNetwork(data["cueSize"], data["contSize"], data["neuronParameters"],
+                                      data["initNeuronParameters"], data["synParameters"], data["timeStep"])
+
+
+@pytest.mark.parametrize("fullPath", DATA_PATHS, ids=os.path.basename)
+def test_same_result_as_spinnaker(fullPath):
+    data, variables = read_spinnaker_result(fullPath)
+    out = get_network(data).run(variables[("spikes", "IL")], data["simTime"], False)
+    for popNameShort, key in SPIKE_VARIABLES.items():
+        assert out[key] == variables[("spikes", popNameShort)], popNameShort
+    np.testing.assert_allclose(out["vCA3cue"], variables[("v", "CA3cueL")], atol=1e-3)
+
+
+def test_weights_recorded():
+    data, variables = read_spinnaker_result(DATA_PATHS[-1])
+    network = get_network(data)
+    inputSpikes = variables[("spikes", "IL")]
+    out = network.run(inputSpikes, data["simTime"], True)
+    numSteps = int(round(data["simTime"] / data["timeStep"]))
+    assert out["wCA3cueL_CA3contL"].shape == (numSteps + 1, data["cueSize"], data["contSize"])
+    assert out["wTimeStamps"] == [step * data["timeStep"] for step in range(numSteps + 1)]
+    np.testing.assert_array_equal(out["wCA3cueL_CA3contL"][0], data["synParameters"]["CA3cueL-CA3contL"]["initWeight"])
+    # Recording the weights does not change the simulation
+    assert out["spikesOL"] == network.run(inputSpikes, data["simTime"], False)["spikesOL"]
+
+
+def test_batch_same_as_single_runs():
+    # Longest simulation, so all the operations of each input spike set are simulated
+    data, _ = read_spinnaker_result(DATA_PATHS[-1])
+    network = get_network(data)
+    inputSpikesBatch = [read_spinnaker_result(fullPath)[1][("spikes", "IL")] for fullPath in DATA_PATHS]
+    outBatch = network.run_batch(inputSpikesBatch, data["simTime"], True)
+    assert len(outBatch) == len(inputSpikesBatch)
+    for out, inputSpikes in zip(outBatch, inputSpikesBatch):
+        single = network.run(inputSpikes, data["simTime"], True)
+        assert sorted(out) == sorted(single)
+        for key in single:
+            if isinstance(single[key], np.ndarray):
+                np.testing.assert_array_equal(out[key], single[key], err_msg=key)
+            else:
+                assert out[key] == single[key], key
+
+
+def test_batch_rejects_wrong_input_size():
+    data, variables = read_spinnaker_result(DATA_PATHS[0])
+    with pytest.raises(ValueError):
+        get_network(data).run_batch([variables[("spikes", "IL")], variables[("spikes", "IL")][:-1]], data["simTime"],
+                                    False)
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+import config_loader
+import memory_testbench
+import operation_log
+
+
+CUE_SIZE_IN_BIN = 3
+CONT_SIZE = 10
+OPERATION_TIME = [7, 6]
+HOLDING_TIME = [3, 1]
+
+
+def get_operations(numOperations=50, seed=0):
+    generator = np.random.default_rng(seed)
+    operations = generator.integers(0, 2, numOperations)
+    cues = generator.integers(0, 2 ** CUE_SIZE_IN_BIN, numOperations)
+    contents = generator.integers(0, 2, (numOperations, CONT_SIZE))
+    return operations, cues, contents
+
+
+def get_compiled_spikes(operations, cues, contents):
+    cueSpikes, contSpikes, _ = memory_testbench.compile_operations(
+        operations, memory_testbench.values_to_binary_matrix(cues, CUE_SIZE_IN_BIN), contents, OPERATION_TIME,
+        HOLDING_TIME)
+    return cueSpikes, contSpikes
+
+
+def get_window(spikes, beginTime, endTime):
+    return [[spike for spike in neuron if beginTime <= spike < endTime] for neuron in spikes]
+
+
+def as_lists(spikes):
+    return [[float(spike) for spike in neuron] for neuron in spikes]
+
+
+def test_write_read(tmp_path):
+    operations, cues, contents = get_operations()
+    log = operation_log.OperationLog.from_operations(operations, cues, contents, CUE_SIZE_IN_BIN, CONT_SIZE,
+                                                     OPERATION_TIME, HOLDING_TIME)
+    fullPath, _ = log.write(str(tmp_path) + "/", "input_spikes")
+    read = operation_log.read_operation_log(fullPath, 2 ** CUE_SIZE_IN_BIN - 1, CONT_SIZE)
+    assert len(read) == len(log) and read.endTime == log.endTime and read.holdingTime == HOLDING_TIME
+    np.testing.assert_array_equal(read.operations, operations)
+    np.testing.assert_array_equal(read.cues, cues)
+    np.testing.assert_array_equal(read.startTimes, log.startTimes)
+    np.testing.assert_array_equal(np.unpackbits(read.contents, axis=1, count=CONT_SIZE), contents)
+
+
+def test_expansion_matches_compile_operations(tmp_path):
+    operations, cues, contents = get_operations()
+    log = operation_log.OperationLog.from_operations(operations, cues, contents, CUE_SIZE_IN_BIN, CONT_SIZE,
+                                                     OPERATION_TIME, HOLDING_TIME)
+    read = operation_log.OperationLog.read(log.write(str(tmp_path) + "/", "input_spikes")[0])
+    cueSpikes, contSpikes = get_compiled_spikes(operations, cues, contents)
+    logCue, logCont = read.get_input_spikes()
+    assert as_lists(logCue) == as_lists(cueSpikes) and as_lists(logCont) == as_lists(contSpikes)
+    assert read.get_last_spike_time() == max(max(neuron) for neuron in cueSpikes + contSpikes if len(neuron) > 0)
+
+
+@pytest.mark.parametrize("beginTime, endTime", [(0, 20), (13, 14), (37, 120), (100, 1000), (500, 600)])
+def test_windowed_expansion(tmp_path, beginTime, endTime):
+    operations, cues, contents = get_operations()
+    log = operation_log.OperationLog.from_operations(operations, cues, contents, CUE_SIZE_IN_BIN, CONT_SIZE,
+                                                     OPERATION_TIME, HOLDING_TIME)
+    read = operation_log.OperationLog.read(log.write(str(tmp_path) + "/", "input_spikes")[0])
+    cueSpikes, contSpikes = get_compiled_spikes(operations, cues, contents)
+    logCue, logCont = read.get_input_spikes(beginTime, endTime)
+    assert as_lists(logCue) == as_lists(get_window(cueSpikes, beginTime, endTime))
+    assert as_lists(logCont) == as_lists(get_window(contSpikes, beginTime, endTime))
+
+
+def test_chunks_match_single_log(tmp_path):
+    operations, cues, contents = get_operations(200)
+    log = operation_log.OperationLog.from_operations(operations, cues, contents, CUE_SIZE_IN_BIN, CONT_SIZE,
+                                                     OPERATION_TIME, HOLDING_TIME)
+    chunks = [operation_log.OperationLog.from_operations(operations[first:first + 64], cues[first:first + 64],
+                                                         contents[first:first + 64], CUE_SIZE_IN_BIN, CONT_SIZE,
+                                                         OPERATION_TIME, HOLDING_TIME,
+                                                         startTimes=log.startTimes[first:first + 64])
+              for first in range(0, len(operations), 64)]
+    fullPath, _, numOperations = operation_log.write_operation_log_chunks(chunks, str(tmp_path) + "/", "chunks",
+                                                                          blockSize=100)
+    assert numOperations == len(operations)
+    read = operation_log.OperationLog.read(fullPath)
+    assert as_lists(read.get_input_spikes()[0]) == as_lists(log.get_input_spikes()[0])
+    assert as_lists(read.get_input_spikes()[1]) == as_lists(log.get_input_spikes()[1])
+
+
+def test_rejections(tmp_path):
+    operations, cues, contents = get_operations()
+    with pytest.raises(ValueError):
+        operation_log.OperationLog.from_operations(operations, cues, contents, CUE_SIZE_IN_BIN, CONT_SIZE, [7.5, 6],
+                                                   HOLDING_TIME)
+    with pytest.raises(ValueError):
+        operation_log.OperationLog.from_operations(operations, cues, contents, CUE_SIZE_IN_BIN, CONT_SIZE,
+                                                   OPERATION_TIME, [3, 0.5])
+    with pytest.raises(ValueError):
+        operation_log.OperationLog.from_operations(operations, cues + 2 ** CUE_SIZE_IN_BIN, contents, CUE_SIZE_IN_BIN,
+                                                   CONT_SIZE, OPERATION_TIME, HOLDING_TIME)
+    log = operation_log.OperationLog.from_operations(operations, cues, contents, CUE_SIZE_IN_BIN, CONT_SIZE,
+                                                     OPERATION_TIME, HOLDING_TIME)
+    fullPath, _ = log.write(str(tmp_path) + "/", "input_spikes")
+    with pytest.raises(ValueError):
+        operation_log.read_operation_log(fullPath, 2 ** (CUE_SIZE_IN_BIN + 1) - 1, CONT_SIZE)
+    with pytest.raises(ValueError):
+        operation_log.read_operation_log(fullPath, 2 ** CUE_SIZE_IN_BIN - 1, CONT_SIZE + 1)
+
+
+TESTBENCH = "[testbench]\ntbPath = \"tb/\"\nreadingOperationTime = {}\nwritingOperationTime = 7\n" \
+            "readingOperationDataHolding = 1\nwritingOperationDataHolding = 3\nnumberOfOperations = 10\n" \
+            "workloadFormat = \"{}\"\n"
+
+
+def write_testbench_config(tmp_path, readingOperationTime, workloadFormat):
+    with open(str(tmp_path) + "/simulation_config.ini", "w") as file:
+        file.write(TESTBENCH.format(readingOperationTime, workloadFormat))
+    return str(tmp_path) + "/"
+
+
+def test_testbench_integer_times(tmp_path):
+    configPath = write_testbench_config(tmp_path, 6.5, "ini")
+    assert config_loader.read_testbench_parameters(configPath)["readingOperationTime"] == 6.5
+    with pytest.raises(ValueError):
+        config_loader.read_testbench_parameters(configPath, integerTimes=True)
+    # The operation logs only store integer times
+    configPath = write_testbench_config(tmp_path, 6.5, "oplog")
+    with pytest.raises(ValueError):
+        config_loader.read_testbench_parameters(configPath)
+    configPath = write_testbench_config(tmp_path, 6.0, "oplog")
+    assert config_loader.read_testbench_parameters(configPath)["readingOperationTime"] == 6
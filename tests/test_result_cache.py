@@ -0,0 +1,51 @@
+import os
+import numpy as np
+import tools
+
+
+def test_cache_key_stability():
+    inputSpikes = [[1.0, 2.0], [3.0]]
+    key = tools.get_result_cache_key({"a": 1, "b": [1, 2]}, inputSpikes)
+    assert key == tools.get_result_cache_key({"b": [1, 2], "a": 1}, [np.array([1, 2]), [3]])
+    assert key != tools.get_result_cache_key({"a": 2, "b": [1, 2]}, inputSpikes)
+    assert key != tools.get_result_cache_key({"a": 1, "b": [1, 2]}, [[1.0], [2.0, 3.0]])
+
+
+def write_bundle(basePath, filename, size):
+    with open(basePath + filename, "wb") as file:
+        file.write(bytes(size))
+    return basePath + filename
+
+
+def test_cache_eviction(tmp_path):
+    basePath = str(tmp_path) + "/"
+    pathA = write_bundle(basePath, "a.res", 10)
+    pathB = write_bundle(basePath, "b.res", 10)
+    pathC = write_bundle(basePath, "c.res", 10)
+    assert tools.add_cached_result(basePath, "a", pathA, "a", 25) == []
+    assert tools.add_cached_result(basePath, "b", pathB, "b", 25) == []
+    # The least recently used one is deleted, "a" has been used after "b"
+    assert tools.get_cached_result(basePath, "a") == (pathA, "a")
+    assert tools.add_cached_result(basePath, "c", pathC, "c", 25) == [pathB]
+    assert not os.path.exists(pathB)
+    assert tools.get_cached_result(basePath, "b") is None
+    assert sorted(tools.read_result_cache_index(basePath)) == ["a", "c"]
+
+
+def test_cache_replaced_bundle(tmp_path):
+    basePath = str(tmp_path) + "/"
+    oldPath = write_bundle(basePath, "old.res", 10)
+    newPath = write_bundle(basePath, "new.res", 10)
+    tools.add_cached_result(basePath, "key", oldPath, "old", 100)
+    assert tools.add_cached_result(basePath, "key", newPath, "new", 100) == [oldPath]
+    assert not os.path.exists(oldPath)
+    assert tools.get_cached_result(basePath, "key") == (newPath, "new")
+
+
+def test_cache_modified_bundle(tmp_path):
+    basePath = str(tmp_path) + "/"
+    path = write_bundle(basePath, "a.res", 10)
+    tools.add_cached_result(basePath, "a", path, "a", 100)
+    write_bundle(basePath, "a.res", 11)
+    assert tools.get_cached_result(basePath, "a") is None
+    assert tools.read_result_cache_index(basePath) == {}
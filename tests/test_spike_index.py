@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import spike_index
+
+
+TIME_STREAM = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+SPIKES_INFO = {"A": {"spikeStream": [[1.0, 3.0], [], [1.0, 2.0, 5.0], [3.0, 3.0, 2.5, 9.0]]},
+               "B": {"spikeStream": [[0.0], [4.0]]},
+               "C": {"spikeStream": []}}
+
+
+@pytest.fixture
+def spikeIndex():
+    return spike_index.SpikeIndex(SPIKES_INFO, TIME_STREAM)
+
+
+def get_spikes_by_scan(population, tick):
+    # Neurons which fired in a tick searching the stamp in each spike stream
+    return [neuron for neuron, spikes in enumerate(SPIKES_INFO[population]["spikeStream"])
+            if TIME_STREAM[tick] in spikes]
+
+
+def test_neurons_at(spikeIndex):
+    for population in SPIKES_INFO:
+        for tick in range(len(TIME_STREAM)):
+            assert spikeIndex.neurons_at(population, tick).tolist() == get_spikes_by_scan(population, tick)
+    assert spikeIndex.get_tick(3.0) == 3 and spikeIndex.get_tick(2.5) is None and spikeIndex.get_tick(9.0) is None
+
+
+@pytest.mark.parametrize("tickBegin, tickEnd", [(0, 6), (1, 4), (3, 3), (4, 2), (-2, 2), (5, 10)])
+def test_spikes_in(spikeIndex, tickBegin, tickEnd):
+    ticks, neurons = spikeIndex.spikes_in("A", tickBegin, tickEnd)
+    expected = [(tick, neuron) for tick in range(max(tickBegin, 0), min(tickEnd, len(TIME_STREAM)))
+                for neuron in get_spikes_by_scan("A", tick)]
+    assert list(zip(ticks.tolist(), neurons.tolist())) == expected
+
+
+def test_neuron_ticks(spikeIndex):
+    assert [spikeIndex.neuron_ticks("A", neuron).tolist() for neuron in range(4)] == [[1, 3], [], [1, 2, 5], [3]]
+    assert [spikeIndex.neuron_ticks("B", neuron).tolist() for neuron in range(2)] == [[0], [4]]
+    assert spikeIndex.numNeurons["C"] == 0 and len(spikeIndex.spikes_in("C", 0, 6)[0]) == 0
+
+
+def test_active_ticks(spikeIndex):
+    np.testing.assert_array_equal(spikeIndex.active_ticks(), [0, 1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(spikeIndex.active_ticks(["A"]), [1, 2, 3, 5])
+    assert len(spikeIndex.active_ticks([])) == 0
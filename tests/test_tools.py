@@ -0,0 +1,103 @@
+import os
+import numpy as np
+import tools
+
+
+def test_weight_stream_format():
+    weightsStream = [np.full((3, 2), float(index)) for index in range(4)]
+    formatW = tools.format_neo_data("weights", weightsStream, {"simTime": 3, "timeStep": 1.0})
+    assert formatW["timeStamp"] == [0.0, 1.0, 2.0, 3.0]
+    assert formatW["w"].dtype == np.float32 and formatW["w"].shape == (4, 3, 2)
+    np.testing.assert_array_equal(formatW["w"][:, 0, 0], [0, 1, 2, 3])
+    formatW = tools.format_neo_data("weights", weightsStream[:2], {"simTime": 3, "timeStep": 1.0,
+                                                                   "timeStamps": [0.0, 3.0]})
+    assert formatW["timeStamp"] == [0.0, 3.0]
+
+
+def test_weight_history_of_flat_format():
+    w = np.arange(12, dtype=np.float32).reshape(2, 3, 2)
+    flatData = {"srcNeuronId": [], "dstNeuronId": [], "w": [], "timeStamp": []}
+    for indexTime, stamp in enumerate([0.0, 5.0]):
+        for src in range(3):
+            for dst in range(2):
+                flatData["srcNeuronId"].append(src)
+                flatData["dstNeuronId"].append(dst)
+                flatData["w"].append(float(w[indexTime, src, dst]))
+                flatData["timeStamp"].append(stamp)
+    timeStamps, history = tools.get_weight_history(flatData)
+    np.testing.assert_array_equal(timeStamps, [0.0, 5.0])
+    np.testing.assert_array_equal(history, w)
+    timeStamps, history = tools.get_weight_history({"timeStamp": [0.0, 5.0], "w": w})
+    np.testing.assert_array_equal(timeStamps, [0.0, 5.0])
+    np.testing.assert_array_equal(history, w)
+
+
+def get_data():
+    return {"simTime": 10, "timeStep": 1.0, "cueSize": 3, "contSize": 2,
+            "variables": [{"type": "spikes", "popNameShort": "IL", "numNeurons": 3,
+                           "data": [[1.0, 2.0, 3.0], [], [4.5]]},
+                          {"type": "v", "popNameShort": "CA3cueL", "numNeurons": 2,
+                           "data": np.arange(20, dtype=np.float32).reshape(2, 10)},
+                          {"type": "w", "popNameShort": "CA3cueL-CA3contL",
+                           "data": {"timeStamp": [0.0, 5.0, 10.0],
+                                    "w": np.arange(18, dtype=np.float32).reshape(3, 3, 2)}}]}
+
+
+def check_same_data(read, data):
+    assert {key: value for key, value in read.items() if key != "variables"} == \
+           {key: value for key, value in data.items() if key != "variables"}
+    assert len(read["variables"]) == len(data["variables"])
+    for readVariable, variable in zip(read["variables"], data["variables"]):
+        assert {key: value for key, value in readVariable.items() if key != "data"} == \
+               {key: value for key, value in variable.items() if key != "data"}
+        if variable["type"] == "spikes":
+            assert readVariable["data"] == variable["data"]
+        elif variable["type"] == "v":
+            np.testing.assert_array_equal(readVariable["data"], variable["data"])
+        else:
+            assert readVariable["data"]["timeStamp"] == variable["data"]["timeStamp"]
+            np.testing.assert_array_equal(readVariable["data"]["w"], variable["data"]["w"])
+
+
+def test_result_round_trip(tmp_path):
+    data = get_data()
+    fullPath, filename = tools.write_result(str(tmp_path) + "/", "result", data)
+    assert filename == "result" and fullPath.endswith(tools.RESULT_EXTENSION)
+    check_same_data(tools.read_result(fullPath), data)
+
+
+def test_result_selected_variables(tmp_path):
+    fullPath, _ = tools.write_result(str(tmp_path) + "/", "result", get_data())
+    read = tools.read_result(fullPath, [("spikes", "IL")])
+    assert [variable["popNameShort"] for variable in read["variables"]] == ["IL"]
+
+
+def test_txt_result_is_not_converted(tmp_path):
+    data = get_data()
+    txtData = dict(data, variables=[data["variables"][0]])
+    txtPath = str(tmp_path) + "/result.txt"
+    with open(txtPath, "w") as file:
+        file.write(str(txtData))
+    check_same_data(tools.read_result(txtPath), txtData)
+    assert os.listdir(str(tmp_path)) == ["result.txt"]
+    resultPath = tools.convert_txt_to_result(txtPath)
+    check_same_data(tools.read_result(resultPath), txtData)
+
+
+class VStream:
+    # Neo stream of membrane potentials (time stamp x neuron)
+    def __init__(self, values):
+        self.values = values
+
+    def as_array(self):
+        return np.array(self.values, dtype=float)
+
+
+def test_v_stream_nan_repair():
+    nan = float("nan")
+    vStream = VStream([[nan, -50.0], [-70.0, nan], [nan, -52.0], [-66.0, nan], [nan, nan]])
+    formatV = tools.format_neo_data("v", vStream)
+    assert formatV.shape == (2, 5)
+    np.testing.assert_array_equal(formatV[0], [-60.0, -70.0, -68.0, -66.0, -66.0])
+    np.testing.assert_array_equal(formatV[1], [-50.0, -51.0, -52.0, nan, nan])
+    np.testing.assert_array_equal(tools.format_neo_data("v", VStream([[-60.0, -61.0]])), [[-60.0], [-61.0]])
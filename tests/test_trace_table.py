@@ -0,0 +1,68 @@
+import os
+import pytest
+import tools
+import trace_table
+from spike_index import SpikeIndex
+
+
+DATA_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/data/4 - Combined operations test.txt"
+# Populations of the trace table -> (popNameShort of its spikes, sublabels)
+POPULATIONS = {"IN": ("IL", ["INcue", "INcont"]), "OUT": ("OL", ["OUTcue", "OUTcont"]), "DG": ("DGL", ["DG"]),
+               "CA3cue": ("CA3cueL", ["CA3cue"]), "CA3cont": ("CA3contL", ["CA3cont"]), "CA1": ("CA1L", ["CA1"])}
+
+
+@pytest.fixture
+def traceTableCache(monkeypatch):
+    monkeypatch.setattr(trace_table, "traceTableCache", {})
+
+
+def get_trace_table_inputs():
+    data = tools.read_result(DATA_PATH)
+    spikes = {variable["popNameShort"]: variable for variable in data["variables"] if variable["type"] == "spikes"}
+    spikesInfo = {population: {"spikeStream": spikes[popNameShort]["data"], "label": population, "sublabels": sublabels}
+                  for population, (popNameShort, sublabels) in POPULATIONS.items()}
+    timeStream = tools.generate_time_streams(data["simTime"], data["timeStep"], "ms")
+    return data, spikesInfo, timeStream
+
+
+def get_num_cue_binary_neuron(data):
+    return [variable["numNeurons"] for variable in data["variables"] if variable["popNameShort"] == "DGL"][0]
+
+
+def get_trace_table(allTimeStampInTrace, spikeIndex=None):
+    data, spikesInfo, timeStream = get_trace_table_inputs()
+    return trace_table.get_trace_table(spikesInfo, timeStream, get_num_cue_binary_neuron(data), data["cueSize"],
+                                       data["contSize"], data["endianness"], allTimeStampInTrace,
+                                       spikeIndex=spikeIndex)
+
+
+def test_trace_table_is_shared(traceTableCache):
+    table = get_trace_table(False)
+    # The same inputs (even with other spike index) give the same table, other inputs give other table
+    data, spikesInfo, timeStream = get_trace_table_inputs()
+    assert get_trace_table(False, SpikeIndex(spikesInfo, timeStream)) is table
+    assert get_trace_table(True) is not table
+    assert len(trace_table.traceTableCache) == 2
+
+
+def test_trace_table_cache_size(traceTableCache, monkeypatch):
+    monkeypatch.setattr(trace_table, "TRACE_TABLE_CACHE_SIZE", 1)
+    table = get_trace_table(False)
+    get_trace_table(True)
+    assert len(trace_table.traceTableCache) == 1 and get_trace_table(False) is not table
+
+
+def test_trace_table_rows(traceTableCache):
+    data, spikesInfo, timeStream = get_trace_table_inputs()
+    table = get_trace_table(False)
+    rows = list(table)
+    # Each iteration formats the same rows, and the operations begun are known after the first one
+    assert list(table) == rows and len(table) == len(rows)
+    assert table.beginingOperations and len(rows[0]) == trace_table.TRACE_TABLE_NUM_VALUES + 1
+    formatSpikeInfo = tools.get_format_spike_info(spikesInfo, timeStream, get_num_cue_binary_neuron(data),
+                                                  data["cueSize"], data["contSize"], data["endianness"], False, False,
+                                                  False)
+    assert [row[0] for row in rows] == list(formatSpikeInfo.keys())
+    # With all the time stamps, the rows with spikes are the same
+    allRows = list(get_trace_table(True))
+    assert len(allRows) == len(timeStream) and [row for row in allRows if row[0] in formatSpikeInfo] == rows
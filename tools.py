@@ -1,8 +1,18 @@
 
 import time
 import os
+import ast
 import numpy as np
 import json
+import hashlib
+import contextlib
+from spike_index import SpikeIndex
+
+try:
+    # Unix-only: the result cache is not locked in other systems
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 #####################################
@@ -37,7 +47,7 @@ def write_txt_with_stamp(basePath, baseFilename, data):
     # baseFilename_year_month_day_hour_min_seg.txt
     strDate = time.strftime("%Y_%m_%d__%H_%M_%S")
     filename = baseFilename + "_" + strDate
-    return write_file(basePath, filename, ".txt", data)
+    return write_file(basePath, filename, ".txt", to_builtin_types(data))
 
 
 def read_file(fullPath):
@@ -49,7 +59,7 @@ def read_file(fullPath):
     """
     try:
         file = open(fullPath, "r")
-        return eval(file.read())
+        return ast.literal_eval(file.read())
     except FileNotFoundError:
         return False
 
@@ -68,6 +78,220 @@ def read_json(fullPath):
         return False
 
 
+#####################################
+# Result bundle
+#####################################
+# Binary file with the data of a simulation: a metadata header followed by one typed array for each recorded variable
+#   * RESULT_MAGIC (8 bytes) + length of the header (uint64, little endian) + json header
+#   * Data section: each array aligned to RESULT_ALIGNMENT bytes, with its dtype, shape and offset (from the data
+#     section beginning) in the header
+# The arrays are memory-mapped when the file is read, so only the variables used are loaded
+RESULT_EXTENSION = ".res"
+RESULT_MAGIC = b"HIPPORES"
+RESULT_ALIGNMENT = 64
+
+
+def write_result(basePath, filename, data):
+    """
+    Write the data of a simulation (dataOut) into a binary result bundle
+
+    :param basePath: directory path where the file will be stored
+    :param filename: name of the file
+    :param data: data of the simulation -> metadata and "variables" (spikes, v and w variables)
+    :return: full path to the file created, name of the file created
+    """
+    header = {key: value for key, value in data.items() if key != "variables"}
+    header["variables"] = []
+    arrays = []
+    offset = 0
+    for variable in data["variables"]:
+        varHeader = {key: value for key, value in variable.items() if key != "data"}
+        varHeader["arrays"] = {}
+        for name, array in encode_variable(variable).items():
+            array = np.ascontiguousarray(array)
+            varHeader["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            arrays.append(array)
+            offset += -(-array.nbytes // RESULT_ALIGNMENT) * RESULT_ALIGNMENT
+        header["variables"].append(varHeader)
+
+    # The header is padded so the data section begins aligned
+    headerBytes = json.dumps(to_builtin_types(header), default=lambda value: value.item()).encode("utf-8")
+    headerBytes = headerBytes.ljust(get_result_data_begin(len(headerBytes)) - len(RESULT_MAGIC) - 8)
+
+    with open(basePath + filename + RESULT_EXTENSION, "wb") as file:
+        file.write(RESULT_MAGIC)
+        file.write(len(headerBytes).to_bytes(8, "little"))
+        file.write(headerBytes)
+        for array in arrays:
+            file.write(array.tobytes())
+            file.write(bytes(-array.nbytes % RESULT_ALIGNMENT))
+    return basePath + filename + RESULT_EXTENSION, filename
+
+
+def write_result_with_stamp(basePath, baseFilename, data):
+    """
+    Write the data of a simulation into a binary result bundle and add the current date and time to the name of the file
+
+    :param basePath: directory path where the file will be stored
+    :param baseFilename: base name of the file
+    :param data: data of the simulation -> metadata and "variables" (spikes, v and w variables)
+    :return: full path to the file created, name of the file created
+    """
+    # baseFilename_year_month_day_hour_min_seg.res (baseFilename_year_month_day_hour_min_seg_n.res if there is already a
+    #  file with that name: several simulations can end in the same second)
+    strDate = time.strftime("%Y_%m_%d__%H_%M_%S")
+    filename = baseFilename + "_" + strDate
+    numFile = 1
+    while os.path.exists(basePath + filename + RESULT_EXTENSION):
+        filename = baseFilename + "_" + strDate + "_" + str(numFile)
+        numFile += 1
+    return write_result(basePath, filename, data)
+
+
+def read_result(fullPath, variables=None):
+    """
+    Read a result bundle with the data of a simulation. The arrays of the variables are memory-mapped and only the
+    variables requested are decoded. Old txt data files are read in memory (nothing is written), or from the result
+    bundle next to them if it has been converted with convert_txt_to_result
+
+    :param fullPath: path + filename to the result bundle (or to an old txt data file)
+    :param variables: (optional) list of (type, popNameShort) of the variables to read, by default all of them
+    :return: data read from the file, with the same structure used to write it, or False if the file could not be
+        accessed
+    """
+    if os.path.splitext(fullPath)[1] == ".txt":
+        resultPath = os.path.splitext(fullPath)[0] + RESULT_EXTENSION
+        if not os.path.isfile(resultPath) or \
+                (os.path.isfile(fullPath) and os.path.getmtime(resultPath) < os.path.getmtime(fullPath)):
+            return read_txt_result(fullPath, variables)
+        fullPath = resultPath
+    try:
+        file = open(fullPath, "rb")
+    except FileNotFoundError:
+        return False
+    with file:
+        if file.read(len(RESULT_MAGIC)) != RESULT_MAGIC:
+            raise ValueError("The file " + fullPath + " is not a result bundle")
+        headerLength = int.from_bytes(file.read(8), "little")
+        data = json.loads(file.read(headerLength).decode("utf-8"))
+    dataBegin = get_result_data_begin(headerLength)
+
+    fileMap = np.memmap(fullPath, dtype=np.uint8, mode="r")
+    selectedVariables = []
+    for variable in data["variables"]:
+        if variables is not None and (variable["type"], variable["popNameShort"]) not in variables:
+            continue
+        arrays = {}
+        for name, arrayInfo in variable.pop("arrays").items():
+            dtype = np.dtype(arrayInfo["dtype"])
+            numBytes = int(np.prod(arrayInfo["shape"])) * dtype.itemsize
+            begin = dataBegin + arrayInfo["offset"]
+            arrays[name] = fileMap[begin:begin + numBytes].view(dtype).reshape(arrayInfo["shape"])
+        variable["data"] = decode_variable(variable["type"], arrays)
+        selectedVariables.append(variable)
+    data["variables"] = selectedVariables
+    return data
+
+
+def read_txt_result(fullPath, variables=None):
+    """
+    Read an old txt data file (python literal of the data of a simulation) with the same structure returned by
+    read_result, without converting it to a result bundle
+
+    :param fullPath: path + filename to the txt data file
+    :param variables: (optional) list of (type, popNameShort) of the variables to read, by default all of them
+    :return: data read from the file or False if the file could not be accessed
+    """
+    data = read_file(fullPath)
+    if not data:
+        return False
+    selectedVariables = []
+    for variable in data["variables"]:
+        if variables is not None and (variable["type"], variable["popNameShort"]) not in variables:
+            continue
+        arrays = {name: np.ascontiguousarray(array) for name, array in encode_variable(variable).items()}
+        variable["data"] = decode_variable(variable["type"], arrays)
+        selectedVariables.append(variable)
+    data["variables"] = selectedVariables
+    return data
+
+
+def get_result_data_begin(headerLength):
+    """
+    Get the position of the data section of a result bundle
+
+    :param headerLength: length of the json header in bytes
+    :return: offset of the data section from the file beginning
+    """
+    return -(-(len(RESULT_MAGIC) + 8 + headerLength) // RESULT_ALIGNMENT) * RESULT_ALIGNMENT
+
+
+def encode_variable(variable):
+    """
+    Get the typed arrays used to store a variable in a result bundle
+
+    :param variable: variable of the data of a simulation -> {"type", "data", ...}
+    :return: dict of arrays -> spikes: "offsets" and "values" (spike times of all neurons, one after another),
+        v: "v" (float32 matrix of neuron x time stamp), w: "timeStamp" and "w" (float32 array of time x src x dst)
+    """
+    if variable["type"] == "spikes":
+        spikeStreams = [np.asarray(neuron).ravel() for neuron in variable["data"]]
+        offsets = np.zeros(len(spikeStreams) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(neuron) for neuron in spikeStreams])
+        values = np.concatenate(spikeStreams) if spikeStreams else np.zeros(0)
+        if values.dtype == object or len(values) == 0:
+            values = values.astype(float)
+        return {"offsets": offsets, "values": values}
+    elif variable["type"] == "v":
+        return {"v": np.asarray(variable["data"], dtype=np.float32).reshape(len(variable["data"]), -1)}
+    elif variable["type"] == "w":
+        timeStamps, w = get_weight_history(variable["data"])
+        return {"timeStamp": timeStamps, "w": w}
+    raise ValueError("Type of variable not supported. Supported types: spikes, v and w")
+
+
+def decode_variable(type, arrays):
+    """
+    Get the data of a variable from the typed arrays stored in a result bundle
+
+    :param type: type of the variable ("spikes", "v" and "w" supported)
+    :param arrays: dict of arrays of the variable (see encode_variable)
+    :return: data of the variable -> spikes: list of spike times of each neuron, v: matrix of neuron x time stamp
+        (memory-mapped), w: {"timeStamp", "w"} (w memory-mapped)
+    """
+    if type == "spikes":
+        values = arrays["values"]
+        offsets = arrays["offsets"]
+        return [values[offsets[index]:offsets[index + 1]].tolist() for index in range(len(offsets) - 1)]
+    elif type == "v":
+        return arrays["v"]
+    elif type == "w":
+        return {"timeStamp": arrays["timeStamp"].tolist(), "w": arrays["w"]}
+    raise ValueError("Type of variable not supported. Supported types: spikes, v and w")
+
+
+def convert_txt_to_result(fullPath):
+    """
+    Convert an old txt data file (python literal of the data of a simulation) to a result bundle stored in the same
+    folder (read_result reads it instead of the txt file from then on). If the result bundle already exists and is newer
+    than the txt file, it is reused
+
+    :param fullPath: path + filename to the txt data file
+    :return: full path to the result bundle or False if the txt file could not be accessed
+    """
+    basePath, filename = os.path.split(os.path.splitext(fullPath)[0])
+    basePath = basePath + "/" if basePath else ""
+    resultPath = basePath + filename + RESULT_EXTENSION
+    if not os.path.isfile(fullPath):
+        return resultPath if os.path.isfile(resultPath) else False
+    if os.path.isfile(resultPath) and os.path.getmtime(resultPath) >= os.path.getmtime(fullPath):
+        return resultPath
+    data = read_file(fullPath)
+    if not data:
+        return False
+    return write_result(basePath, filename, data)[0]
+
+
 def check_and_create_folder(path):
     """
     Check if a folder exist and, if it does not exist, it creates it
@@ -86,6 +310,143 @@ def check_and_create_folder(path):
         return path
 
 
+#####################################
+# Result cache
+#####################################
+# The result bundles of the simulations are indexed by a hash of all the parameters that affect the result (network,
+#  memory and simulation parameters and input spikes), so a simulation already executed is not executed again. The index
+#  (RESULT_CACHE_INDEX in the data folder) stores for each key the result bundle, its size and its last use
+RESULT_CACHE_INDEX = "result_cache.json"
+# Sidecar file locked during each read-modify-write of the index of the result cache
+RESULT_CACHE_LOCK = "result_cache.lock"
+
+
+def get_result_cache_key(parameters, inputSpikes):
+    """
+    Get the key of a simulation in the result cache
+
+    :param parameters: dict with all the parameters that affect the result of the simulation (json serializable)
+    :param inputSpikes: list of spike times of each input neuron
+    :return: key (hex digest)
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(to_builtin_types(parameters), sort_keys=True).encode("utf-8"))
+    for neuronSpikes in inputSpikes:
+        neuronSpikes = np.asarray(neuronSpikes, dtype=np.float64).ravel()
+        digest.update(len(neuronSpikes).to_bytes(8, "little"))
+        digest.update(neuronSpikes.tobytes())
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def lock_result_cache(basePath):
+    """
+    Lock the result cache of a folder (exclusive lock of a sidecar file) so the read-modify-write of its index is not
+    mixed with the one of other processes. Without fcntl (not Unix) nothing is locked
+
+    :param basePath: directory path where the result bundles are stored
+    :return: context manager that holds the lock
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(basePath + RESULT_CACHE_LOCK, "a") as lockFile:
+        fcntl.flock(lockFile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+
+def read_result_cache_index(basePath):
+    """
+    Read the index of the result cache of a folder
+
+    :param basePath: directory path where the result bundles are stored
+    :return: dict of key -> {"fullPath", "filename", "size", "lastUse"} (empty if there is no valid index)
+    """
+    try:
+        with open(basePath + RESULT_CACHE_INDEX, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_result_cache_index(basePath, index):
+    """
+    Write the index of the result cache of a folder (replacing the old one in a single step)
+
+    :param basePath: directory path where the result bundles are stored
+    :param index: dict of key -> {"fullPath", "filename", "size", "lastUse"}
+    :return:
+    """
+    tmpPath = basePath + RESULT_CACHE_INDEX + "." + str(os.getpid()) + ".tmp"
+    with open(tmpPath, "w") as file:
+        json.dump(index, file, indent=1)
+    os.replace(tmpPath, basePath + RESULT_CACHE_INDEX)
+
+
+def get_cached_result(basePath, key):
+    """
+    Search a simulation in the result cache of a folder. Entries whose result bundle has been removed or modified are
+    discarded
+
+    :param basePath: directory path where the result bundles are stored
+    :param key: key of the simulation (see get_result_cache_key)
+    :return: full path to the result bundle, name of the file or None if the simulation is not in the cache
+    """
+    with lock_result_cache(basePath):
+        index = read_result_cache_index(basePath)
+        if key not in index:
+            return None
+        entry = index[key]
+        if os.path.isfile(entry["fullPath"]) and os.path.getsize(entry["fullPath"]) == entry["size"]:
+            entry["lastUse"] = time.time()
+            write_result_cache_index(basePath, index)
+            return entry["fullPath"], entry["filename"]
+        del index[key]
+        write_result_cache_index(basePath, index)
+        return None
+
+
+def add_cached_result(basePath, key, fullPath, filename, maxSize):
+    """
+    Add a result bundle to the result cache of a folder. The result bundle already cached with the same key (if any) is
+    deleted. If the result bundles of the cache take more than maxSize bytes, the least recently used ones (except the
+    new one) are deleted
+
+    :param basePath: directory path where the result bundles are stored
+    :param key: key of the simulation (see get_result_cache_key)
+    :param fullPath: full path to the result bundle
+    :param filename: name of the result bundle
+    :param maxSize: max size in bytes of all the result bundles of the cache
+    :return: list of the full paths of the result bundles deleted
+    """
+    with lock_result_cache(basePath):
+        index = read_result_cache_index(basePath)
+        removedPaths = []
+        if key in index and os.path.abspath(index[key]["fullPath"]) != os.path.abspath(fullPath):
+            replacedPath = index[key]["fullPath"]
+            if os.path.isfile(replacedPath):
+                os.remove(replacedPath)
+            removedPaths.append(replacedPath)
+        index[key] = {"fullPath": fullPath, "filename": filename, "size": os.path.getsize(fullPath),
+                      "lastUse": time.time()}
+        totalSize = sum(entry["size"] for entry in index.values())
+        for oldKey in sorted(index, key=lambda entryKey: index[entryKey]["lastUse"]):
+            if totalSize <= maxSize:
+                break
+            if oldKey == key:
+                continue
+            entry = index.pop(oldKey)
+            totalSize -= entry["size"]
+            if os.path.isfile(entry["fullPath"]):
+                os.remove(entry["fullPath"])
+            removedPaths.append(entry["fullPath"])
+        write_result_cache_index(basePath, index)
+        return removedPaths
+
+
 #####################################
 # Data format
 #####################################
@@ -117,29 +478,22 @@ def format_v_stream(vStream):
     Change the format of the neo data streams of membrane potentials and correct nan values
 
     :param vStream: neo streams of membrane potentials
-    :return: v stream formated
-    """
-    formatV = []
-    # Obtain the matrix of values ->
-    #   each element represents a time_stamp and the content of that element the value for each neuron
-    rawStream = vStream.as_array().tolist()
-    # Extract the nnumber of neuron on each time stamp
-    numNeurons = len(rawStream[0])
-    # Reformat it so each element is a neuron and the content is the values for each time stamp
-    for neuron in range(0, numNeurons):
-        formatV.append([item[neuron] for item in rawStream])
+    :return: v stream formated -> array of neuron x time stamp
+    """
+    # Obtain the matrix of values (each row a time stamp, each column a neuron) and see it as each row is a neuron and
+    #  each column a time stamp (view, no copy)
+    formatV = np.asarray(vStream.as_array(), dtype=float).T
+    isNan = np.isnan(formatV)
+    if not isNan.any():
+        return formatV
     # Change nan values for -60 if it is the first value in the stream, the value of the previous instant if it is the
-    #  last instant and the average of the instants before and after in another case
-    for indexNeuron, neuron in enumerate(formatV):
-        for indexTime, timeStamp in enumerate(neuron):
-            if str(formatV[indexNeuron][indexTime]) == "nan":
-                if indexTime == 0:
-                    formatV[indexNeuron][indexTime] = -60.0
-                elif indexTime >= len(neuron)-1:
-                    formatV[indexNeuron][indexTime] = formatV[indexNeuron][indexTime-1]
-                else:
-                    formatV[indexNeuron][indexTime] = (formatV[indexNeuron][indexTime-1] +
-                                                      formatV[indexNeuron][indexTime+1])/2
+    #  last instant and the average of the instants before and after in another case (nan if any of them is nan, except
+    #  the first instant, which has already been corrected)
+    formatV[:, 0][isNan[:, 0]] = -60.0
+    if formatV.shape[1] > 2:
+        formatV[:, 1:-1] = np.where(isNan[:, 1:-1], (formatV[:, :-2] + formatV[:, 2:]) / 2, formatV[:, 1:-1])
+    if formatV.shape[1] > 1:
+        formatV[:, -1] = np.where(isNan[:, -1], formatV[:, -2], formatV[:, -1])
     return formatV
 
 
@@ -158,29 +512,162 @@ def format_spike_stream(spikesStream):
 
 def format_weight_stream(weightsStream, timeStreamParam):
     """
-    Change the format of the streams of weights recorded
+    Change the format of the streams of weights recorded to a dense weight history
+
+    :param weightsStream: weight stream, one snapshot (matrix src neuron x dst neuron, PyNN format='array') for each
+        time stamp recorded
+    :param timeStreamParam: temporal parameters of the simulation -> {"simTime", "timeStep"} and, if the weights were
+        not recorded in each time step, the time stamp of each snapshot -> "timeStamps"
+    :return: formated weight stream -> {"timeStamp": time stamp of each snapshot, "w": float32 array of
+        time x src neuron x dst neuron}
+    """
+    # Generate time stream in ms
+    if "timeStamps" in timeStreamParam:
+        timeStream = list(timeStreamParam["timeStamps"])
+    else:
+        timeStream = generate_time_streams(timeStreamParam["simTime"], timeStreamParam["timeStep"], "ms", endPlus=True)
+
+    # Stack all the snapshots in a single buffer with fixed src/dst axes
+    w = np.asarray(weightsStream, dtype=np.float32)
+    return {"timeStamp": timeStream[:len(w)], "w": w}
+
 
-    :param weightsStream: weight stream
-    :param timeStreamParam: temporal parameters of the simulation -> {"simTime", "timeStep"}
-    :return: formated weight stream -> {"srcNeuronId", "dstNeuronId", "w", "timeStamp"}
+def get_weight_history(weightData):
     """
-    srcNeuronId, dstNeuronId, w, timeStampStream = [], [], [], []
+    Get the dense weight history of a weight variable of the data recorded, also from data files with the old flat
+    format {"srcNeuronId", "dstNeuronId", "w", "timeStamp"}
 
-    # Generate time stream in ms
-    timeStream = generate_time_streams(timeStreamParam["simTime"], timeStreamParam["timeStep"], "ms", endPlus=True)
+    :param weightData: "data" field of a weight variable
+    :return: time stamps of the snapshots (float array) and weights (float32 array of time x src neuron x dst neuron)
+    """
+    if "srcNeuronId" in weightData:
+        timeStamps, timeIndexes = np.unique(np.asarray(weightData["timeStamp"], dtype=float), return_inverse=True)
+        srcIds = np.asarray(weightData["srcNeuronId"], dtype=int)
+        dstIds = np.asarray(weightData["dstNeuronId"], dtype=int)
+        w = np.zeros((len(timeStamps), srcIds.max() + 1, dstIds.max() + 1), dtype=np.float32)
+        w[timeIndexes, srcIds, dstIds] = weightData["w"]
+        return timeStamps, w
+    return np.asarray(weightData["timeStamp"], dtype=float), np.asarray(weightData["w"], dtype=np.float32)
 
-    # For each time stamp:
-    for indexStep, step in enumerate(weightsStream):
-        # For each synapse:
-        for indexSyn, synapse in enumerate(step):
-            srcNeuronId.append(synapse[0])
-            dstNeuronId.append(synapse[1])
-            w.append(synapse[2])
-            timeStampStream.append(timeStream[indexStep])
-    return {"srcNeuronId": srcNeuronId, "dstNeuronId": dstNeuronId, "w": w, "timeStamp": timeStampStream}
 
+def to_builtin_types(data):
+    """
+    Convert the numpy arrays inside a data structure to python lists, so it can be stored as text
 
-def get_spikes_per_timestamp(spikesInfo, timeStream, numCueBinaryNeuron, numContNeuron, endianness, isSave, fileSavePath="", fileSaveName=""):
+    :param data: data structure (dicts, lists and numpy arrays)
+    :return: the same data structure with lists instead of numpy arrays
+    """
+    if isinstance(data, np.ndarray):
+        return data.tolist()
+    elif isinstance(data, dict):
+        return {key: to_builtin_types(value) for key, value in data.items()}
+    elif isinstance(data, list):
+        return [to_builtin_types(value) for value in data]
+    return data
+
+
+def get_input_spike_order(numCueBinaryNeuron, numContNeuron, endianness):
+    """
+    Get the position of each neuron of the IN/OUT populations in its value (cue neurons first, then content neurons)
+    according to the endianness of the memory
+
+    @param numCueBinaryNeuron: number of neurons used to address in the input array
+    @param numContNeuron: number of neurons used to store content of memories
+    @param endianness: type of codification of the information stored in memory: "little endian" or "big_endian"
+    @return: list with the position of each neuron
+    """
+    if endianness == "little_endian":
+        return np.flip(range(numCueBinaryNeuron)).tolist() + list(range(numContNeuron))
+    elif endianness == "big_endian":
+        return list(range(numCueBinaryNeuron)) + list(range(numContNeuron))
+    raise ValueError("Endianness code not supported. Supported: little_endian and big_endian")
+
+
+def get_spikes_at_tick(spikesInfo, spikeIndex, tick, numCueBinaryNeuron, indexInputSpike):
+    """
+    Get the neurons of each population that fired in a time stamp (see get_spikes_per_timestamp)
+
+    @param spikesInfo: dictionary with as keys as population which values are the spike stream and label of that population
+    @param spikeIndex: SpikeIndex of the populations of spikesInfo
+    @param tick: tick of the time stamp (index in the time stream)
+    @param numCueBinaryNeuron: number of neurons used to address in the input array
+    @param indexInputSpike: position of each neuron of the IN/OUT populations (see get_input_spike_order)
+    @return: {"hasSpike":hasSpike, "population_i": spikesOfPopiInCurrStamp, ...}
+    """
+    hasSpike = False
+    spikesCurrTimeStamp = {}
+    # For each population of neuron:
+    for population, spikesInfoSinglePop in spikesInfo.items():
+        label = spikesInfoSinglePop["label"]
+        spikesCurrTimeStampPopulation_i = []
+        spikesCurrTimeStampPopulation_j = [] # Only for IN or OUT population case
+        # For each neuron of the current population that has fired in the current time stamp
+        for indexNeuron in spikeIndex.neurons_at(population, tick).tolist():
+            # Check DG population special case
+            if label == "DG" and indexNeuron == 0:
+                continue
+            if label == "IN" or label == "OUT" or label == "CA1":
+                # Special case for IN and OUT population: separate IN/OUT cue (True) and IN/OUT cont (False)
+                if indexNeuron < numCueBinaryNeuron:
+                    spikesCurrTimeStampPopulation_i.append(indexInputSpike[indexNeuron])
+                else:
+                    spikesCurrTimeStampPopulation_j.append(indexInputSpike[indexNeuron])
+            else:
+                # Base case
+                spikesCurrTimeStampPopulation_i.append(indexNeuron)
+        # Add to the current time stamp the spikes of the current population
+        if label == "IN" or label == "OUT":
+            spikesCurrTimeStamp[spikesInfoSinglePop["sublabels"][0]] = spikesCurrTimeStampPopulation_i
+            spikesCurrTimeStamp[spikesInfoSinglePop["sublabels"][1]] = spikesCurrTimeStampPopulation_j
+        else:
+            spikesCurrTimeStamp[label] = spikesCurrTimeStampPopulation_i
+        # Check if there are spikes in the current time stamp and current population
+        hasSpike = hasSpike or spikesCurrTimeStampPopulation_i
+        if label == "IN" or label == "OUT":
+            hasSpike = hasSpike or spikesCurrTimeStampPopulation_j
+    # Add the emptiness of information of the current timestamp
+    spikesCurrTimeStamp["hasSpike"] = hasSpike
+    return spikesCurrTimeStamp
+
+
+def format_spikes_at_timestamp(spikesOrderedInfo, indexInputSpike):
+    """
+    Format the spikes of a time stamp to a more readable style (see get_format_spike_info)
+
+    @param spikesOrderedInfo: spikes of the time stamp (see get_spikes_at_tick)
+    @param indexInputSpike: position of each neuron of the IN/OUT populations (see get_input_spike_order)
+    @return: if there is any spike in the time stamp and {"population_i": spikesOfPopiInCurrStampFormatted, ...}
+    """
+    hasSpike = False
+    # For each population in the current time stamp:
+    spikesCurrTimeStamp = {}
+    for label, spikeStream in spikesOrderedInfo.items():
+        formatSpikes = None
+        if label == "hasSpike":
+            # spikeStream denote if there is any spike in the current time stamp
+            hasSpike = spikeStream
+            continue
+        elif (label == "INcue" or label == "CA1" or label == "OUTcue") and spikeStream:
+            # INcue, CA1 and OUTcue: from binary to decimal (if it is not empty)
+            formatSpikes = 0
+            for spike in spikeStream:
+                formatSpikes = formatSpikes + pow(2, indexInputSpike[spike])
+        elif label == "DG" and spikeStream:
+            # DG: substract 1 to work in 1-n interval, marking which position is set to 1
+            formatSpikes = spikeStream[0] - 1
+        elif label == "CA3cue" and spikeStream:
+            # CA3cue: add 1 to use cues from 1 to n, and not begin in 0
+            formatSpikes = spikeStream[0] + 1
+        elif spikeStream:
+            # Base format information: dont do anything, pass as is
+            formatSpikes = spikeStream
+        else:
+            continue
+        spikesCurrTimeStamp[label] = formatSpikes
+    return bool(hasSpike), spikesCurrTimeStamp
+
+
+def get_spikes_per_timestamp(spikesInfo, timeStream, numCueBinaryNeuron, numContNeuron, endianness, isSave, fileSavePath="", fileSaveName="", spikeIndex=None):
     """
     Order distint streams of spikes by the time stamp when it were fired
 
@@ -193,59 +680,22 @@ def get_spikes_per_timestamp(spikesInfo, timeStream, numCueBinaryNeuron, numCont
     @param isSave: bool, if save the information in a txt file
     @param fileSavePath: (optional) path where to store the txt file
     @param fileSaveName: (optional) base name of the output txt file
+    @param spikeIndex: (optional) SpikeIndex of the populations of spikesInfo over timeStream, created if not given
     @return: the dictionary where the spikes are timestamp-ordered: {stamp: spikesCurrTimeStamp}
         spikesCurrTimeStamp is: {"hasSpike":hasSpike, "population_i": spikesOfPopiInCurrStamp, ...}
     """
 
     spikesOrderedByTimeStamp = {}
+    if spikeIndex is None:
+        spikeIndex = SpikeIndex(spikesInfo, timeStream)
 
     # Crete a list or reorder indeces for the spikes of INPUT neurons to support endianness codifications
-    if endianness == "little_endian":
-        indexInputSpike = np.flip(range(numCueBinaryNeuron)).tolist() + list(range(numContNeuron))
-    elif endianness == "big_endian":
-        indexInputSpike = list(range(numCueBinaryNeuron)) + list(range(numContNeuron))
-    else:
-        raise ValueError("Endianness code not supported. Supported: little_endian and big_endian")
-
-    # Check what neurons had fired in each time stamp to store them ordered in the dictionary
-    for stamp in timeStream:
-        hasSpike = False
-        spikesCurrTimeStamp = {}
-        # For each population of neuron:
-        for spikesInfoSinglePop in spikesInfo.values():
-            label = spikesInfoSinglePop["label"]
-            spikesCurrTimeStampPopulation_i = []
-            spikesCurrTimeStampPopulation_j = [] # Only for IN or OUT population case
-            # For each neuron of the current population
-            for indexNeuron, spikeStream in enumerate(spikesInfoSinglePop["spikeStream"]):
-                # Check DG population special case
-                if label == "DG" and indexNeuron == 0:
-                    continue
-                # Only if the current neuron has fired in the current time stamp, it is added
-                if stamp in spikeStream:
-                    if label == "IN" or label == "OUT" or label == "CA1":
-                        # Special case for IN and OUT population: separate IN/OUT cue (True) and IN/OUT cont (False)
-                        if indexNeuron < numCueBinaryNeuron:
-                            spikesCurrTimeStampPopulation_i.append(indexInputSpike[indexNeuron])
-                        else:
-                            spikesCurrTimeStampPopulation_j.append(indexInputSpike[indexNeuron])
-                    else:
-                        # Base case
-                        spikesCurrTimeStampPopulation_i.append(indexNeuron)
-            # Add to the current time stamp the spikes of the current population
-            if label == "IN" or label == "OUT":
-                spikesCurrTimeStamp[spikesInfoSinglePop["sublabels"][0]] = spikesCurrTimeStampPopulation_i
-                spikesCurrTimeStamp[spikesInfoSinglePop["sublabels"][1]] = spikesCurrTimeStampPopulation_j
-            else:
-                spikesCurrTimeStamp[label] = spikesCurrTimeStampPopulation_i
-            # Check if there are spikes in the current time stamp and current population
-            hasSpike = hasSpike or spikesCurrTimeStampPopulation_i
-            if label == "IN" or label == "OUT":
-                hasSpike = hasSpike or spikesCurrTimeStampPopulation_j
-        # Add the emptiness of information of the current timestamp
-        spikesCurrTimeStamp["hasSpike"] = hasSpike
-        # Store all the information using time stamp as a key for the dictionary
-        spikesOrderedByTimeStamp.update({stamp: spikesCurrTimeStamp})
+    indexInputSpike = get_input_spike_order(numCueBinaryNeuron, numContNeuron, endianness)
+
+    # Take the neurons that had fired in each time stamp from the index to store them ordered in the dictionary
+    for tick, stamp in enumerate(timeStream):
+        spikesOrderedByTimeStamp.update({stamp: get_spikes_at_tick(spikesInfo, spikeIndex, tick, numCueBinaryNeuron,
+                                                                   indexInputSpike)})
 
     # Store the data if applicable
     if isSave:
@@ -255,7 +705,8 @@ def get_spikes_per_timestamp(spikesInfo, timeStream, numCueBinaryNeuron, numCont
 
 
 def get_format_spike_info(spikesInfo, timeStream, numCueBinaryNeuron, numContOneHotNeuron, numContNeuron,
-                          endianness, iSMetaDataSave, isSave, allTimeStampInTrace, fileSavePath="", fileSaveName=""):
+                          endianness, iSMetaDataSave, isSave, allTimeStampInTrace, fileSavePath="", fileSaveName="",
+                          spikeIndex=None):
     """
     Format all the spikes information along the network to create a readable data structure where the spikes are
     ordered by time stamp
@@ -272,6 +723,7 @@ def get_format_spike_info(spikesInfo, timeStream, numCueBinaryNeuron, numContOne
     @param allTimeStampInTrace: if represent all time stamp in trace files or only time stamps where the network is spiking
     @param fileSavePath: (optional) path where to store the txt file
     @param fileSaveName: (optional) base name of the output txt file
+    @param spikeIndex: (optional) SpikeIndex of the populations of spikesInfo over timeStream, created if not given
     @return: the dictionary where the spikes are timestamp-ordered and formatted: {stamp: spikesCurrTimeStamp}
         spikesCurrTimeStamp is: {"population_i": spikesOfPopiInCurrStampFormatted, ...}
     """
@@ -279,44 +731,16 @@ def get_format_spike_info(spikesInfo, timeStream, numCueBinaryNeuron, numContOne
 
     # Get the spikes ordered by time stamp when they were fired
     spikesOrderedByTimeStamp = get_spikes_per_timestamp(spikesInfo, timeStream, numCueBinaryNeuron, numContNeuron, endianness,
-                                                        iSMetaDataSave, fileSavePath=fileSavePath, fileSaveName=fileSaveName)
+                                                        iSMetaDataSave, fileSavePath=fileSavePath, fileSaveName=fileSaveName,
+                                                        spikeIndex=spikeIndex)
 
-    # Crete a list or reorder indeces for the spikes of INPUT neurons to support endianness codifications
-    if endianness == "little_endian":
-        indexInputSpike = np.flip(range(numCueBinaryNeuron)).tolist()
-    elif endianness == "big_endian":
-        indexInputSpike = range(numCueBinaryNeuron)
-    else:
-        raise ValueError("Endianness code not supported. Supported: little_endian and big_endian")
+    # Crete a list or reorder indeces for the spikes of INPUT neurons to support endianness codifications (the
+    #  formatted values only use the positions of the cue neurons)
+    indexInputSpike = get_input_spike_order(numCueBinaryNeuron, 0, endianness)
 
     # Take each time stamp and format the spike information to a more readable one
     for stamp, spikesOrderedInfo in spikesOrderedByTimeStamp.items():
-        hasSpike = False
-        # For each population in the current time stamp:
-        spikesCurrTimeStamp = {}
-        for label, spikeStream in spikesOrderedInfo.items():
-            formatSpikes = None
-            if label == "hasSpike":
-                # spikeStream denote if there is any spike in the current time stamp
-                hasSpike = spikeStream
-                continue
-            elif (label == "INcue" or label == "CA1" or label == "OUTcue") and spikeStream:
-                # INcue, CA1 and OUTcue: from binary to decimal (if it is not empty)
-                formatSpikes = 0
-                for spike in spikeStream:
-                    formatSpikes = formatSpikes + pow(2, indexInputSpike[spike])
-            elif label == "DG" and spikeStream:
-                # DG: substract 1 to work in 1-n interval, marking which position is set to 1
-                formatSpikes = spikeStream[0] - 1
-            elif label == "CA3cue" and spikeStream:
-                # CA3cue: add 1 to use cues from 1 to n, and not begin in 0
-                formatSpikes = spikeStream[0] + 1
-            elif spikeStream:
-                # Base format information: dont do anything, pass as is
-                formatSpikes = spikeStream
-            else:
-                continue
-            spikesCurrTimeStamp[label] = formatSpikes
+        hasSpike, spikesCurrTimeStamp = format_spikes_at_timestamp(spikesOrderedInfo, indexInputSpike)
         # Only take time stamp if there are spikes
         if allTimeStampInTrace or hasSpike:
             spikesOrderedByTimeStampFormatted.update({stamp: spikesCurrTimeStamp})
@@ -426,6 +850,151 @@ def get_string_format_spike_info_each_timestamp(spikes, numCueOneHotNeuron, numC
     return [inCue, inContBin, dgOneHot, ca3Cue, ca3ContBin, ca1bin, outCue, outContBin, operationNameBegin, operationNameEnd]
 
 
+#####################################
+# Weight recording
+#####################################
+
+def get_operation_begin_times(inputSpikes, numCueBinaryNeuron, timeStep):
+    """
+    Get the time stamps where an operation begins in the input of the memory: the first time stamp of each group of
+    consecutive time stamps with spikes in the cue neurons
+
+    :param inputSpikes: spike times of the input population (cue neurons first)
+    :param numCueBinaryNeuron: number of neurons used to address in the input array
+    :param timeStep: time step of the simulation in ms
+    :return: sorted list with the time stamps (ms) where each operation begins
+    """
+    cueTimes = sorted(set(float(spike) for neuron in inputSpikes[:numCueBinaryNeuron] for spike in neuron))
+    return [stamp for index, stamp in enumerate(cueTimes) if index == 0 or stamp - cueTimes[index - 1] > timeStep]
+
+
+def get_weight_record_times(policy, simTime, timeStep, inputSpikes, numCueBinaryNeuron, period=1, cueLatencies=(0,),
+                            contLatencies=()):
+    """
+    Get the time stamps where the weights have to be recorded according to a recording policy. The time stamp 0 (initial
+    weights) and simTime (final weights) are always included
+
+    :param policy: recording policy:
+        + "every": every period ms
+        + "boundaries": at the beginning of each operation of the input (weights before the operation)
+        + "change": one time step after each time stamp where a synapse can change, that is where a CA3cue (presynaptic)
+          or a CA3cont (postsynaptic) neuron can fire: the spikes of the cue neurons delayed by each of cueLatencies and
+          the spikes of the content neurons delayed by each of contLatencies. The snapshots without changes must be
+          discarded with remove_unchanged_weights
+    :param simTime: duration of the simulation in ms
+    :param timeStep: time step of the simulation in ms
+    :param inputSpikes: spike times of the input population (cue neurons first, then content neurons)
+    :param numCueBinaryNeuron: number of neurons used to address in the input array
+    :param period: (optional) period in ms of the "every" policy
+    :param cueLatencies: (optional) times in ms from a cue spike in the input to the spikes it can cause in the neurons
+        of the STDP synapses
+    :param contLatencies: (optional) times in ms from a content spike in the input to the spikes it can cause in the
+        neurons of the STDP synapses
+    :return: sorted list of time stamps (ms)
+    """
+    if policy == "every":
+        recordTimes = generate_sequence(0, simTime, period, 1)
+    elif policy == "boundaries":
+        recordTimes = get_operation_begin_times(inputSpikes, numCueBinaryNeuron, timeStep)
+    elif policy == "change":
+        cueTimes = set(float(spike) for neuron in inputSpikes[:numCueBinaryNeuron] for spike in neuron)
+        contTimes = set(float(spike) for neuron in inputSpikes[numCueBinaryNeuron:] for spike in neuron)
+        recordTimes = [stamp + latency + timeStep for stamp in cueTimes for latency in cueLatencies] + \
+                      [stamp + latency + timeStep for stamp in contTimes for latency in contLatencies]
+    else:
+        raise ValueError("Weight recording policy not supported. Supported policies: every, boundaries and change")
+    return sorted(set([0.0, float(simTime)] + [float(stamp) for stamp in recordTimes if 0 < stamp < simTime]))
+
+
+def remove_unchanged_weights(weightsStream, timeStamps):
+    """
+    Remove the snapshots of weights that are equal to the previous one (the first and last snapshots are kept)
+
+    :param weightsStream: weights of each snapshot (array of time x src neuron x dst neuron)
+    :param timeStamps: time stamp of each snapshot
+    :return: the snapshots and time stamps where the weights changed
+    """
+    weightsStream = np.asarray(weightsStream)
+    isKept = np.ones(len(weightsStream), dtype=bool)
+    isKept[1:-1] = np.any(weightsStream[1:-1] != weightsStream[:-2], axis=(1, 2))
+    return weightsStream[isKept], [stamp for stamp, kept in zip(timeStamps, isKept) if kept]
+
+
+#####################################
+# Recall evaluation
+#####################################
+def get_memory_operations(inputSpikes, numCueBinaryNeuron, timeStep, simTime):
+    """
+    Get the operations of the input of the memory: each one begins with the spikes of the cue neurons and it is a write
+    operation if there are spikes in the content neurons before the next operation, or a read operation in other case
+
+    :param inputSpikes: spike times of the input population (cue neurons first)
+    :param numCueBinaryNeuron: number of neurons used to address in the input array
+    :param timeStep: time step of the simulation in ms
+    :param simTime: duration of the simulation in ms
+    :return: list of operations -> {"type" ("write" or "read"), "begin", "end" (begin of the next operation or simTime),
+        "cue" (indexes of the input neurons of the cue with spikes), "cont" (indexes of the input neurons of the content
+        with spikes)}
+    """
+    beginTimes = get_operation_begin_times(inputSpikes, numCueBinaryNeuron, timeStep)
+    endTimes = beginTimes[1:] + [float(simTime)]
+    spikeTimes = [np.asarray(neuronSpikes, dtype=float).ravel() for neuronSpikes in inputSpikes]
+    operations = []
+    for begin, end in zip(beginTimes, endTimes):
+        cue = tuple(index for index in range(numCueBinaryNeuron) if np.any(spikeTimes[index] == begin))
+        cont = tuple(index for index in range(numCueBinaryNeuron, len(spikeTimes))
+                     if np.any((spikeTimes[index] >= begin) & (spikeTimes[index] < end)))
+        operations.append({"type": "write" if cont else "read", "begin": begin, "end": end, "cue": cue, "cont": cont})
+    return operations
+
+
+def get_recall_score(inputSpikes, outputSpikes, numCueBinaryNeuron, timeStep, simTime, minLatency):
+    """
+    Evaluate the read operations of a simulation: a read is correct if the output shows the cue read and the content of
+    the last write operation with the same cue (nothing if it has not been written). The output of each operation are
+    the spikes of the output population from minLatency after its beginning to minLatency after the next operation
+
+    :param inputSpikes: spike times of the input population (cue neurons first)
+    :param outputSpikes: spike times of the output population (same neurons as the input population)
+    :param numCueBinaryNeuron: number of neurons used to address in the input array
+    :param timeStep: time step of the simulation in ms
+    :param simTime: duration of the simulation in ms
+    :param minLatency: min time in ms from an input spike to the output spikes it causes
+    :return: dict -> "numReads", "numCorrect", "accuracy" (numCorrect/numReads, 1 if there are no reads), "bitErrors"
+        (output bits of the content that differ from the expected ones in all the reads), "meanLatency" and
+        "maxLatency" (time in ms from the beginning of the read to its last output spike, None if no read has output)
+    """
+    outputTimes = [np.asarray(neuronSpikes, dtype=float).ravel() for neuronSpikes in outputSpikes]
+    memory = {}
+    numReads = 0
+    numCorrect = 0
+    bitErrors = 0
+    latencies = []
+    for operation in get_memory_operations(inputSpikes, numCueBinaryNeuron, timeStep, simTime):
+        if operation["type"] == "write":
+            memory[operation["cue"]] = set(operation["cont"])
+            continue
+        windowBegin, windowEnd = operation["begin"] + minLatency, operation["end"] + minLatency
+        outputCue = set()
+        outputCont = set()
+        lastSpike = None
+        for index, neuronSpikes in enumerate(outputTimes):
+            windowSpikes = neuronSpikes[(neuronSpikes >= windowBegin) & (neuronSpikes < windowEnd)]
+            if len(windowSpikes) == 0:
+                continue
+            (outputCue if index < numCueBinaryNeuron else outputCont).add(index)
+            lastSpike = windowSpikes.max() if lastSpike is None else max(lastSpike, windowSpikes.max())
+        expectedCont = memory.get(operation["cue"], set())
+        numReads += 1
+        numCorrect += outputCue == set(operation["cue"]) and outputCont == expectedCont
+        bitErrors += len(outputCont ^ expectedCont)
+        if lastSpike is not None:
+            latencies.append(float(lastSpike - operation["begin"]))
+    return {"numReads": numReads, "numCorrect": numCorrect, "accuracy": numCorrect / numReads if numReads else 1.0,
+            "bitErrors": bitErrors, "meanLatency": float(np.mean(latencies)) if latencies else None,
+            "maxLatency": max(latencies) if latencies else None}
+
+
 #####################################
 # Generation of data
 #####################################
@@ -0,0 +1,166 @@
+import hashlib
+import numpy as np
+import tools
+from spike_index import SpikeIndex
+
+
+# Trace tables already created (their spike index and operations, not their rows), by key of their inputs (see
+#  TraceTable.get_key)
+traceTableCache = {}
+# Max number of trace tables kept in traceTableCache
+TRACE_TABLE_CACHE_SIZE = 8
+# Number of values of each row of a trace table after its time stamp
+TRACE_TABLE_NUM_VALUES = 10
+
+
+class TraceTable:
+    """
+    Class used to get the trace table of a simulation: for each time stamp, the spike information of each population
+    formatted as it is shown in the txt and excel tables and the operations that begin and end. The rows are formatted
+    from the spike index each time the table is iterated (in constant memory), only the cheap state of the result (the
+    spike index and the list of operations begun) is kept and shared by all the exporters
+    """
+
+    def __init__(self, spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron, endianness,
+                 allTimeStampInTrace, iSMetaDataSave=False, fileSavePath="", fileSaveName="", spikeIndex=None):
+        """
+        Init an object of type TraceTable (no row is formatted until the table is iterated)
+
+        @param spikesInfo: dictionary with as keys as population which values are the spike stream and label of that population
+            {"population_i":{"spikeStream":spikeStream, "label":label, "sublabels": sublabel}:, ...}
+        @param timeStream: time stamp stream
+        @param numCueBinaryNeuron: number of neurons used to address in the input array
+        @param numCueOneHotNeuron: number of neurons used to address in One-hot
+        @param numContNeuron: number of neurons used to store content of memories
+        @param endianness: type of codification of the information stored in memory: "little endian" or "big_endian"
+        @param allTimeStampInTrace: if represent all time stamp in trace files or only time stamps where the network is spiking
+        @param iSMetaDataSave: (optional) bool, if save the middle information in a txt file (all spikes data ordered but
+            not formatted). These files hold the whole simulation, so they are the only part that is not in constant
+            memory
+        @param fileSavePath: (optional) path where to store the middle information txt files
+        @param fileSaveName: (optional) base name of the middle information txt files
+        @param spikeIndex: (optional) SpikeIndex of the populations of spikesInfo over timeStream, created if not given
+        """
+        if spikeIndex is None:
+            spikeIndex = SpikeIndex(spikesInfo, timeStream)
+        self.spikesInfo = spikesInfo
+        self.timeStream = timeStream
+        self.spikeIndex = spikeIndex
+        self.numCueBinaryNeuron = numCueBinaryNeuron
+        self.numCueOneHotNeuron = numCueOneHotNeuron
+        self.numContNeuron = numContNeuron
+        self.allTimeStampInTrace = allTimeStampInTrace
+        self.indexInputSpike = tools.get_input_spike_order(numCueBinaryNeuron, numContNeuron, endianness)
+        self.indexFormatSpike = tools.get_input_spike_order(numCueBinaryNeuron, 0, endianness)
+        # Operations begun along the simulation ("learn" or "recall"), known once the table has been iterated
+        self.beginingOperations = None
+        self.numRows = None
+        if iSMetaDataSave:
+            tools.get_format_spike_info(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron,
+                                        endianness, True, True, allTimeStampInTrace, fileSavePath=fileSavePath,
+                                        fileSaveName=fileSaveName, spikeIndex=spikeIndex)
+
+    def __iter__(self):
+        """
+        Iterate over the rows of the table, one for each time stamp, formatting each row when it is needed
+
+        @return: generator of rows [stamp, inCue, inContBin, dgOneHot, ca3Cue, ca3ContBin, ca1bin, outCue, outCont,
+            operationNameBegin, operationNameEnd]
+        """
+        operationCountBegin = 0
+        operationCountEnd = 0
+        sameOperationBeginCount = 0
+        sameOperationEndCount = 0
+        beginingOperations = []
+        numRows = 0
+        for tick, stamp in enumerate(self.timeStream):
+            spikes = tools.get_spikes_at_tick(self.spikesInfo, self.spikeIndex, tick, self.numCueBinaryNeuron,
+                                              self.indexInputSpike)
+            hasSpike, spikes = tools.format_spikes_at_timestamp(spikes, self.indexFormatSpike)
+            # Only take time stamp if there are spikes
+            if not (self.allTimeStampInTrace or hasSpike):
+                continue
+            [inCue, inContBin, dgOneHot, ca3Cue, ca3ContBin, ca1bin, outCue, outCont, operationNameBegin, operationNameEnd] = tools.get_string_format_spike_info_each_timestamp(
+                spikes, self.numCueOneHotNeuron, self.numContNeuron, operationCountBegin, operationCountEnd)
+
+            # Update the count of operations
+            operationNameBegin, sameOperationBeginCount, operationCountBegin, operationNameEnd, sameOperationEndCount, operationCountEnd, beginingOperations = \
+                tools.calculate_index_operation(operationNameBegin, sameOperationBeginCount, operationCountBegin,
+                                                operationNameEnd, sameOperationEndCount, operationCountEnd,
+                                                beginingOperations)
+
+            numRows += 1
+            yield [stamp, inCue, inContBin, dgOneHot, ca3Cue, ca3ContBin, ca1bin, outCue, outCont, operationNameBegin,
+                   operationNameEnd]
+        self.beginingOperations = beginingOperations
+        self.numRows = numRows
+
+    def __len__(self):
+        if self.numRows is None:
+            if self.allTimeStampInTrace:
+                self.numRows = len(self.timeStream)
+            else:
+                self.numRows = sum(1 for _ in self)
+        return self.numRows
+
+    @staticmethod
+    def get_key(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron, endianness,
+                allTimeStampInTrace, spikeIndex):
+        """
+        Get the key of the inputs of a trace table: a digest of the spikes indexed of each population and the rest of
+        parameters
+
+        @param spikesInfo: dictionary with as keys as population which values are the spike stream and label of that population
+        @param timeStream: time stamp stream
+        @param numCueBinaryNeuron: number of neurons used to address in the input array
+        @param numCueOneHotNeuron: number of neurons used to address in One-hot
+        @param numContNeuron: number of neurons used to store content of memories
+        @param endianness: type of codification of the information stored in memory
+        @param allTimeStampInTrace: if represent all time stamp in trace files or only time stamps where the network is spiking
+        @param spikeIndex: SpikeIndex of the populations of spikesInfo over timeStream
+        @return: key (string)
+        """
+        digest = hashlib.sha1()
+        digest.update(np.asarray(timeStream, dtype=float).tobytes())
+        digest.update(repr((numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron, endianness,
+                            bool(allTimeStampInTrace))).encode("utf-8"))
+        for population, spikesInfoSinglePop in spikesInfo.items():
+            digest.update(repr((population, spikesInfoSinglePop["label"], list(spikesInfoSinglePop["sublabels"]),
+                                spikeIndex.numNeurons[population])).encode("utf-8"))
+            digest.update(spikeIndex.ticks[population].tobytes())
+            digest.update(spikeIndex.neurons[population].tobytes())
+        return digest.hexdigest()
+
+
+def get_trace_table(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron, endianness,
+                    allTimeStampInTrace, iSMetaDataSave=False, fileSavePath="", fileSaveName="", spikeIndex=None):
+    """
+    Get the trace table of a simulation result, creating it only if there is not one with the same inputs in the cache.
+    The middle information txt files (iSMetaDataSave) are only written when the table is created
+
+    @param spikesInfo: dictionary with as keys as population which values are the spike stream and label of that population
+        {"population_i":{"spikeStream":spikeStream, "label":label, "sublabels": sublabel}:, ...}
+    @param timeStream: time stamp stream
+    @param numCueBinaryNeuron: number of neurons used to address in the input array
+    @param numCueOneHotNeuron: number of neurons used to address in One-hot
+    @param numContNeuron: number of neurons used to store content of memories
+    @param endianness: type of codification of the information stored in memory: "little endian" or "big_endian"
+    @param allTimeStampInTrace: if represent all time stamp in trace files or only time stamps where the network is spiking
+    @param iSMetaDataSave: (optional) bool, if save the middle information in a txt file
+    @param fileSavePath: (optional) path where to store the middle information txt files
+    @param fileSaveName: (optional) base name of the middle information txt files
+    @param spikeIndex: (optional) SpikeIndex of the populations of spikesInfo over timeStream, created if not given
+    @return: the TraceTable
+    """
+    if spikeIndex is None:
+        spikeIndex = SpikeIndex(spikesInfo, timeStream)
+    key = TraceTable.get_key(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron, endianness,
+                             allTimeStampInTrace, spikeIndex)
+    if key not in traceTableCache:
+        # Discard the oldest table if the cache is full
+        if len(traceTableCache) >= TRACE_TABLE_CACHE_SIZE:
+            del traceTableCache[next(iter(traceTableCache))]
+        traceTableCache[key] = TraceTable(spikesInfo, timeStream, numCueBinaryNeuron, numCueOneHotNeuron, numContNeuron,
+                                          endianness, allTimeStampInTrace, iSMetaDataSave, fileSavePath, fileSaveName,
+                                          spikeIndex)
+    return traceTableCache[key]
@@ -0,0 +1,359 @@
+import csv
+import math
+import time
+import numpy as np
+import config_loader
+import operation_log
+import tools
+
+"""
+Workload generators of the memory
+
+Each generator is a python generator of chunks (operation_log.OperationLog of chunkSize consecutive operations), so
+arbitrarily long workloads are produced and stored (see operation_log.write_operation_log_chunks) without holding them
+in memory. A workload is defined by:
+  * Pattern of operations: "mixed" (reads and writes in a ratio), "overwrite" (the writes rewrite the cues of a hot
+    set), "read_after_write" (each cue written is read some operations later) or "trace" (replay of recorded operations)
+  * Popularity of the cues: "uniform", "zipf" or "hotset"
+  * Arrival of the operations: "closed" (each one begins when the previous one ends), "bursty" (bursts separated by idle
+    gaps) or "trace" (times of the trace)
+"""
+
+
+def get_cue_probabilities(cueSize, cueDistribution, zipfExponent, hotsetFraction, hotsetProbability, generator):
+    """
+    Get the probability of each cue to be used by an operation. The popularity ranks are assigned to the cues in random
+    order, so the most popular cues are not always the lowest ones
+
+    @param cueSize: max number of patterns to store (cues 1 to cueSize)
+    @param cueDistribution: "uniform", "zipf" (probability of the cue of rank k proportional to 1/k**zipfExponent) or
+        "hotset" (hotsetProbability of the operations go to a hotsetFraction of the cues)
+    @param zipfExponent: exponent of the zipf distribution
+    @param hotsetFraction: fraction of the cues in the hot set
+    @param hotsetProbability: probability of an operation to use a cue of the hot set
+    @param generator: random generator (numpy.random.Generator)
+    @return: probability of each cue (cue k at index k-1) and cues of the hot set (the hotsetFraction most popular cues,
+        chosen at random for the uniform distribution)
+    """
+    ranking = generator.permutation(cueSize)
+    numHotCues = max(1, int(math.ceil(hotsetFraction * cueSize)))
+    if cueDistribution == "zipf":
+        rankProbabilities = 1.0 / np.arange(1, cueSize + 1) ** zipfExponent
+    elif cueDistribution == "hotset":
+        if numHotCues == cueSize:
+            rankProbabilities = np.ones(cueSize)
+        else:
+            rankProbabilities = np.full(cueSize, (1 - hotsetProbability) / (cueSize - numHotCues))
+            rankProbabilities[:numHotCues] = hotsetProbability / numHotCues
+    elif cueDistribution == "uniform":
+        rankProbabilities = np.ones(cueSize)
+    else:
+        raise ValueError("Cue distribution not supported. Supported distributions: uniform, zipf and hotset")
+    probabilities = np.empty(cueSize)
+    probabilities[ranking] = rankProbabilities / rankProbabilities.sum()
+    return probabilities, np.sort(ranking[:numHotCues]) + 1
+
+
+def generate_contents(numOperations, contSize, generator):
+    """
+    Generate random contents different from 0, as binary values (any contSize is supported)
+
+    @param numOperations: number of contents
+    @param contSize: size of patterns to store (number of bits)
+    @param generator: random generator (numpy.random.Generator)
+    @return: matrix of bits (numOperations x contSize, most significant bit first)
+    """
+    contents = generator.integers(0, 2, (numOperations, contSize), dtype=np.uint8)
+    emptyRows = ~contents.any(axis=1)
+    while emptyRows.any():
+        contents[emptyRows] = generator.integers(0, 2, (np.count_nonzero(emptyRows), contSize), dtype=np.uint8)
+        emptyRows = ~contents.any(axis=1)
+    return contents
+
+
+def get_arrival_start_times(operations, operationTime, currentOperationTime, arrival, burstSize, burstGap, generator):
+    """
+    Get the begin time of each operation of a chunk
+
+    @param operations: type of each operation (0 = writing and 1 = reading)
+    @param operationTime: units of time needed to get to the next operation of each type [writing, reading]
+    @param currentOperationTime: time when the first operation of the chunk can begin
+    @param arrival: "closed" (each operation begins when the previous one ends) or "bursty" (after each operation, an
+        idle gap begins with probability 1/burstSize, its length is exponentially distributed with mean burstGap)
+    @param burstSize: mean number of operations of a burst
+    @param burstGap: mean idle time between bursts
+    @param generator: random generator (numpy.random.Generator)
+    @return: begin time of each operation and time when the first operation of the next chunk can begin
+    """
+    durations = np.asarray(operationTime)[operations].astype(np.int64)
+    if arrival == "bursty":
+        gaps = np.rint(generator.exponential(burstGap, len(operations))).astype(np.int64)
+        durations += np.where(generator.random(len(operations)) < 1.0 / burstSize, gaps, 0)
+    elif arrival != "closed":
+        raise ValueError("Arrival not supported. Supported arrivals: closed and bursty")
+    endTimes = currentOperationTime + np.cumsum(durations)
+    return endTimes - durations, int(endTimes[-1]) if len(endTimes) > 0 else currentOperationTime
+
+
+def generate_mixed_operations(numOperations, readRatio, cueProbabilities, contSize, generator):
+    """
+    Generate reading and writing operations in a ratio, with the cues drawn from their popularity
+
+    @param numOperations: number of operations
+    @param readRatio: probability of an operation to be a reading operation
+    @param cueProbabilities: probability of each cue (see get_cue_probabilities)
+    @param contSize: size of patterns to store (number of bits)
+    @param generator: random generator (numpy.random.Generator)
+    @return: type of each operation, cue of each operation and content of each operation (matrix of bits, 0 for the
+        reading operations)
+    """
+    operations = (generator.random(numOperations) < readRatio).astype(np.uint8)
+    cues = generator.choice(len(cueProbabilities), numOperations, p=cueProbabilities) + 1
+    contents = generate_contents(numOperations, contSize, generator)
+    contents[operations == 1] = 0
+    return operations, cues, contents
+
+
+def generate_overwrite_operations(numOperations, readRatio, cueProbabilities, hotCues, contSize, generator):
+    """
+    Generate an overwrite-heavy sequence: the writing operations store new contents in the cues of the hot set, so each
+    one is rewritten many times, and the reading operations draw the cues from their popularity
+
+    @param numOperations: number of operations
+    @param readRatio: probability of an operation to be a reading operation
+    @param cueProbabilities: probability of each cue (see get_cue_probabilities)
+    @param hotCues: cues rewritten by the writing operations
+    @param contSize: size of patterns to store (number of bits)
+    @param generator: random generator (numpy.random.Generator)
+    @return: type of each operation, cue of each operation and content of each operation (matrix of bits, 0 for the
+        reading operations)
+    """
+    operations, cues, contents = generate_mixed_operations(numOperations, readRatio, cueProbabilities, contSize,
+                                                           generator)
+    isWriting = operations == 0
+    cues[isWriting] = generator.choice(hotCues, np.count_nonzero(isWriting))
+    return operations, cues, contents
+
+
+def generate_read_after_write_operations(firstOperation, numOperations, distance, previousCues, cueProbabilities,
+                                         contSize, generator):
+    """
+    Generate a read-after-write sequence: groups of distance+1 writing operations followed by the reading of the same
+    cues in the same order, so each cue is read distance operations after it is written
+
+    @param firstOperation: index of the first operation of the chunk in the workload
+    @param numOperations: number of operations
+    @param distance: number of operations between a writing operation and the reading of its cue
+    @param previousCues: cues of the last distance+1 operations of the previous chunk
+    @param cueProbabilities: probability of each cue (see get_cue_probabilities)
+    @param contSize: size of patterns to store (number of bits)
+    @param generator: random generator (numpy.random.Generator)
+    @return: type of each operation, cue of each operation and content of each operation (matrix of bits, 0 for the
+        reading operations)
+    """
+    groupSize = distance + 1
+    operations = (((firstOperation + np.arange(numOperations)) // groupSize) % 2).astype(np.uint8)
+    isWriting = operations == 0
+    # Cues of the previous chunk first, so each reading operation takes the cue groupSize operations before it
+    cues = np.concatenate([previousCues, np.zeros(numOperations, dtype=np.int64)])
+    cues[groupSize:][isWriting] = generator.choice(len(cueProbabilities), np.count_nonzero(isWriting),
+                                                   p=cueProbabilities) + 1
+    readingIndexes = np.flatnonzero(~isWriting)
+    cues[groupSize + readingIndexes] = cues[readingIndexes]
+    contents = generate_contents(numOperations, contSize, generator)
+    contents[~isWriting] = 0
+    return operations, cues[groupSize:], contents
+
+
+def read_trace_chunks(tracePath, chunkSize, cueSizeInBin, contSize):
+    """
+    Read the operations of a recorded trace in chunks: an operation log (.oplog, memory-mapped) or a csv file with a line
+    "operation,cue,content[,startTime]" for each operation (empty lines and lines beginning with # are skipped)
+
+    @param tracePath: path + filename to the trace
+    @param chunkSize: number of operations of each chunk
+    @param cueSizeInBin: input cue size in binary
+    @param contSize: size of patterns to store (number of bits)
+    @return: generator of (type of each operation, cue of each operation, content of each operation as a matrix of
+        bits, begin time of each operation or None if the trace has no times)
+    """
+    if tracePath.endswith(operation_log.OPERATION_LOG_EXTENSION):
+        traceLog = operation_log.OperationLog.read(tracePath)
+        if traceLog.cueSizeInBin != cueSizeInBin or traceLog.contSize != contSize:
+            raise ValueError("The trace " + tracePath + " has " + str(traceLog.cueSizeInBin) + " cue and " +
+                             str(traceLog.contSize) + " cont neurons, the memory needs " + str(cueSizeInBin) + " and " +
+                             str(contSize))
+        for begin in range(0, len(traceLog), chunkSize):
+            end = min(begin + chunkSize, len(traceLog))
+            yield (np.asarray(traceLog.operations[begin:end]), np.asarray(traceLog.cues[begin:end]),
+                   np.unpackbits(traceLog.contents[begin:end], axis=1, count=contSize),
+                   np.asarray(traceLog.startTimes[begin:end]))
+        return
+
+    with open(tracePath, "r", newline="") as file:
+        rows = []
+        for lineNumber, row in enumerate(csv.reader(file), 1):
+            if not row or row[0].strip().startswith("#"):
+                continue
+            if len(row) not in [3, 4]:
+                raise ValueError("The line " + str(lineNumber) + " of the trace " + tracePath + " must be "
+                                 "operation,cue,content[,startTime]")
+            rows.append(row)
+            if len(rows) == chunkSize:
+                yield get_trace_rows(rows, contSize, tracePath)
+                rows = []
+        if rows:
+            yield get_trace_rows(rows, contSize, tracePath)
+
+
+def get_trace_rows(rows, contSize, tracePath):
+    """
+    Convert the lines of a csv trace to the arrays of the operations
+
+    @param rows: list of lines of the trace (operation, cue, content[, startTime])
+    @param contSize: size of patterns to store (number of bits)
+    @param tracePath: path + filename to the trace (for the error messages)
+    @return: type of each operation, cue of each operation, content of each operation as a matrix of bits and begin time
+        of each operation (None if the lines have no times)
+    """
+    if len(set(len(row) for row in rows)) > 1:
+        raise ValueError("All the lines of the trace " + tracePath + " must have or not have a start time")
+    operations = np.array([int(row[0]) for row in rows])
+    cues = np.array([int(row[1]) for row in rows])
+    contents = [int(row[2]) for row in rows]
+    if any(content < 0 or content >= 2 ** contSize for content in contents):
+        raise ValueError("The contents of the trace " + tracePath + " must be lower than 2**" + str(contSize))
+    binaryContents = np.array([list(format(content, "0" + str(contSize) + "b")) for content in contents],
+                              dtype=np.uint8).reshape(len(rows), contSize)
+    startTimes = np.array([float(row[3]) for row in rows]) if len(rows[0]) == 4 else None
+    return operations, cues, binaryContents, startTimes
+
+
+def generate_workload(workloadParameters, cueSize, contSize, operationTime, holdingTime):
+    """
+    Generate a workload in chunks
+
+    @param workloadParameters: dict of parameter -> value (see config_loader.WORKLOAD_PARAMETERS)
+    @param cueSize: max number of patterns to store
+    @param contSize: size of patterns to store (number of bits)
+    @param operationTime: units of time needed to get to the next operation of each type [writing, reading]
+    @param holdingTime: number of units of time to hold the values of each type of operation [writing, reading]
+    @return: generator of operation_log.OperationLog with chunkSize consecutive operations (the last one can be shorter)
+    """
+    cueSizeInBin = math.ceil(math.log2(cueSize + 1))
+    pattern = workloadParameters["pattern"]
+    numOperations = workloadParameters["numOperations"]
+    chunkSize = workloadParameters["chunkSize"]
+    generator = np.random.default_rng(workloadParameters["seed"])
+    cueProbabilities, hotCues = get_cue_probabilities(cueSize, workloadParameters["cueDistribution"],
+                                                      workloadParameters["zipfExponent"],
+                                                      workloadParameters["hotsetFraction"],
+                                                      workloadParameters["hotsetProbability"], generator)
+    currentOperationTime = 1
+
+    def create_chunk(operations, cues, contents, startTimes=None):
+        nonlocal currentOperationTime
+        if startTimes is None:
+            startTimes, currentOperationTime = get_arrival_start_times(operations, operationTime, currentOperationTime,
+                                                                       workloadParameters["arrival"],
+                                                                       workloadParameters["burstSize"],
+                                                                       workloadParameters["burstGap"], generator)
+        chunk = operation_log.OperationLog.from_operations(operations, cues, contents, cueSizeInBin, contSize,
+                                                           operationTime, holdingTime, startTimes=startTimes)
+        currentOperationTime = max(currentOperationTime, chunk.endTime)
+        return chunk
+
+    if pattern == "trace":
+        numReplayed = 0
+        while numReplayed < numOperations or numOperations == 0:
+            # Each replay of the trace begins when the previous one ends
+            timeShift = None
+            numTraceOperations = 0
+            for operations, cues, contents, startTimes in read_trace_chunks(workloadParameters["tracePath"], chunkSize,
+                                                                             cueSizeInBin, contSize):
+                if numOperations > 0:
+                    numChunkOperations = min(len(operations), numOperations - numReplayed)
+                    operations, cues, contents = operations[:numChunkOperations], cues[:numChunkOperations], \
+                        contents[:numChunkOperations]
+                    startTimes = startTimes[:numChunkOperations] if startTimes is not None else None
+                if len(operations) == 0:
+                    break
+                if workloadParameters["arrival"] == "trace":
+                    if startTimes is None:
+                        raise ValueError("The trace " + workloadParameters["tracePath"] + " has no start times")
+                    if timeShift is None:
+                        timeShift = currentOperationTime - startTimes[0]
+                    startTimes = startTimes + timeShift
+                else:
+                    startTimes = None
+                yield create_chunk(operations, cues, contents, startTimes)
+                numReplayed += len(operations)
+                numTraceOperations += len(operations)
+            if numOperations == 0 or numTraceOperations == 0:
+                break
+        return
+
+    previousCues = np.zeros(workloadParameters["readAfterWriteDistance"] + 1, dtype=np.int64)
+    for firstOperation in range(0, numOperations, chunkSize):
+        numChunkOperations = min(chunkSize, numOperations - firstOperation)
+        if pattern == "mixed":
+            chunkOperations = generate_mixed_operations(numChunkOperations, workloadParameters["readRatio"],
+                                                        cueProbabilities, contSize, generator)
+        elif pattern == "overwrite":
+            chunkOperations = generate_overwrite_operations(numChunkOperations, workloadParameters["readRatio"],
+                                                            cueProbabilities, hotCues, contSize, generator)
+        elif pattern == "read_after_write":
+            chunkOperations = generate_read_after_write_operations(firstOperation, numChunkOperations,
+                                                                   workloadParameters["readAfterWriteDistance"],
+                                                                   previousCues, cueProbabilities, contSize, generator)
+            previousCues = np.concatenate([previousCues, chunkOperations[1]])[-len(previousCues):]
+        else:
+            raise ValueError("Workload pattern not supported. Supported patterns: mixed, overwrite, read_after_write "
+                             "and trace")
+        yield create_chunk(*chunkOperations)
+
+
+def write_workload(workloadParameters, cueSize, contSize, operationTime, holdingTime):
+    """
+    Generate a workload and store it as an operation log (input_spikes.oplog) in its own folder of workloadSavePath, so
+    it can be executed by run_testbenches.py
+
+    @param workloadParameters: dict of parameter -> value (see config_loader.WORKLOAD_PARAMETERS)
+    @param cueSize: max number of patterns to store
+    @param contSize: size of patterns to store (number of bits)
+    @param operationTime: units of time needed to get to the next operation of each type [writing, reading]
+    @param holdingTime: number of units of time to hold the values of each type of operation [writing, reading]
+    @return: full path to the operation log, number of operations stored
+    """
+    tools.check_and_create_folder(workloadParameters["workloadSavePath"])
+    basePath = tools.check_and_create_folder(workloadParameters["workloadSavePath"] + "workload_" +
+                                             time.strftime("%Y_%m_%d__%H_%M_%S") + "/")
+    workloadPath = tools.check_and_create_folder(basePath + workloadParameters["pattern"] + "/")
+    chunks = generate_workload(workloadParameters, cueSize, contSize, operationTime, holdingTime)
+    fullPath, filename, numOperations = operation_log.write_operation_log_chunks(chunks, workloadPath, "input_spikes")
+    return fullPath, numOperations
+
+
+if __name__ == "__main__":
+    # * Read the config files
+    activeConfigFilePath = config_loader.get_active_config_path()
+    memoryParameters = config_loader.read_memory_parameters(activeConfigFilePath)
+    # The workloads are stored as operation logs: integer times of the operations
+    testbenchParameters = config_loader.read_testbench_parameters(activeConfigFilePath, integerTimes=True)
+    workloadParameters = config_loader.read_workload_parameters(activeConfigFilePath)
+
+    # * Generate the workload and store it
+    workloadPath, numOperations = write_workload(workloadParameters, memoryParameters["cueSize"],
+                                                 memoryParameters["contSize"],
+                                                 [testbenchParameters["writingOperationTime"],
+                                                  testbenchParameters["readingOperationTime"]],
+                                                 [testbenchParameters["writingOperationDataHolding"],
+                                                  testbenchParameters["readingOperationDataHolding"]])
+    workloadLog = operation_log.OperationLog.read(workloadPath)
+    print("Workload: " + workloadParameters["pattern"] + " (" + workloadParameters["cueDistribution"] + " cues, " +
+          workloadParameters["arrival"] + " arrival)")
+    print("Num of operations = " + str(numOperations))
+    print(" - Learning = " + str(numOperations - int(np.count_nonzero(workloadLog.operations))))
+    print(" - Recalling = " + str(int(np.count_nonzero(workloadLog.operations))))
+    print("Min simulation time to simulate all operations = " + str(workloadLog.endTime) + " ms")
+    print(workloadPath)